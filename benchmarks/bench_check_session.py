@@ -0,0 +1,90 @@
+"""
+Benchmark the proxy check path: one aiohttp session per check vs. the shared session.
+
+A local TCP server plays the role of every proxy and answers each request with a
+fixed ip-api style JSON body, so the numbers measure client-side overhead only.
+
+Usage:
+    python -m benchmarks.bench_check_session [--checks 5000]
+"""
+
+import argparse
+import asyncio
+import time
+
+import aiohttp as aio
+from loguru import logger
+
+from proxy_parser.config import DEFAULT_HEADERS, MAX_CONNECTIONS
+from proxy_parser.http_client import HTTPClient
+
+BODY = b'{"status":"success","countryCode":"US","query":"127.0.0.1"}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n"
+    b"Connection: close\r\n\r\n" + BODY
+)
+JUDGE_URL = "http://judge.invalid/json/"
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(RESPONSE)
+    await writer.drain()
+    writer.close()
+
+
+async def check_with_session_per_request(proxy: str, semaphore: asyncio.Semaphore) -> bool:
+    """Baseline behaviour: a new ClientSession (connector, resolver, cookie jar) per check."""
+    async with semaphore:
+        async with aio.ClientSession(
+            headers=DEFAULT_HEADERS, timeout=aio.ClientTimeout(total=10), proxy=proxy
+        ) as client:
+            response = await client.get(JUDGE_URL)
+            return "query" in await response.json()
+
+
+async def run(checks: int) -> None:
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=4096)
+    port = server.sockets[0].getsockname()[1]
+    proxy = f"http://127.0.0.1:{port}"
+    semaphore = asyncio.Semaphore(min(MAX_CONNECTIONS, 500))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(check_with_session_per_request(proxy, semaphore) for _ in range(checks))
+    )
+    before = checks / (time.perf_counter() - start)
+    assert all(results)
+
+    client = HTTPClient()
+
+    async def check_shared() -> bool:
+        async with semaphore:
+            return bool(await client.get_json(JUDGE_URL, proxy=proxy))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(check_shared() for _ in range(checks)))
+    after = checks / (time.perf_counter() - start)
+    assert all(results)
+    await client.aclose()
+
+    server.close()
+    await server.wait_closed()
+
+    print(f"session per check: {before:8.0f} checks/s")
+    print(f"shared session:    {after:8.0f} checks/s ({after / before:.2f}x)")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--checks", type=int, default=5000)
+    args = arg_parser.parse_args()
+
+    logger.remove()
+    asyncio.run(run(args.checks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark ip:port extraction: REGEX_PATTERN vs. the candidate-and-validate engine.
+
+Every engine is run over the same corpus and must return the same proxies as
+REGEX_PATTERN. The corpus is a directory of saved source bodies (for example the
+raw files behind sources/*.txt); without one, a synthetic corpus of plain lists,
+protocol-prefixed lists and HTML tables is generated.
+
+Usage:
+    python -m benchmarks.bench_extract [--corpus DIR] [--size-mb 20] [--chunk-kb 64]
+"""
+
+import argparse
+import gc
+import random
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from proxy_parser.config import REGEX_PATTERN
+from proxy_parser.extract import ProxyExtractor, find_proxies, regex_proxies
+
+
+def synthetic_corpus(size_mb: float, seed: int = 0) -> list[bytes]:
+    """Generate bodies shaped like the lists found by the GitHub search."""
+    rng = random.Random(seed)
+
+    def ip() -> str:
+        return ".".join(str(rng.randint(1, 255)) for _ in range(4))
+
+    formats = [
+        lambda: f"{ip()}:{rng.randint(1, 65535)}",
+        lambda: f"{rng.choice(['http', 'socks4', 'socks5'])}://{ip()}:{rng.randint(1, 65535)}",
+        lambda: f"<tr><td>{ip()}:{rng.randint(1, 65535)}</td><td>US</td>"
+        f"<td>elite</td><td>2024-01-0{rng.randint(1, 9)} 12:{rng.randint(10, 59)}</td></tr>",
+    ]
+    bodies, total = [], 0
+    while total < size_mb * 1_000_000:
+        line = rng.choice(formats)
+        body = "\n".join(line() for _ in range(rng.randint(100, 20_000))).encode()
+        bodies.append(body)
+        total += len(body)
+    return bodies
+
+
+def load_corpus(path: Path) -> list[bytes]:
+    """Read every file under a directory as one body."""
+    return [file.read_bytes() for file in sorted(path.rglob("*")) if file.is_file()]
+
+
+def run_str_regex(bodies: list[bytes], chunk_size: int) -> set[str]:
+    """Previous behaviour: decode the whole body and run REGEX_PATTERN."""
+    proxies = set()
+    for body in bodies:
+        text = body.decode("utf-8", errors="replace")
+        proxies.update(m.group(1) for m in REGEX_PATTERN.finditer(text) if m.group(1))
+    return proxies
+
+
+def run_extractor(scan: Callable[[bytes], Iterable[str]]) -> Callable[[list[bytes], int], set[str]]:
+    """Feed bodies through a ProxyExtractor in chunks, as fetch_source does."""
+
+    def run(bodies: list[bytes], chunk_size: int) -> set[str]:
+        proxies = set()
+        for body in bodies:
+            extractor = ProxyExtractor(scan)
+            for start in range(0, len(body), chunk_size):
+                proxies.update(extractor.feed(body[start:start + chunk_size]))
+            proxies.update(extractor.flush())
+        return proxies
+
+    return run
+
+
+ENGINES = {
+    "REGEX_PATTERN (str, whole body)": run_str_regex,
+    "REGEX_PATTERN (bytes, chunked)": run_extractor(regex_proxies),
+    "find_proxies (bytes, chunked)": run_extractor(find_proxies),
+}
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--corpus", type=Path, help="Directory of saved source bodies")
+    arg_parser.add_argument("--size-mb", type=float, default=20, help="Synthetic corpus size")
+    arg_parser.add_argument("--chunk-kb", type=int, default=64, help="Streamed chunk size")
+    args = arg_parser.parse_args()
+
+    bodies = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.size_mb)
+    megabytes = sum(map(len, bodies)) / 1_000_000
+    print(f"Corpus: {len(bodies)} bodies, {megabytes:.1f} MB")
+
+    reference = None
+    for name, engine in ENGINES.items():
+        # Keep collections of the previous results out of the timings
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        proxies = engine(bodies, args.chunk_kb * 1024)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        reference = proxies if reference is None else reference
+        same = "ok" if proxies == reference else "MISMATCH"
+        print(f"{name:34} {megabytes / elapsed:8.1f} MB/s  {len(proxies)} proxies  {same}")
+
+
+if __name__ == "__main__":
+    main()
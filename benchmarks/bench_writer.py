@@ -0,0 +1,88 @@
+"""
+Benchmark writing check results: one open/append per record vs. BufferedJsonlWriter.
+
+Reports the time the caller (the event loop in the orchestrator) spends per
+record and the total time until every record is on disk.
+
+Usage:
+    python -m benchmarks.bench_writer [--records 100000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+from proxy_parser.file_operations import FileManagerJson
+from proxy_parser.writer import BufferedJsonlWriter
+
+
+def records(count: int) -> list[dict]:
+    """Build records shaped like the ones the orchestrator writes."""
+    return [
+        {
+            "proxy": f"http://10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}:8080",
+            "info": {"status": "success", "query": "10.0.0.1", "countryCode": "US"},
+            "elapsed_time": 0.25,
+        }
+        for index in range(count)
+    ]
+
+
+def run_append(path: Path, batch: list[dict]) -> tuple[float, float]:
+    """Previous behaviour: FileManagerJson.append_to_file per record."""
+    file_manager = FileManagerJson(path.parent, path.parent)
+    start = time.perf_counter()
+    for record in batch:
+        file_manager.append_to_file(path, record)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def run_writer(fsync: str) -> Callable[[Path, list[dict]], tuple[float, float]]:
+    """Queue every record on a writer with the given fsync policy and close it."""
+
+    def run(path: Path, batch: list[dict]) -> tuple[float, float]:
+        writer = BufferedJsonlWriter(path, fsync=fsync, fsync_seconds=1.0).open()
+        start = time.perf_counter()
+        for record in batch:
+            writer.write(record)
+        caller = time.perf_counter() - start
+        writer.close()
+        return caller, time.perf_counter() - start
+
+    return run
+
+
+MODES = {
+    "append_to_file per record": run_append,
+    "BufferedJsonlWriter fsync=none": run_writer("none"),
+    "BufferedJsonlWriter fsync=periodic": run_writer("periodic"),
+    "BufferedJsonlWriter fsync=batch": run_writer("batch"),
+}
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--records", type=int, default=100_000, help="Records to write")
+    args = arg_parser.parse_args()
+
+    # Per-record debug logging would dominate the append_to_file timings
+    logger.remove()
+    batch = records(args.records)
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (name, mode) in enumerate(MODES.items()):
+            path = Path(directory, f"{index}.jsonl")
+            caller, total = mode(path, batch)
+            lines = len(path.read_bytes().splitlines())
+            print(
+                f"{name:36} {caller / len(batch) * 1e6:7.2f} µs/record on caller  "
+                f"{len(batch) / total:10,.0f} records/s  {lines} lines"
+            )
+
+
+if __name__ == "__main__":
+    main()
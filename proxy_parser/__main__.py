@@ -5,19 +5,47 @@ Command-line interface for the proxy parser.
 import asyncio
 import argparse
 import sys
+from typing import Awaitable
 
-from proxy_parser.config import PATH_TO_SOURCES, PROXIES_PATH, INF_MAIN_TIMEOUT_SECONDS
+from proxy_parser.config import (
+    PATH_TO_SOURCES,
+    PROXIES_PATH,
+    INF_MAIN_TIMEOUT_SECONDS,
+    JUDGE_PORT,
+    API_PORT,
+    COORDINATOR_PORT,
+    METRICS_PORT,
+)
+from proxy_parser.api import ProxyAPI
+from proxy_parser.distributed import DistributedWorker
 from proxy_parser.file_operations import FileManager, FileManagerJson
+from proxy_parser.http_client import http_client
+from proxy_parser.judge import run_judge
+from proxy_parser.metrics import start_metrics_server
 from proxy_parser.orchestrator import ProxyOrchestrator
-from proxy_parser.parsers import ProxyParser
 from loguru import logger
 
 file_manager = FileManagerJson(PATH_TO_SOURCES, PROXIES_PATH)
-orchestrator = ProxyOrchestrator(file_manager)
-parser = ProxyParser(file_manager)
 
 
-async def run_single_cycle() -> None:
+def create_orchestrator(args: argparse.Namespace) -> ProxyOrchestrator:
+    """
+    Create the orchestrator for the modes that parse or check proxies.
+
+    It opens the state store and the caches, so the judge, API and worker
+    modes never create one.
+    """
+    orchestrator = ProxyOrchestrator(file_manager)
+    if args.pipeline:
+        orchestrator.pipeline = True
+    if args.workers:
+        orchestrator.use_processes(args.workers)
+    if args.coordinator:
+        orchestrator.use_coordinator()
+    return orchestrator
+
+
+async def run_single_cycle(orchestrator: ProxyOrchestrator) -> None:
     """Run a single proxy parsing cycle."""
     try:
         await orchestrator.run_full_cycle()
@@ -25,9 +53,13 @@ async def run_single_cycle() -> None:
     except Exception as e:
         logger.error(f"Error during single cycle: {e}")
         sys.exit(1)
+    finally:
+        await orchestrator.close()
 
 
-async def run_infinite_cycle(timeout: int = INF_MAIN_TIMEOUT_SECONDS) -> None:
+async def run_infinite_cycle(
+    orchestrator: ProxyOrchestrator, timeout: int = INF_MAIN_TIMEOUT_SECONDS
+) -> None:
     """Run infinite proxy parsing cycles."""
     try:
         await orchestrator.run_infinite_cycle(timeout)
@@ -38,23 +70,25 @@ async def run_infinite_cycle(timeout: int = INF_MAIN_TIMEOUT_SECONDS) -> None:
         sys.exit(1)
 
 
-async def update_sources() -> None:
+async def update_sources(orchestrator: ProxyOrchestrator) -> None:
     """Update source files from GitHub."""
     try:
-        parser.update_sources()
+        await orchestrator.parser.update_sources()
         logger.info("Sources updated successfully")
     except Exception as e:
         logger.error(f"Error updating sources: {e}")
         sys.exit(1)
+    finally:
+        await orchestrator.close()
 
 
-async def parse_proxies() -> None:
+async def parse_proxies(orchestrator: ProxyOrchestrator) -> None:
     """Parse proxies from existing sources."""
     try:
-        proxies = await parser.parse_unchecked_proxies()
+        proxies = await orchestrator.parser.parse_unchecked_proxies()
 
         if proxies:
-            await parser.save_unchecked_proxies(
+            await orchestrator.parser.save_unchecked_proxies(
                 proxies, str(PROXIES_PATH / "unchecked_proxies.txt")
             )
             logger.info(f"Parsed {len(proxies)} proxies successfully")
@@ -63,9 +97,11 @@ async def parse_proxies() -> None:
     except Exception as e:
         logger.error(f"Error parsing proxies: {e}")
         sys.exit(1)
+    finally:
+        await orchestrator.close()
 
 
-async def check_proxies() -> None:
+async def check_proxies(orchestrator: ProxyOrchestrator) -> None:
     """Check existing unchecked proxies."""
     try:
         await orchestrator.check_proxies()
@@ -73,6 +109,51 @@ async def check_proxies() -> None:
     except Exception as e:
         logger.error(f"Error checking proxies: {e}")
         sys.exit(1)
+    finally:
+        await orchestrator.close()
+
+
+async def serve_judge(port: int) -> None:
+    """Run the embedded proxy judge server."""
+    try:
+        await run_judge(port=port)
+    except Exception as e:
+        logger.error(f"Error running judge server: {e}")
+        sys.exit(1)
+
+
+async def serve_api(port: int) -> None:
+    """Serve the proxy query API over the published check results."""
+    try:
+        await ProxyAPI().run(port=port)
+    except Exception as e:
+        logger.error(f"Error running proxy API: {e}")
+        sys.exit(1)
+
+
+async def run_worker(address: str, retry_seconds: int = 5) -> None:
+    """Check proxies leased from a coordinator, reconnecting when it goes away."""
+    host, _, port = address.rpartition(":")
+    if not host:
+        host, port = address, str(COORDINATOR_PORT)
+    while True:
+        try:
+            await DistributedWorker(host, int(port)).run()
+            logger.info(f"Coordinator {host}:{port} closed the connection")
+        except OSError as e:
+            logger.warning(f"Cannot reach coordinator {host}:{port}: {e}")
+        finally:
+            await http_client.aclose()
+        await asyncio.sleep(retry_seconds)
+
+
+async def with_metrics(operation: Awaitable[None], port: int) -> None:
+    """Run an operation while serving /metrics on the given port."""
+    runner = await start_metrics_server(port=port)
+    try:
+        await operation
+    finally:
+        await runner.cleanup()
 
 
 def main() -> None:
@@ -88,6 +169,13 @@ Examples:
   proxy-parser --parse           # Parse proxies only
   proxy-parser --check           # Check proxies only
   proxy-parser --timeout 300     # Set custom timeout (seconds)
+  proxy-parser --judge           # Serve the proxy judge endpoint
+  proxy-parser --serve           # Serve the working proxies over HTTP
+  proxy-parser --single --pipeline  # Check proxies while sources are parsed
+  proxy-parser --check --workers 8  # Check across 8 processes
+  proxy-parser --coordinator     # Run cycles, leasing checks to remote workers
+  proxy-parser --worker host:8897  # Check proxies for a coordinator
+  proxy-parser --metrics-port 9108  # Expose Prometheus metrics while running
         """,
     )
 
@@ -109,6 +197,66 @@ Examples:
         "--check", action="store_true", help="Check existing unchecked proxies only"
     )
 
+    arg_parser.add_argument(
+        "--judge",
+        action="store_true",
+        help="Serve the embedded proxy judge (point JudgeURL at it)",
+    )
+
+    arg_parser.add_argument(
+        "--judge-port",
+        type=int,
+        default=JUDGE_PORT,
+        help=f"Port for the judge server (default: {JUDGE_PORT})",
+    )
+
+    arg_parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve the working proxies over an HTTP query API",
+    )
+
+    arg_parser.add_argument(
+        "--serve-port",
+        type=int,
+        default=API_PORT,
+        help=f"Port for the query API (default: {API_PORT})",
+    )
+
+    arg_parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Start checking proxies while sources are still being parsed",
+    )
+
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Shard proxy checking across N processes (default: CheckProcesses)",
+    )
+
+    arg_parser.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="Lease proxy checks to --worker nodes instead of checking locally",
+    )
+
+    arg_parser.add_argument(
+        "--worker",
+        metavar="HOST:PORT",
+        help="Run as a checker node for the coordinator at HOST:PORT",
+    )
+
+    arg_parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        metavar="PORT",
+        help="Serve Prometheus metrics on PORT while running (default: MetricsPort, 0 to disable)",
+    )
+
     arg_parser.add_argument(
         "--timeout",
         type=int,
@@ -124,16 +272,26 @@ Examples:
 
     # Determine which operation to run
     if args.update_sources:
-        asyncio.run(update_sources())
+        operation = update_sources(create_orchestrator(args))
     elif args.parse:
-        asyncio.run(parse_proxies())
+        operation = parse_proxies(create_orchestrator(args))
     elif args.check:
-        asyncio.run(check_proxies())
+        operation = check_proxies(create_orchestrator(args))
+    elif args.judge:
+        operation = serve_judge(args.judge_port)
+    elif args.serve:
+        operation = serve_api(args.serve_port)
+    elif args.worker:
+        operation = run_worker(args.worker)
     elif args.single:
-        asyncio.run(run_single_cycle())
+        operation = run_single_cycle(create_orchestrator(args))
     else:
         # Default: infinite mode
-        asyncio.run(run_infinite_cycle(args.timeout))
+        operation = run_infinite_cycle(create_orchestrator(args), args.timeout)
+
+    if args.metrics_port:
+        operation = with_metrics(operation, args.metrics_port)
+    asyncio.run(operation)
 
 
 if __name__ == "__main__":
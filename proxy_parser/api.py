@@ -0,0 +1,243 @@
+"""
+HTTP query API over an in-memory index of the working proxies.
+
+The index is built from the published ``parsed.jsonl`` snapshot and rebuilt in
+a thread whenever a new snapshot is published, then swapped in as a whole, so
+queries never see a half-loaded pool and never touch the disk.
+"""
+
+import asyncio
+import bisect
+import os
+import random
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import orjson
+from aiohttp import web
+from loguru import logger
+
+from proxy_parser.config import API_HOST, API_PORT, API_REFRESH_SECONDS, CHECKED_PROXIES_FILE
+
+DEFAULT_LIMIT = 10
+
+
+class ProxyIndex:
+    """
+    Check results grouped by protocol and country, each group sorted by latency.
+
+    Every (protocol, country) combination, with None standing for "any", maps
+    to its records ordered fastest first plus the matching latencies, so the N
+    fastest proxies of a group are a slice and a latency cap is a bisection.
+    """
+
+    def __init__(self, records: Iterable[dict[str, Any]] = ()):
+        self._groups: dict[tuple[Optional[str], Optional[str]], list[dict[str, Any]]] = {}
+        self._latencies: dict[tuple[Optional[str], Optional[str]], list[float]] = {}
+
+        entries = []
+        for record in records:
+            proxy = record.get("proxy")
+            if not proxy or "://" not in proxy:
+                continue
+            latency = record.get("elapsed_time")
+            entries.append((float("inf") if latency is None else latency, record))
+        entries.sort(key=lambda entry: entry[0])
+
+        for latency, record in entries:
+            protocol = record["proxy"].split("://", 1)[0]
+            country = (record.get("info") or {}).get("countryCode")
+            keys = [(None, None), (protocol, None)]
+            if country:
+                country = country.upper()
+                keys += [(None, country), (protocol, country)]
+            for key in keys:
+                self._groups.setdefault(key, []).append(record)
+                self._latencies.setdefault(key, []).append(latency)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ProxyIndex":
+        """Build an index from a JSONL file of check results, skipping bad lines."""
+        records = []
+        try:
+            with path.open("rb") as file:
+                for line in file:
+                    try:
+                        records.append(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            logger.warning(f"File does not exist: {path}")
+        return cls(records)
+
+    def __len__(self) -> int:
+        return len(self._groups.get((None, None), ()))
+
+    def fastest(
+        self,
+        protocol: Optional[str] = None,
+        country: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+        max_latency: Optional[float] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Get the fastest matching proxies.
+
+        Args:
+            protocol: Protocol to match, e.g. "socks5" (any if None)
+            country: Two-letter country code to match (any if None)
+            limit: Maximum number of records
+            max_latency: Only records checked at or below this many seconds
+
+        Returns:
+            Check result records, fastest first
+        """
+        key = (protocol or None, country.upper() if country else None)
+        if max_latency is None:
+            return self._groups.get(key, [])[:limit]
+        end = min(bisect.bisect_right(self._latencies.get(key, []), max_latency), limit)
+        return self._groups.get(key, [])[:end]
+
+    def random(
+        self,
+        protocol: Optional[str] = None,
+        country: Optional[str] = None,
+        max_latency: Optional[float] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Get a uniformly random matching proxy.
+
+        Args:
+            protocol: Protocol to match (any if None)
+            country: Two-letter country code to match (any if None)
+            max_latency: Only records checked at or below this many seconds
+
+        Returns:
+            A check result record, or None if nothing matches
+        """
+        key = (protocol or None, country.upper() if country else None)
+        group = self._groups.get(key)
+        if not group:
+            return None
+        end = len(group)
+        if max_latency is not None:
+            end = bisect.bisect_right(self._latencies[key], max_latency)
+            if not end:
+                return None
+        return group[random.randrange(end)]
+
+    def stats(self) -> dict[str, Any]:
+        """Count proxies per protocol and per country."""
+        protocols, countries = {}, {}
+        for (protocol, country), group in self._groups.items():
+            if protocol and not country:
+                protocols[protocol] = len(group)
+            elif country and not protocol:
+                countries[country] = len(group)
+        return {"total": len(self), "protocols": protocols, "countries": countries}
+
+
+class ProxyAPI:
+    """Serve a ProxyIndex over HTTP and keep it in sync with the published snapshot."""
+
+    def __init__(
+        self, path: Path = CHECKED_PROXIES_FILE, refresh_seconds: float = API_REFRESH_SECONDS
+    ):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.index = ProxyIndex()
+        self._version: Optional[tuple[int, int]] = None
+
+    def _snapshot_version(self) -> Optional[tuple[int, int]]:
+        # Snapshots are published by rename, so a new one always has a new inode
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    async def refresh(self) -> bool:
+        """
+        Reload the index if a new snapshot was published.
+
+        Returns:
+            True if the index was replaced
+        """
+        version = self._snapshot_version()
+        if version is None or version == self._version:
+            return False
+        self.index = await asyncio.to_thread(ProxyIndex.from_file, self.path)
+        self._version = version
+        logger.info(f"🔄 Loaded {len(self.index)} proxies from {self.path}")
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error reloading {self.path}: {e}")
+
+    @staticmethod
+    def _filters(request: web.Request) -> dict[str, Any]:
+        query = request.query
+        try:
+            max_latency = float(query["max_latency"]) if "max_latency" in query else None
+        except ValueError:
+            raise web.HTTPBadRequest(text="max_latency must be a number")
+        return {
+            "protocol": query.get("protocol"),
+            "country": query.get("country"),
+            "max_latency": max_latency,
+        }
+
+    async def handle_proxies(self, request: web.Request) -> web.Response:
+        """GET /proxies: the fastest matching proxies, ``limit`` of them."""
+        try:
+            limit = int(request.query.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            raise web.HTTPBadRequest(text="limit must be an integer")
+        records = self.index.fastest(limit=max(limit, 0), **self._filters(request))
+        return web.Response(body=orjson.dumps(records), content_type="application/json")
+
+    async def handle_random(self, request: web.Request) -> web.Response:
+        """GET /proxies/random: one uniformly random matching proxy."""
+        record = self.index.random(**self._filters(request))
+        if record is None:
+            raise web.HTTPNotFound(text="no matching proxy")
+        return web.Response(body=orjson.dumps(record), content_type="application/json")
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """GET /stats: pool size per protocol and country."""
+        return web.Response(body=orjson.dumps(self.index.stats()), content_type="application/json")
+
+    def create_app(self) -> web.Application:
+        """Create the API application."""
+        app = web.Application()
+        app.router.add_get("/proxies", self.handle_proxies)
+        app.router.add_get("/proxies/random", self.handle_random)
+        app.router.add_get("/stats", self.handle_stats)
+        return app
+
+    async def run(self, host: str = API_HOST, port: int = API_PORT) -> None:
+        """
+        Serve the API until cancelled.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on
+        """
+        await self.refresh()
+        watcher = asyncio.create_task(self._watch())
+        runner = web.AppRunner(self.create_app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port, backlog=4096)
+        await site.start()
+        logger.info(f"🌐 Proxy API listening on http://{host}:{port}/")
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            watcher.cancel()
+            await runner.cleanup()
@@ -0,0 +1,166 @@
+"""
+On-disk caches for network fetches.
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import orjson
+from loguru import logger
+
+from proxy_parser.config import SOURCE_CACHE_PATH, SEARCH_CACHE_PATH, GITHUB_SEARCH_TTL
+
+
+def _cache_key(*parts: Any) -> str:
+    """Build a file-name-safe key from arbitrary parts."""
+    return hashlib.sha1("\0".join(map(str, parts)).encode()).hexdigest()
+
+
+class SourceCache:
+    """
+    HTTP validator cache for source lists.
+
+    For every source URL it keeps the ETag / Last-Modified validators of the last
+    successful fetch together with the proxies extracted from that body, so a
+    304 answer can reuse them without downloading or parsing anything.
+    """
+
+    def __init__(self, cache_path: Path = SOURCE_CACHE_PATH):
+        self.cache_path = cache_path
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.cache_path / f"{_cache_key(url)}.json"
+
+    def get(self, url: str) -> Optional[dict[str, Any]]:
+        """
+        Get the cached entry for a URL.
+
+        Args:
+            url: Source URL
+
+        Returns:
+            Dict with "etag", "last_modified" and "proxies", or None if not cached
+        """
+        path = self._path(url)
+        try:
+            if not path.exists():
+                return None
+            return orjson.loads(path.read_bytes())
+        except Exception as e:
+            logger.error(f"Error reading source cache for {url}: {e}")
+            return None
+
+    def put(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        proxies: Iterable[str],
+    ) -> None:
+        """
+        Store validators and extracted proxies for a URL.
+
+        Args:
+            url: Source URL
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+            proxies: Proxies extracted from the response body
+        """
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "proxies": list(proxies),
+        }
+        try:
+            self._path(url).write_bytes(orjson.dumps(entry))
+        except Exception as e:
+            logger.error(f"Error writing source cache for {url}: {e}")
+
+    @staticmethod
+    def validators(entry: Optional[dict[str, Any]]) -> dict[str, str]:
+        """
+        Build conditional request headers from a cached entry.
+
+        Args:
+            entry: Entry returned by ``get``
+
+        Returns:
+            If-None-Match / If-Modified-Since headers (empty if nothing cached)
+        """
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+
+class SearchCache:
+    """
+    TTL cache for GitHub search result pages, keyed by query and page.
+
+    Empty pages are cached too, so the early stop after an empty page does not
+    need a request either.
+    """
+
+    def __init__(self, cache_path: Path = SEARCH_CACHE_PATH, ttl: float = GITHUB_SEARCH_TTL):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, query: str, page: int) -> Path:
+        return self.cache_path / f"{_cache_key(query, page)}.json"
+
+    def get(self, query: str, page: int, now: Optional[float] = None) -> Optional[list[str]]:
+        """
+        Get the cached results of a search page if they have not expired.
+
+        Args:
+            query: Search query
+            page: Page number
+            now: Current timestamp (defaults to the current time)
+
+        Returns:
+            List of file URLs or None if not cached or expired
+        """
+        path = self._path(query, page)
+        try:
+            if not path.exists():
+                return None
+            entry = orjson.loads(path.read_bytes())
+        except Exception as e:
+            logger.error(f"Error reading search cache for {query} (page {page}): {e}")
+            return None
+
+        if (now or time.time()) - entry["fetched_at"] >= self.ttl:
+            return None
+        return entry["results"]
+
+    def put(
+        self, query: str, page: int, results: Iterable[str], now: Optional[float] = None
+    ) -> None:
+        """
+        Store the results of a search page.
+
+        Args:
+            query: Search query
+            page: Page number
+            results: File URLs found on the page
+            now: Fetch timestamp (defaults to the current time)
+        """
+        entry = {
+            "query": query,
+            "page": page,
+            "fetched_at": now or time.time(),
+            "results": list(results),
+        }
+        try:
+            self._path(query, page).write_bytes(orjson.dumps(entry))
+        except Exception as e:
+            logger.error(f"Error writing search cache for {query} (page {page}): {e}")
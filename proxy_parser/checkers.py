@@ -3,22 +3,267 @@ Proxy checking functionality.
 """
 
 import logging
-from typing import AsyncGenerator, Any
+from contextvars import ContextVar
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Sized,
+    TypeVar,
+)
 import time
 import asyncio
 
-from proxy_parser.config import PROXY_CHECK_URL, PROXY_CHECK_TIMEOUT
-from proxy_parser.http_client import http_client
+from proxy_parser.config import (
+    JUDGE_URL,
+    PROXY_CHECK_URL,
+    PROXY_CHECK_TIMEOUT,
+    CHECK_WORKERS,
+    PRESCREEN_TIMEOUT,
+    PRESCREEN_WORKERS,
+)
+from proxy_parser.http_client import REQUEST_FAILURE, http_client, split_proxy
+from proxy_parser.judge import anonymity_level
+from proxy_parser.limiter import LOCAL_SOCKET_ERRORS
+from proxy_parser.metrics import (
+    CHECKS_FAILED,
+    CHECKS_IN_FLIGHT,
+    CHECKS_STARTED,
+    CHECKS_SUCCEEDED,
+    CHECK_SECONDS,
+    QUEUE_DEPTH,
+)
+from proxy_parser.store import ProxyStore
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+# Every reason a check can fail for; see REQUEST_FAILURE for the request-level ones
+FAILURE_REASONS = frozenset(
+    {"status", "invalid_json", "timeout", "connect_error", "error", "no_ip", "invalid_response"}
+)
+
+# Reason and elapsed time of the last check_proxy of the current task that failed
+CHECK_FAILURE: ContextVar[tuple[str, float] | None] = ContextVar("CHECK_FAILURE", default=None)
+
+
+def record_check(proxy: str, elapsed: float, reason: str | None = None) -> None:
+    """
+    Record the metrics of a check that ran in another process.
+
+    Checker processes and remote workers update their own metrics, which are
+    not served, so the process that collects their results records each
+    outcome again.
+
+    Args:
+        proxy: Proxy string in format protocol://ip:port
+        elapsed: Duration of the check in seconds
+        reason: Failure reason, or None for a working proxy
+    """
+    protocol = proxy.split("://", 1)[0] if "://" in proxy else "http"
+    CHECKS_STARTED.inc(protocol)
+    if reason is None:
+        CHECKS_SUCCEEDED.inc(protocol)
+        CHECK_SECONDS.observe(elapsed, protocol, "working")
+    else:
+        CHECKS_FAILED.inc(protocol, reason)
+        CHECK_SECONDS.observe(elapsed, protocol, "failed")
+
+
+async def _aiter(items: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    """Iterate over a sync or async iterable."""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def bounded_map(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T] | AsyncIterable[T],
+    workers: int,
+    queue_name: str | None = None,
+) -> AsyncGenerator[tuple[T, R | None], None]:
+    """
+    Apply an async function to items using a fixed pool of workers.
+
+    Items are pulled lazily from ``items`` into a bounded queue, so only about
+    ``3 * workers`` items are in flight at any time regardless of the input size.
+
+    Args:
+        func: Coroutine function applied to every item
+        items: Sync or async iterable of items, consumed lazily
+        workers: Number of concurrent workers
+        queue_name: Export the depth of the input queue as this ``queue`` metric label
+
+    Yields:
+        Tuples of (item, result) in completion order; result is None if func raised
+    """
+    if isinstance(items, Sized):
+        workers = min(workers, len(items))
+    workers = max(workers, 1)
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    results: asyncio.Queue = asyncio.Queue(maxsize=workers)
+
+    async def feed() -> None:
+        try:
+            async for item in _aiter(items):
+                await queue.put(item)
+        except Exception as e:
+            logger.error(f"✗ Error reading items for workers: {e}")
+        for _ in range(workers):
+            await queue.put(_DONE)
+
+    async def work() -> None:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                await results.put(_DONE)
+                return
+            try:
+                result = await func(item)
+            except Exception as e:
+                logger.error(f"✗ Error in worker task: {e}")
+                result = None
+            await results.put((item, result))
+
+    tasks = [asyncio.create_task(feed())]
+    tasks.extend(asyncio.create_task(work()) for _ in range(workers))
+    if queue_name:
+        QUEUE_DEPTH.set_function(queue.qsize, queue_name)
+
+    try:
+        finished = 0
+        while finished < workers:
+            entry = await results.get()
+            if entry is _DONE:
+                finished += 1
+                continue
+            yield entry
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if queue_name:
+            QUEUE_DEPTH.set_function(None, queue_name)
+
+
+class TCPPrescreener:
+    """Cheap TCP-connect stage that prunes unreachable proxies before the HTTP check."""
+
+    def __init__(self, timeout: float = PRESCREEN_TIMEOUT, workers: int = PRESCREEN_WORKERS):
+        self.timeout = timeout
+        self.workers = workers
+        self.passed_count = 0
+        self.pruned_count = 0
+
+    async def is_reachable(self, proxy: str) -> bool:
+        """
+        Check whether the proxy accepts a TCP handshake.
+
+        The connection holds a slot of the pre-screen limiter, so the
+        pre-screen stays within its share of the file descriptors. Errors
+        caused by local resource exhaustion (too many open files, no free
+        ports) do not say anything about the proxy, so it is kept in that case.
+
+        Args:
+            proxy: Proxy string in format protocol://ip:port
+
+        Returns:
+            True if the proxy should go on to the full check
+        """
+        try:
+            _, host, port = split_proxy(proxy)
+            async with http_client.prescreen_limiter.slot():
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port), timeout=self.timeout
+                )
+                writer.close()
+        except asyncio.TimeoutError:
+            return False
+        except OSError as e:
+            if e.errno in LOCAL_SOCKET_ERRORS:
+                logger.debug(f"Local socket error while pre-screening {proxy}: {e}")
+                return True
+            return False
+        except ValueError:
+            logger.debug(f"✗ Malformed proxy skipped by pre-screen: {proxy}")
+            return False
+        return True
+
+    async def filter(
+        self, proxies: Iterable[str] | AsyncIterable[str]
+    ) -> AsyncGenerator[str, None]:
+        """
+        Yield only the proxies that accept a TCP connection.
+
+        Args:
+            proxies: Iterable or async iterable of proxy strings
+
+        Yields:
+            Proxy strings that passed the pre-screen
+        """
+        self.passed_count = 0
+        self.pruned_count = 0
+        start_time = asyncio.get_event_loop().time()
+
+        async for proxy, reachable in bounded_map(
+            self.is_reachable, proxies, self.workers, queue_name="prescreen"
+        ):
+            if reachable:
+                self.passed_count += 1
+                yield proxy
+            else:
+                self.pruned_count += 1
+
+        elapsed_time = asyncio.get_event_loop().time() - start_time
+        logger.info(
+            f"✓ TCP pre-screen completed - {self.passed_count} reachable, {self.pruned_count} pruned in {elapsed_time:.2f}s"
+        )
 
 
 class ProxyChecker:
     """Handles proxy checking operations."""
 
-    def __init__(self, timeout: int = PROXY_CHECK_TIMEOUT):
+    def __init__(
+        self,
+        timeout: int = PROXY_CHECK_TIMEOUT,
+        workers: int = CHECK_WORKERS,
+        check_url: str = PROXY_CHECK_URL,
+        store: ProxyStore | None = None,
+    ):
         self.timeout = timeout
+        self.workers = workers
+        self.check_url = check_url
+        self.store = store
+        self.real_ip: str | None = None
+
+    async def detect_real_ip(self) -> str | None:
+        """
+        Ask the judge for our own IP with a direct request.
+
+        The IP is used to tell transparent proxies from anonymous ones when the
+        judge echoes request headers.
+
+        Returns:
+            Our public IP address or None if the judge could not be reached
+        """
+        json_response = await http_client.get_json(self.check_url, timeout=self.timeout)
+        if json_response and json_response.get("query"):
+            self.real_ip = json_response["query"]
+            logger.info(f"Detected own IP via judge: {self.real_ip}")
+        return self.real_ip
 
     async def check_proxy(self, proxy: str) -> tuple[str, dict[str, Any]] | None:
         """
@@ -31,72 +276,123 @@ class ProxyChecker:
             Tuple of (proxy, response_data) or None if check failed
         """
         logger.debug(f"Checking proxy: {proxy}")
+        protocol = proxy.split("://", 1)[0] if "://" in proxy else "http"
+        CHECKS_STARTED.inc(protocol)
+        CHECKS_IN_FLIGHT.inc()
         start = time.perf_counter()
 
         try:
             json_response = await http_client.get_json(
-                PROXY_CHECK_URL, proxy=proxy, timeout=self.timeout
+                self.check_url, proxy=proxy, timeout=self.timeout
             )
             elapsed_time = time.perf_counter() - start
 
             if json_response and "query" in json_response:
                 ip = json_response["query"]
                 if ip:
+                    if "headers" in json_response:
+                        json_response["anonymity"] = anonymity_level(
+                            json_response.pop("headers"), self.real_ip
+                        )
                     logger.debug(
                         f"✓ Proxy {proxy} is working, IP: {ip}, Time: {elapsed_time:.2f}s"
                     )
+                    CHECKS_SUCCEEDED.inc(protocol)
+                    CHECK_SECONDS.observe(elapsed_time, protocol, "working")
                     return proxy, json_response, elapsed_time
                 else:
+                    reason = "no_ip"
                     logger.debug(
                         f"✗ Proxy {proxy} returned no IP, Time: {elapsed_time:.2f}s"
                     )
             else:
+                reason = REQUEST_FAILURE.get() if json_response is None else "invalid_response"
                 logger.debug(
                     f"✗ Proxy {proxy} returned invalid response, Time: {elapsed_time:.2f}s"
                 )
 
         except Exception as e:
             elapsed_time = time.perf_counter() - start
+            reason = "error"
 
             logger.debug(
                 f"✗ Error checking proxy {proxy}: {e}, Time: {elapsed_time:.2f}s"
             )
+        finally:
+            CHECKS_IN_FLIGHT.dec()
 
+        CHECKS_FAILED.inc(protocol, reason)
+        CHECK_SECONDS.observe(elapsed_time, protocol, "failed")
+        CHECK_FAILURE.set((reason, elapsed_time))
         return None
 
+    async def check_proxy_outcome(
+        self, proxy: str
+    ) -> tuple[tuple[str, dict[str, Any], float] | None, str | None, float]:
+        """
+        Check a proxy and report the outcome to the process that collects it.
+
+        Args:
+            proxy: Proxy string in format protocol://ip:port
+
+        Returns:
+            Tuple of (check_proxy result, failure reason or None, elapsed_time)
+        """
+        CHECK_FAILURE.set(None)
+        result = await self.check_proxy(proxy)
+        if result:
+            return result, None, result[2]
+        reason, elapsed_time = CHECK_FAILURE.get() or ("error", 0.0)
+        return None, reason, elapsed_time
+
     async def check_proxies_generator(
-        self, proxies: set[str]
+        self,
+        proxies: Iterable[str] | AsyncIterable[str],
+        workers: int | None = None,
     ) -> AsyncGenerator[tuple[str, dict[str, Any], float], None]:
         """
-        Check multiple proxies concurrently.
+        Check multiple proxies concurrently with a bounded pool of workers.
+
+        Proxies are consumed lazily, so ``proxies`` may be a set, a generator over
+        a file or an async iterable; memory stays flat regardless of input size.
 
         Args:
-            proxies: Set of proxy strings
+            proxies: Iterable or async iterable of proxy strings
+            workers: Number of concurrent checks (defaults to ``self.workers``)
 
         Yields:
-            Tuples of (proxy, response_data) for working proxies
+            Tuples of (proxy, response_data, elapsed_time) for working proxies
         """
-        logger.info(f"Starting to check {len(proxies)} proxies concurrently")
-        start_time = asyncio.get_event_loop().time()
+        workers = workers or self.workers
+        if JUDGE_URL and self.real_ip is None:
+            await self.detect_real_ip()
 
-        # Create tasks for all proxies
-        tasks = [asyncio.create_task(self.check_proxy(proxy)) for proxy in proxies]
+        total = len(proxies) if isinstance(proxies, Sized) else "streamed"
+        logger.info(f"Starting to check {total} proxies with {workers} workers")
+        start_time = asyncio.get_event_loop().time()
 
-        # Process results as they complete
         working_count = 0
         failed_count = 0
+        outcomes: list[tuple[str, float | None]] = []
+
+        try:
+            async for proxy, proxy_result in bounded_map(
+                self.check_proxy, proxies, workers, queue_name="check"
+            ):
+                if self.store:
+                    outcomes.append((proxy, proxy_result[2] if proxy_result else None))
+                    if len(outcomes) >= self.store.batch_size:
+                        await self.store.run(self.store.record_results, outcomes)
+                        outcomes = []
 
-        for result in asyncio.as_completed(tasks):
-            try:
-                proxy_result = await result
                 if proxy_result:
                     working_count += 1
                     yield proxy_result
                 else:
                     failed_count += 1
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"✗ Error in proxy checking task: {e}")
+        finally:
+            if self.store and outcomes:
+                await self.store.run(self.store.record_results, outcomes)
 
         elapsed_time = asyncio.get_event_loop().time() - start_time
         logger.info(
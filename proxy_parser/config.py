@@ -1,4 +1,3 @@
-import asyncio
 import re
 from configparser import ConfigParser
 from pathlib import Path
@@ -21,15 +20,34 @@ PROXIES_PATH.mkdir(parents=True, exist_ok=True)
 
 NOT_CHECKED_PROXIES_FILE = Path(PROXIES_PATH, "unchecked_proxies.txt")
 CHECKED_PROXIES_FILE = Path(PROXIES_PATH, "parsed.jsonl")
+STATE_DB_FILE = Path(PROXIES_PATH, "state.sqlite3")
+CACHE_PATH: Path = Path(PROXIES_PATH, "cache")
+SOURCE_CACHE_PATH: Path = Path(CACHE_PATH, "sources")
+SEARCH_CACHE_PATH: Path = Path(CACHE_PATH, "search")
 
 # Network settings
 MAX_CONNECTIONS: int = GENERAL.getint("MaxConnections", "1000")
 TIMEOUT: int = GENERAL.getint("Timeout", "10")
 INF_MAIN_TIMEOUT_SECONDS: int = GENERAL.getint("MainTimeout", "240")
 DEPTH = GENERAL.getint("ParsingDepth", "7")
+GITHUB_RATE_LIMIT: float = GENERAL.getfloat("GitHubRateLimit", 2.0)  # search requests per second
+GITHUB_SEARCH_TTL: int = GENERAL.getint("GitHubSearchTTL", "3600")  # 0 disables the cache
+SOURCE_CACHE_ENABLED: bool = GENERAL.getboolean("SourceCache", True)
+MAX_SOURCE_BYTES: int = GENERAL.getint("MaxSourceBytes", str(64 * 1024 * 1024))
+CHECK_WORKERS: int = GENERAL.getint("CheckWorkers", str(MAX_CONNECTIONS))
+CHECK_PROCESSES: int = GENERAL.getint("CheckProcesses", "1")
+SHARD_BATCH_SIZE: int = GENERAL.getint("ShardBatchSize", "500")
 
-# Semaphore for connection limiting
-SEMAPHORE = asyncio.Semaphore(MAX_CONNECTIONS)
+# Adaptive concurrency settings: MaxConnections and FetchConnections are the
+# starting check and fetch limits, capped by the open files limit
+ADAPTIVE_CONCURRENCY: bool = GENERAL.getboolean("AdaptiveConcurrency", True)
+FETCH_CONNECTIONS: int = GENERAL.getint("FetchConnections", "100")
+MIN_CONNECTIONS: int = GENERAL.getint("MinConnections", "10")
+CONCURRENCY_WINDOW: int = GENERAL.getint("ConcurrencyWindow", "200")  # requests per adjustment
+CONCURRENCY_INCREASE: int = GENERAL.getint("ConcurrencyIncrease", "10")
+CONCURRENCY_DECREASE: float = GENERAL.getfloat("ConcurrencyDecrease", 0.5)
+ERROR_TOLERANCE: float = GENERAL.getfloat("ErrorTolerance", 0.1)
+MAX_LOOP_LAG: float = GENERAL.getfloat("MaxLoopLag", 0.25)  # seconds
 
 # Regex pattern for IP:port matching
 REGEX_PATTERN: re.Pattern = re.compile(
@@ -71,5 +89,60 @@ DEFAULT_HEADERS: Dict[str, str] = {
 }
 
 # Proxy checking settings
-PROXY_CHECK_URL = "http://ip-api.com/json/?fields=8217"
+# JudgeURL points checks at a self-hosted judge (see `--judge`) instead of ip-api.com
+JUDGE_URL: str = GENERAL.get("JudgeURL", "")
+JUDGE_HOST: str = GENERAL.get("JudgeHost", "0.0.0.0")
+JUDGE_PORT: int = GENERAL.getint("JudgePort", "8899")
+# ip-api fields bitmask: query (8192), city (16), regionName (8), countryCode (2), country (1)
+PROXY_CHECK_URL = JUDGE_URL or "http://ip-api.com/json/?fields=8219"
 PROXY_CHECK_TIMEOUT = GENERAL.getint("ProxyCheckTimeout", "2")
+
+# Proxy state store settings
+STATE_STORE_ENABLED: bool = GENERAL.getboolean("StateStore", True)
+STORE_BATCH_SIZE: int = GENERAL.getint("StateBatchSize", "1000")
+LATENCY_HISTORY_SIZE: int = GENERAL.getint("LatencyHistory", "20")
+
+# Recheck scheduler settings (requires the state store)
+SCHEDULER_ENABLED: bool = GENERAL.getboolean("Scheduler", True)
+CHECK_BUDGET: int = GENERAL.getint("CheckBudget", "0")  # 0 means no cap
+BACKOFF_BASE_SECONDS: int = GENERAL.getint("BackoffBase", "600")
+BACKOFF_MAX_SECONDS: int = GENERAL.getint("BackoffMax", "86400")
+
+# Source ranking settings (requires the state store)
+SOURCE_RANKING_ENABLED: bool = GENERAL.getboolean("SourceRanking", True)
+SOURCE_MAX_FAILURES: int = GENERAL.getint("SourceMaxFailures", "5")  # 0 never prunes
+SOURCE_MIN_FETCHES: int = GENERAL.getint("SourceMinFetches", "5")  # 0 never demotes
+SOURCE_DEMOTED_INTERVAL: int = GENERAL.getint("SourceDemotedInterval", "86400")
+SOURCE_BACKOFF_BASE: int = GENERAL.getint("SourceBackoffBase", "600")
+
+# Pipelined cycle settings
+PIPELINE_ENABLED: bool = GENERAL.getboolean("Pipeline", False)
+PIPELINE_QUEUE_SIZE: int = GENERAL.getint("PipelineQueueSize", "10000")
+
+# Result writer settings
+WRITER_BATCH_SIZE: int = GENERAL.getint("WriterBatchSize", "1000")
+WRITER_FLUSH_SECONDS: float = GENERAL.getfloat("WriterFlushSeconds", 1.0)
+WRITER_FSYNC: str = GENERAL.get("WriterFsync", "none")  # none, periodic or batch
+WRITER_FSYNC_SECONDS: float = GENERAL.getfloat("WriterFsyncSeconds", 5.0)
+KEEP_GENERATIONS: int = GENERAL.getint("KeepGenerations", "0")  # previous parsed.jsonl snapshots kept
+
+# Query API settings (--serve)
+API_HOST: str = GENERAL.get("ApiHost", "127.0.0.1")
+API_PORT: int = GENERAL.getint("ApiPort", "8898")
+API_REFRESH_SECONDS: float = GENERAL.getfloat("ApiRefreshSeconds", 2.0)
+
+# Metrics endpoint settings (0 disables the endpoint; metrics are always recorded)
+METRICS_HOST: str = GENERAL.get("MetricsHost", "127.0.0.1")
+METRICS_PORT: int = GENERAL.getint("MetricsPort", "0")
+
+# Distributed checking settings (--coordinator / --worker)
+COORDINATOR_HOST: str = GENERAL.get("CoordinatorHost", "127.0.0.1")
+COORDINATOR_PORT: int = GENERAL.getint("CoordinatorPort", "8897")
+COORDINATOR_TOKEN: str = GENERAL.get("CoordinatorToken", "")  # shared secret, empty for none
+LEASE_BATCH_SIZE: int = GENERAL.getint("LeaseBatchSize", "1000")
+LEASE_SECONDS: int = GENERAL.getint("LeaseSeconds", "120")
+
+# TCP pre-screen settings
+PRESCREEN_ENABLED: bool = GENERAL.getboolean("Prescreen", False)
+PRESCREEN_TIMEOUT: float = GENERAL.getfloat("PrescreenTimeout", 1.5)
+PRESCREEN_WORKERS: int = GENERAL.getint("PrescreenWorkers", "10000")
@@ -0,0 +1,388 @@
+"""
+Distributed checking: a coordinator leases candidate batches to remote workers.
+
+The protocol is one JSON object per line over TCP. A worker first sends
+``{"type": "hello", "token": ...}``, which must carry the shared token when the
+coordinator has one, and gets ``{"type": "ack"}``. It then sends
+``{"type": "lease"}`` and gets ``{"type": "batch", "id": ..., "proxies": [...]}``
+or ``{"type": "wait", "retry": seconds}``; it reports with
+``{"type": "results", "id": ..., "results": [[proxy, data, elapsed, reason], ...]}``
+(data is null and reason says why for failed checks, reason is null for
+working ones) and gets ``{"type": "ack"}``.
+Only results for proxies of a lease the reporting connection holds are
+accepted; leased proxies missing from the report, like a lease that is not
+reported before it expires or whose connection drops, are put back in the
+queue for another worker. The coordinator records the check metrics of every
+accepted result.
+"""
+
+import asyncio
+import hmac
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, AsyncIterable, AsyncIterator, Iterable, Optional
+
+import orjson
+
+from proxy_parser.checkers import (
+    FAILURE_REASONS,
+    ProxyChecker,
+    _aiter,
+    bounded_map,
+    record_check,
+)
+from proxy_parser.config import (
+    COORDINATOR_HOST,
+    COORDINATOR_PORT,
+    COORDINATOR_TOKEN,
+    JUDGE_URL,
+    LEASE_BATCH_SIZE,
+    LEASE_SECONDS,
+)
+from proxy_parser.store import ProxyStore
+
+logger = logging.getLogger(__name__)
+
+# Seconds a worker waits before asking again when there is no work
+WAIT_SECONDS = 1.0
+
+_DONE = object()
+
+
+@dataclass
+class Lease:
+    """A batch handed to a worker."""
+
+    proxies: list[str]
+    deadline: float
+
+
+@dataclass
+class _Job:
+    """Candidates of one check_proxies_generator call."""
+
+    source: AsyncIterator[str]
+    requeued: deque = field(default_factory=deque)
+    leases: dict[int, Lease] = field(default_factory=dict)
+    results: asyncio.Queue = field(default_factory=asyncio.Queue)
+    exhausted: bool = False
+    finished: bool = False
+    pull_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict[str, Any]) -> None:
+    writer.write(orjson.dumps(message) + b"\n")
+    await writer.drain()
+
+
+class Coordinator:
+    """
+    Own the candidates of a check and lease them to workers in batches.
+
+    ``check_proxies_generator`` matches ``ProxyChecker`` so the orchestrator can
+    use a coordinator in its place; the server stays up across calls, so
+    workers stay connected between cycles and are told to wait meanwhile.
+    """
+
+    def __init__(
+        self,
+        host: str = COORDINATOR_HOST,
+        port: int = COORDINATOR_PORT,
+        batch_size: int = LEASE_BATCH_SIZE,
+        lease_seconds: float = LEASE_SECONDS,
+        store: Optional[ProxyStore] = None,
+        token: str = COORDINATOR_TOKEN,
+    ):
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.store = store
+        self.token = token
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+        self._job: Optional[_Job] = None
+        self._lease_ids = itertools.count(1)
+
+    async def start(self) -> None:
+        """Start listening for workers; the bound port is stored in ``port``."""
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Coordinator listening on {self.host}:{self.port}")
+
+    async def close(self) -> None:
+        """Stop the server and drop worker connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        for handler in list(self._handlers):
+            handler.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _pull(self, job: _Job) -> list[str]:
+        """Take the next batch: requeued leases first, then fresh candidates."""
+        if job.requeued:
+            return job.requeued.popleft()
+        batch: list[str] = []
+        async with job.pull_lock:
+            while not job.exhausted and len(batch) < self.batch_size:
+                try:
+                    batch.append(await anext(job.source))
+                except StopAsyncIteration:
+                    job.exhausted = True
+        return batch
+
+    def _check_finished(self, job: _Job) -> None:
+        if job.exhausted and not job.requeued and not job.leases and not job.finished:
+            job.finished = True
+            job.results.put_nowait(_DONE)
+
+    def _requeue(self, job: _Job, lease_id: int, reason: str) -> None:
+        lease = job.leases.pop(lease_id, None)
+        if lease is not None:
+            logger.warning(f"Re-queueing lease {lease_id} ({len(lease.proxies)} proxies): {reason}")
+            job.requeued.append(lease.proxies)
+
+    def _requeue_expired(self, job: _Job) -> None:
+        now = time.monotonic()
+        for lease_id, lease in list(job.leases.items()):
+            if lease.deadline <= now:
+                self._requeue(job, lease_id, "lease expired")
+
+    async def _lease(self, owned: set[int]) -> dict[str, Any]:
+        job = self._job
+        if job is None or job.finished:
+            return {"type": "wait", "retry": WAIT_SECONDS}
+
+        self._requeue_expired(job)
+        batch = await self._pull(job)
+        if not batch:
+            self._check_finished(job)
+            return {"type": "wait", "retry": WAIT_SECONDS}
+
+        lease_id = next(self._lease_ids)
+        job.leases[lease_id] = Lease(batch, time.monotonic() + self.lease_seconds)
+        owned.add(lease_id)
+        return {"type": "batch", "id": lease_id, "proxies": batch}
+
+    def _complete(self, message: dict[str, Any], owned: set[int]) -> dict[str, Any]:
+        job = self._job
+        lease_id = message.get("id")
+        if not isinstance(lease_id, int) or lease_id not in owned:
+            logger.warning(f"Ignoring results for lease {lease_id!r} not held by this worker")
+            return {"type": "ack", "accepted": False}
+        owned.discard(lease_id)
+        lease = job.leases.pop(lease_id, None) if job else None
+        if lease is None:
+            # Expired and handed to someone else already
+            logger.debug(f"Ignoring results for unknown lease {lease_id}")
+            return {"type": "ack", "accepted": False}
+
+        missing = dict.fromkeys(lease.proxies)
+        for entry in message.get("results", []):
+            try:
+                proxy, data, elapsed, reason = entry
+            except (TypeError, ValueError):
+                continue
+            if (
+                proxy not in missing
+                or not (data is None or isinstance(data, dict))
+                or not isinstance(elapsed, (int, float))
+            ):
+                continue
+            del missing[proxy]
+            if data:
+                job.results.put_nowait((proxy, data, elapsed, None))
+                continue
+            # An empty answer is a failed check, whatever the worker says
+            if reason not in FAILURE_REASONS:
+                reason = "error" if data is None else "invalid_response"
+            job.results.put_nowait((proxy, None, elapsed, reason))
+
+        if missing:
+            logger.warning(
+                f"Re-queueing {len(missing)} proxies of lease {lease_id} missing from its report"
+            )
+            job.requeued.append(list(missing))
+        self._check_finished(job)
+        return {"type": "ack", "accepted": True}
+
+    def _authorized(self, message: dict[str, Any]) -> bool:
+        token = message.get("token")
+        return not self.token or (
+            isinstance(token, str) and hmac.compare_digest(token.encode(), self.token.encode())
+        )
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one worker connection."""
+        peer = writer.get_extra_info("peername")
+        logger.info(f"Worker connected from {peer}")
+        owned: set[int] = set()
+        self._writers.add(writer)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            hello = orjson.loads(await reader.readline() or b"{}")
+            if hello.get("type") != "hello" or not self._authorized(hello):
+                logger.warning(f"Rejected worker {peer}: missing or wrong token")
+                await _send(writer, {"type": "error", "error": "unauthorized"})
+                return
+            await _send(writer, {"type": "ack"})
+
+            while line := await reader.readline():
+                message = orjson.loads(line)
+                if message.get("type") == "lease":
+                    reply = await self._lease(owned)
+                elif message.get("type") == "results":
+                    reply = self._complete(message, owned)
+                else:
+                    reply = {"type": "error", "error": f"unknown message {message.get('type')!r}"}
+                await _send(writer, reply)
+        except (ConnectionError, orjson.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"Worker {peer} dropped: {e}")
+        finally:
+            self._handlers.discard(handler)
+            if self._job:
+                for lease_id in owned:
+                    self._requeue(self._job, lease_id, f"worker {peer} disconnected")
+                self._check_finished(self._job)
+            self._writers.discard(writer)
+            writer.close()
+            logger.info(f"Worker {peer} disconnected")
+
+    async def _reap(self, job: _Job) -> None:
+        """Requeue expired leases even when no worker asks for work."""
+        while True:
+            await asyncio.sleep(max(self.lease_seconds / 4, 0.05))
+            self._requeue_expired(job)
+
+    async def check_proxies_generator(
+        self, proxies: Iterable[str] | AsyncIterable[str]
+    ) -> AsyncGenerator[tuple[str, dict[str, Any], float], None]:
+        """
+        Serve proxies to connected workers and stream back their results.
+
+        Args:
+            proxies: Iterable or async iterable of proxy strings
+
+        Yields:
+            Tuples of (proxy, response_data, elapsed_time) for working proxies
+        """
+        await self.start()
+        job = _Job(source=_aiter(proxies))
+        self._job = job
+
+        # Pull the first batch now, so an empty input finishes without any worker
+        first_batch = await self._pull(job)
+        if first_batch:
+            job.requeued.append(first_batch)
+        self._check_finished(job)
+
+        reaper = asyncio.create_task(self._reap(job))
+        working_count = 0
+        failed_count = 0
+        outcomes: list[tuple[str, float | None]] = []
+        start_time = asyncio.get_event_loop().time()
+
+        try:
+            while (entry := await job.results.get()) is not _DONE:
+                proxy, data, elapsed, reason = entry
+                record_check(proxy, elapsed, reason)
+                if self.store:
+                    outcomes.append((proxy, elapsed if data else None))
+                    if len(outcomes) >= self.store.batch_size:
+                        await self.store.run(self.store.record_results, outcomes)
+                        outcomes = []
+                if data:
+                    working_count += 1
+                    yield proxy, data, elapsed
+                else:
+                    failed_count += 1
+        finally:
+            reaper.cancel()
+            await asyncio.gather(reaper, return_exceptions=True)
+            if self.store and outcomes:
+                await self.store.run(self.store.record_results, outcomes)
+            job.finished = True
+            self._job = None
+
+        elapsed_time = asyncio.get_event_loop().time() - start_time
+        logger.info(
+            f"✓ Distributed checking completed - {working_count} working, {failed_count} failed in {elapsed_time:.2f}s"
+        )
+
+
+class DistributedWorker:
+    """
+    Check batches leased from a coordinator.
+
+    ``sessions`` connections lease batches independently, so a new batch is
+    already being checked while the slowest proxies of the previous one time out.
+    The checker's workers are split between the sessions.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        checker: Optional[ProxyChecker] = None,
+        sessions: int = 2,
+        token: str = COORDINATOR_TOKEN,
+    ):
+        self.host = host
+        self.port = port
+        self.checker = checker or ProxyChecker()
+        self.sessions = sessions
+        self.token = token
+        self.checked_count = 0
+
+    async def run(self) -> None:
+        """Work until the coordinator closes the connections."""
+        if JUDGE_URL and self.checker.real_ip is None:
+            await self.checker.detect_real_ip()
+        await asyncio.gather(*(self._session() for _ in range(self.sessions)))
+
+    async def _request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, message: dict[str, Any]
+    ) -> Optional[dict[str, Any]]:
+        await _send(writer, message)
+        line = await reader.readline()
+        return orjson.loads(line) if line else None
+
+    async def _session(self) -> None:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        workers = max(1, self.checker.workers // self.sessions)
+        try:
+            reply = await self._request(reader, writer, {"type": "hello", "token": self.token})
+            if reply is None or reply["type"] != "ack":
+                logger.error(f"Coordinator {self.host}:{self.port} rejected this worker's token")
+                return
+            while (reply := await self._request(reader, writer, {"type": "lease"})) is not None:
+                if reply["type"] != "batch":
+                    await asyncio.sleep(reply.get("retry", WAIT_SECONDS))
+                    continue
+
+                results = []
+                async for proxy, (result, reason, elapsed) in bounded_map(
+                    self.checker.check_proxy_outcome, reply["proxies"], workers
+                ):
+                    results.append([proxy, result[1] if result else None, elapsed, reason])
+                self.checked_count += len(results)
+
+                message = {"type": "results", "id": reply["id"], "results": results}
+                if await self._request(reader, writer, message) is None:
+                    break
+        except ConnectionError as e:
+            logger.warning(f"Lost connection to coordinator {self.host}:{self.port}: {e}")
+        finally:
+            writer.close()
@@ -0,0 +1,144 @@
+"""
+Incremental ip:port extraction from source bodies.
+"""
+
+import re
+from typing import Callable, Iterable, Iterator
+
+from proxy_parser.config import REGEX_PATTERN
+
+# REGEX_PATTERN applied to raw bytes, so bodies never have to be decoded
+BYTES_PATTERN: re.Pattern = re.compile(REGEX_PATTERN.pattern.encode())
+
+# Shape of an ip:port without range checks; every REGEX_PATTERN match is one of these
+CANDIDATE_PATTERN: re.Pattern = re.compile(
+    rb"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d{1,5}(?!\d)"
+)
+_CANDIDATE_GROUPS: re.Pattern = re.compile(
+    rb"(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3}):(\d{1,5})(?!\d)"
+)
+
+# Matches somewhere in "\n" + newline-joined candidates iff one of them is out of
+# range: a first octet of 0, leading zeros, an octet above 255 or a port above 65535.
+# Every branch starts at a separator so the scan can skip over digits quickly.
+INVALID_CANDIDATE_PATTERN: re.Pattern = re.compile(
+    rb"[\n.:](?:0\d"
+    rb"|(?<=\n)0"
+    rb"|(?<=[\n.])(?:25[6-9]|2[6-9]\d|[3-9]\d\d)[.:]"
+    rb"|(?<=:)(?:[7-9]\d{4}|6[6-9]\d{3}|65[6-9]\d\d|655[4-9]\d|6553[6-9])(?:\n|$))"
+)
+
+# Bytes that can be part of an ip:port match; a match never spans anything else
+_MATCH_BYTES = frozenset(b"0123456789.:")
+
+# Longest run of match bytes carried between chunks before it is scanned anyway
+MAX_CARRY = 64 * 1024
+
+
+def _in_range(value: bytes, maximum: int) -> bool:
+    """Check a digit run has no leading zero and does not exceed maximum."""
+    return (len(value) == 1 or value[0] != 48) and int(value) <= maximum
+
+
+def _validated_proxies(data: bytes) -> Iterator[str]:
+    """Scan candidates one by one, retrying one byte later after an invalid one."""
+    search = _CANDIDATE_GROUPS.search
+    match = search(data)
+    while match:
+        first, second, third, fourth, port = match.groups()
+        if (
+            first[0] != 48
+            and int(first) <= 255
+            and _in_range(second, 255)
+            and _in_range(third, 255)
+            and _in_range(fourth, 255)
+            and _in_range(port, 65535)
+        ):
+            yield match[0].decode("ascii")
+            match = search(data, match.end())
+        else:
+            # REGEX_PATTERN may still match from inside the first octet, e.g. "34.1.1.1:80"
+            # in "1234.1.1.1:80", so only skip one byte
+            match = search(data, match.start() + 1)
+
+
+def find_proxies(data: bytes) -> list[str]:
+    """
+    Find ip:port strings in a body, exactly as ``REGEX_PATTERN.finditer`` would.
+
+    A permissive pattern finds candidates and a second pass over the joined
+    candidates checks the numeric ranges. When every candidate is valid (the
+    usual case for proxy lists) they are the result as is; otherwise the body is
+    rescanned validating each candidate in Python. Only ASCII digits are treated
+    as digits, unlike ``REGEX_PATTERN`` on decoded text.
+
+    Args:
+        data: Raw body bytes
+
+    Returns:
+        Proxy strings in order of appearance
+    """
+    candidates = CANDIDATE_PATTERN.findall(data)
+    if not candidates:
+        return []
+    joined = b"\n".join(candidates)
+    if INVALID_CANDIDATE_PATTERN.search(b"\n" + joined) is None:
+        return joined.decode("ascii").split("\n")
+    return list(_validated_proxies(data))
+
+
+def regex_proxies(data: bytes) -> Iterator[str]:
+    """Find ip:port strings with ``BYTES_PATTERN``; the reference for ``find_proxies``."""
+    for match in BYTES_PATTERN.finditer(data):
+        proxy = match.group(1)
+        if proxy:
+            yield proxy.decode("ascii")
+
+
+class ProxyExtractor:
+    """
+    Extract ip:port strings from a body delivered in byte chunks.
+
+    A chunk is scanned up to its last byte that cannot be part of a match; the
+    remainder is carried into the next chunk, so matches split across chunk
+    boundaries are found exactly once and memory stays proportional to the chunk
+    size. Results match ``REGEX_PATTERN`` over the whole body for ASCII digits.
+    """
+
+    def __init__(self, scan: Callable[[bytes], Iterable[str]] = find_proxies):
+        self._scan = scan
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> Iterator[str]:
+        """
+        Consume the next chunk of the body.
+
+        Args:
+            chunk: Next bytes of the body
+
+        Yields:
+            Proxy strings completed by this chunk
+        """
+        data = self._carry + chunk
+        cut = len(data)
+        while cut and data[cut - 1] in _MATCH_BYTES:
+            cut -= 1
+
+        if cut == 0 and len(data) <= MAX_CARRY:
+            self._carry = data
+            return
+
+        if cut == 0:
+            cut = len(data)
+        self._carry = data[cut:]
+        yield from self._scan(data[:cut])
+
+    def flush(self) -> Iterator[str]:
+        """
+        Finish the body and scan whatever was carried over.
+
+        Yields:
+            Remaining proxy strings
+        """
+        data, self._carry = self._carry, b""
+        yield from self._scan(data)
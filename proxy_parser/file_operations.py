@@ -1,7 +1,7 @@
 """
 File operations for proxy parsing.
 """
-from typing import List
+from typing import Iterable, Iterator, List
 from pathlib import Path
 
 import orjson
@@ -87,19 +87,47 @@ class FileManager:
             logger.error(f"Error reading file {file_path}: {e}")
             return []
 
-    def write_lines(self, file_path: Path, lines: List[str]) -> None:
+    def iter_lines(self, file_path: Path) -> Iterator[str]:
+        """
+        Lazily iterate over the non-empty lines of a file.
+
+        Unlike ``read_lines`` the file is never held in memory as a whole, so this
+        is suitable for feeding very large candidate lists into the checker.
+
+        Args:
+            file_path: Path to the file
+
+        Yields:
+            Lines (without newlines)
+        """
+        if not file_path.exists():
+            logger.warning(f"File does not exist: {file_path}")
+            return
+
+        try:
+            with file_path.open("r", encoding="utf-8") as file:
+                for line in file:
+                    line = line.strip()
+                    if line:
+                        yield line
+        except Exception as e:
+            logger.error(f"Error reading file {file_path}: {e}")
+
+    def write_lines(self, file_path: Path, lines: Iterable[str]) -> None:
         """
         Write lines to a file.
 
         Args:
             file_path: Path to the file
-            lines: List of strings to write
+            lines: Strings to write, consumed lazily
         """
         try:
+            count = 0
             with file_path.open("w", encoding="utf-8") as file:
                 for line in lines:
                     file.write(f"{line}\n")
-            logger.debug(f"Wrote {len(lines)} lines to file: {file_path}")
+                    count += 1
+            logger.debug(f"Wrote {count} lines to file: {file_path}")
         except Exception as e:
             logger.error(f"Error writing to file {file_path}: {e}")
 
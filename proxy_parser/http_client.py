@@ -2,75 +2,294 @@
 HTTP client utilities for proxy parsing.
 """
 import aiohttp as aio
+import html
+import re
 import time
 import asyncio
-from typing import Optional, Dict, Any, List
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Callable, List, NamedTuple, Set
+from urllib.parse import urlsplit
 import httpx
-import requests
-from bs4 import BeautifulSoup
+import orjson
 from loguru import logger
 
-from proxy_parser.config import SEMAPHORE, DEFAULT_HEADERS, MAX_CONNECTIONS
+from proxy_parser.config import (
+    DEFAULT_HEADERS,
+    FETCH_CONNECTIONS,
+    MAX_CONNECTIONS,
+    MAX_SOURCE_BYTES,
+    PRESCREEN_WORKERS,
+    DEPTH,
+    GITHUB_RATE_LIMIT,
+)
+from proxy_parser.cache import SearchCache
+from proxy_parser.limiter import AdaptiveLimiter, LoopLagMonitor, connection_budgets
+from proxy_parser.metrics import (
+    CONCURRENCY_LIMIT,
+    EVENT_LOOP_LAG,
+    GITHUB_SEARCHES,
+    GITHUB_SEARCH_SECONDS,
+    SOURCE_BYTES,
+    SOURCE_FETCHES,
+    SOURCE_FETCH_SECONDS,
+)
+from proxy_parser.socks import SOCKS_PROTOCOLS, socks_http_get
+
+# Headers sent to the judge through SOCKS proxies
+SOCKS_CHECK_HEADERS: Dict[str, str] = {
+    "User-Agent": DEFAULT_HEADERS["User-Agent"],
+    "Accept": "application/json",
+}
+
+# Why the last get_json of the current task returned None: "status", "invalid_json",
+# "timeout", "connect_error" or "error"
+REQUEST_FAILURE: ContextVar[str] = ContextVar("REQUEST_FAILURE", default="error")
+
+# HTTP status of the last fetch_chunks of the current task; None if no answer came
+FETCH_STATUS: ContextVar[Optional[int]] = ContextVar("FETCH_STATUS", default=None)
+
+
+class TextResponse(NamedTuple):
+    """Status and validators of a source fetch; the body goes to the caller's consumer."""
+
+    status: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+def to_raw_url(url: str) -> str:
+    """
+    Rewrite a GitHub blob link to its raw-content form.
+
+    ``https://github.com/<owner>/<repo>/blob/<ref>/<path>#L4`` becomes
+    ``https://raw.githubusercontent.com/<owner>/<repo>/<ref>/<path>``, so only the
+    file itself is downloaded instead of the rendered HTML page. Other URLs are
+    returned unchanged.
+
+    Args:
+        url: Source URL
+
+    Returns:
+        Raw-content URL
+    """
+    parts = urlsplit(url)
+    if parts.netloc not in ("github.com", "www.github.com"):
+        return url
+
+    segments = parts.path.split("/")
+    # ['', owner, repo, 'blob', ref, *path]
+    if len(segments) < 6 or segments[3] != "blob":
+        return url
+
+    owner, repo, ref = segments[1], segments[2], segments[4]
+    path = "/".join(segments[5:])
+    return f"https://raw.githubusercontent.com/{owner}/{repo}/{ref}/{path}"
+
+
+def split_proxy(proxy: str) -> tuple[str, str, int]:
+    """
+    Split a proxy string into its parts.
+
+    Args:
+        proxy: Proxy string in format protocol://ip:port or ip:port
+
+    Returns:
+        Tuple of (protocol, host, port); protocol defaults to "http"
+    """
+    protocol, _, address = proxy.rpartition("://")
+    host, _, port = address.rpartition(":")
+    return protocol or "http", host, int(port)
 
 
 class HTTPClient:
-    """HTTP client for making requests with proper error handling."""
+    """
+    HTTP client for making requests with proper error handling.
+
+    Source fetches, proxy checks and TCP pre-screens take slots of separate
+    adaptive limiters, so none of them can starve the others of sockets.
+    """
 
     def __init__(self, headers: Optional[Dict[str, str]] = None):
         self.headers = headers or DEFAULT_HEADERS.copy()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._session: Optional[aio.ClientSession] = None
+
+        fetch_budget, check_budget, prescreen_budget = connection_budgets()
+        self.lag_monitor = LoopLagMonitor()
+        self.fetch_limiter = AdaptiveLimiter(
+            "fetch",
+            FETCH_CONNECTIONS,
+            maximum=fetch_budget,
+            lag_monitor=self.lag_monitor,
+            timeout_errors=(TimeoutError, httpx.TimeoutException),
+        )
+        self.check_limiter = AdaptiveLimiter(
+            "check", MAX_CONNECTIONS, maximum=check_budget, lag_monitor=self.lag_monitor
+        )
+        self.prescreen_limiter = AdaptiveLimiter(
+            "prescreen", PRESCREEN_WORKERS, maximum=prescreen_budget, lag_monitor=self.lag_monitor
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the pooled client used for source fetching, creating it on first use.
+
+        The client lives until ``aclose`` is called, so every source fetched during
+        a run (or during the whole process in infinite mode) shares one keep-alive
+        pool, TLS sessions and DNS results.
+
+        Returns:
+            Shared httpx.AsyncClient instance
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=self.fetch_limiter.maximum,
+                    max_keepalive_connections=self.fetch_limiter.maximum,
+                ),
+            )
+            logger.debug("Created pooled HTTP client for source fetching")
+        return self._client
+
+    def _get_session(self) -> aio.ClientSession:
+        """
+        Return the shared aiohttp session used for proxy checks, creating it on first use.
 
-    async def get_text(self, url: str, timeout: int = 10) -> Optional[str]:
+        Every check goes through a different proxy, so the connector does not keep
+        connections alive or cap connections per host; it only bounds the total
+        number of sockets (the check limiter keeps below that) and caches DNS
+        lookups of the judge host. The proxy is passed per request.
+
+        Returns:
+            Shared aiohttp.ClientSession instance
         """
-        Fetch text content from URL with proper error handling.
+        if self._session is None or self._session.closed:
+            connector = aio.TCPConnector(
+                limit=self.check_limiter.maximum,
+                limit_per_host=0,
+                force_close=True,
+                ttl_dns_cache=300,
+            )
+            self._session = aio.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                cookie_jar=aio.DummyCookieJar(),
+            )
+            logger.debug("Created shared aiohttp session for proxy checks")
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close pooled clients and release their connections."""
+        await self.lag_monitor.stop()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.debug("Closed pooled HTTP client")
+        self._client = None
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.debug("Closed shared aiohttp session")
+        self._session = None
+
+    async def fetch_chunks(
+        self,
+        url: str,
+        consume: Callable[[bytes], None],
+        timeout: int = 10,
+        validators: Optional[Dict[str, str]] = None,
+    ) -> Optional[TextResponse]:
+        """
+        Stream the body of URL chunk by chunk, optionally as a conditional GET.
+
+        The body is never buffered as a whole; every chunk is handed to ``consume``
+        as it arrives, until MAX_SOURCE_BYTES have been read.
 
         Args:
             url: URL to fetch
+            consume: Called with each body chunk of a 200 answer
             timeout: Request timeout in seconds
+            validators: If-None-Match / If-Modified-Since headers from a previous fetch
 
         Returns:
-            Text content or None if request failed
+            TextResponse for a 200 or 304 answer, None if the request
+            failed; the status of a failed request is left in FETCH_STATUS
         """
         logger.debug(f"Making GET request to: {url}")
         start_time = asyncio.get_event_loop().time()
+        FETCH_STATUS.set(None)
 
         try:
-            async with SEMAPHORE:
-                timeout_config = httpx.Timeout(timeout)
-                async with httpx.AsyncClient(
-                    headers=self.headers, timeout=timeout_config, limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
-                ) as client:
-                    response = await client.get(url)
-                    elapsed_time = asyncio.get_event_loop().time() - start_time
-
-                    if response.status_code == 200:
-                        content_length = len(response.text)
+            async with self.fetch_limiter.slot():
+                client = self._get_client()
+                async with client.stream(
+                    "GET", url, headers=validators, timeout=httpx.Timeout(timeout)
+                ) as response:
+                    FETCH_STATUS.set(response.status_code)
+                    if response.status_code == 304:
+                        elapsed_time = asyncio.get_event_loop().time() - start_time
+                        SOURCE_FETCHES.inc("not_modified")
+                        SOURCE_FETCH_SECONDS.observe(elapsed_time, "not_modified")
                         logger.info(
-                            f"✓ GET {url} - Status: {response.status_code}, Size: {content_length} chars, Time: {elapsed_time:.2f}s"
+                            f"✓ GET {url} - Status: 304 (not modified), Time: {elapsed_time:.2f}s"
                         )
-                        return response.text
-                    else:
+                        return TextResponse(response.status_code, None, None)
+
+                    if response.status_code != 200:
+                        elapsed_time = asyncio.get_event_loop().time() - start_time
+                        SOURCE_FETCHES.inc("status")
+                        SOURCE_FETCH_SECONDS.observe(elapsed_time, "status")
                         logger.warning(
                             f"✗ GET {url} - Status: {response.status_code}, Time: {elapsed_time:.2f}s"
                         )
                         return None
+
+                    size = 0
+                    async for chunk in response.aiter_bytes():
+                        consume(chunk)
+                        size += len(chunk)
+                        if size > MAX_SOURCE_BYTES:
+                            logger.warning(
+                                f"✗ GET {url} - Body exceeds {MAX_SOURCE_BYTES} bytes, truncated"
+                            )
+                            break
+
+                    elapsed_time = asyncio.get_event_loop().time() - start_time
+                    SOURCE_FETCHES.inc("ok")
+                    SOURCE_FETCH_SECONDS.observe(elapsed_time, "ok")
+                    SOURCE_BYTES.inc(amount=size)
+                    logger.info(
+                        f"✓ GET {url} - Status: {response.status_code}, Size: {size} bytes, "
+                        f"HTTP: {response.http_version}, Time: {elapsed_time:.2f}s"
+                    )
+                    return TextResponse(
+                        response.status_code,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    )
         except httpx.TimeoutException:
             elapsed_time = asyncio.get_event_loop().time() - start_time
+            SOURCE_FETCHES.inc("timeout")
+            SOURCE_FETCH_SECONDS.observe(elapsed_time, "timeout")
             logger.warning(f"✗ GET {url} - Timeout after {elapsed_time:.2f}s")
             return None
         except Exception as e:
             elapsed_time = asyncio.get_event_loop().time() - start_time
+            SOURCE_FETCHES.inc("error")
+            SOURCE_FETCH_SECONDS.observe(elapsed_time, "error")
             logger.error(f"✗ GET {url} - Error: {e}, Time: {elapsed_time:.2f}s")
             return None
 
     async def get_json(
-        self, url: str, proxy: str, timeout: int = 10
+        self, url: str, proxy: Optional[str] = None, timeout: int = 10
     ) -> Optional[Dict[str, Any]]:
         """
         Fetch JSON content from URL with optional proxy.
 
         Args:
             url: URL to fetch
-            proxy: Optional proxy to use
+            proxy: Optional proxy to use; None makes a direct request
             timeout: Request timeout in seconds
 
         Returns:
@@ -81,67 +300,156 @@ class HTTPClient:
         start_time = asyncio.get_event_loop().time()
 
         try:
-            async with SEMAPHORE:
+            async with self.check_limiter.slot():
                 timeout_config = aio.ClientTimeout(total=timeout)
 
-                # httpx uses proxy parameter directly
-                if proxy.startswith(('http://', 'https://', 'socks5://', 'socks4://')):
+                if not proxy or "://" in proxy:
                     proxy_url = proxy
                 else:
                     # Assume HTTP proxy
                     proxy_url = f"http://{proxy}"
 
-                async with aio.ClientSession(
-                    headers=self.headers, 
-                    timeout=timeout_config,
-                    proxy=proxy_url
-                ) as client:
-                    response = await client.get(url)
-                    elapsed_time = asyncio.get_event_loop().time() - start_time
+                protocol, proxy_host, proxy_port = (
+                    split_proxy(proxy_url) if proxy_url else (None, None, None)
+                )
+                if protocol in SOCKS_PROTOCOLS:
+                    # aiohttp only speaks HTTP to proxies
+                    status, body = await socks_http_get(
+                        protocol, proxy_host, proxy_port, url, SOCKS_CHECK_HEADERS, timeout
+                    )
+                else:
+                    client = self._get_session()
+                    async with client.get(
+                        url, proxy=proxy_url, timeout=timeout_config
+                    ) as response:
+                        status = response.status
+                        body = await response.read() if status == 200 else b""
+                elapsed_time = asyncio.get_event_loop().time() - start_time
 
-                    status = response.status
-                    if status == 200:
-                        try:
-                            json_data = await response.json()
-                            logger.info(
-                                f"✓ JSON GET {url}{proxy_info} - Status: {status}, Time: {elapsed_time:.2f}s"
-                            )
-                            return json_data
-                        except Exception as e:
-                            logger.error(
-                                f"✗ JSON GET {url}{proxy_info} - Invalid JSON: {e}, Time: {elapsed_time:.2f}s"
-                            )
-                            return None
-                    else:
-                        logger.warning(
-                            f"✗ JSON GET {url}{proxy_info} - Status: {status}, Time: {elapsed_time:.2f}s"
+                if status == 200:
+                    try:
+                        json_data = orjson.loads(body)
+                        logger.info(
+                            f"✓ JSON GET {url}{proxy_info} - Status: {status}, Time: {elapsed_time:.2f}s"
+                        )
+                        return json_data
+                    except Exception as e:
+                        REQUEST_FAILURE.set("invalid_json")
+                        logger.error(
+                            f"✗ JSON GET {url}{proxy_info} - Invalid JSON: {e}, Time: {elapsed_time:.2f}s"
                         )
                         return None
-        except httpx.TimeoutException:
+                else:
+                    REQUEST_FAILURE.set("status")
+                    logger.warning(
+                        f"✗ JSON GET {url}{proxy_info} - Status: {status}, Time: {elapsed_time:.2f}s"
+                    )
+                    return None
+        except asyncio.TimeoutError:
             elapsed_time = asyncio.get_event_loop().time() - start_time
+            REQUEST_FAILURE.set("timeout")
             logger.warning(
                 f"✗ JSON GET {url}{proxy_info} - Timeout after {elapsed_time:.2f}s"
             )
             return None
         except Exception as e:
             elapsed_time = asyncio.get_event_loop().time() - start_time
+            REQUEST_FAILURE.set(
+                "connect_error" if isinstance(e, (OSError, aio.ClientConnectionError)) else "error"
+            )
             logger.error(
                 f"✗ JSON GET {url}{proxy_info} - Error: {e}, Time: {elapsed_time:.2f}s"
             )
             return None
 
 
+class RateLimiter:
+    """
+    Token bucket limiting how often an operation may start.
+
+    Up to ``burst`` callers pass immediately; after that one caller passes every
+    ``1 / rate`` seconds.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Search result anchors; attributes may come in any order
+SEARCH_RESULT_TAG = re.compile(r'<a\b[^>]*\bdata-testid="link-to-search-result"[^>]*>')
+HREF_ATTRIBUTE = re.compile(r'\bhref="([^"]*)"')
+
+
+def extract_search_results(page: str) -> List[str]:
+    """
+    Extract result file links from a GitHub code search page.
+
+    Only the result anchors are scanned, instead of building a tree of the page.
+
+    Args:
+        page: Search page HTML
+
+    Returns:
+        Raw-content URLs of the result files, in page order
+    """
+    results = []
+    for tag in SEARCH_RESULT_TAG.finditer(page):
+        href = HREF_ATTRIBUTE.search(tag.group(0))
+        if href:
+            results.append(to_raw_url(f"https://github.com{html.unescape(href.group(1))}"))
+    return results
+
+
 class GitHubClient:
     """Client for GitHub search operations."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        rate_limit: float = GITHUB_RATE_LIMIT,
+        search_cache: Optional[SearchCache] = None,
+    ):
         self.base_url = "https://github.com/search"
         self.headers = DEFAULT_HEADERS.copy()
+        self.rate_limiter = RateLimiter(rate_limit, burst=max(1, int(rate_limit)))
+        self.search_cache = search_cache
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the client used for searches, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(headers=self.headers, http2=True)
+        return self._client
 
-    def search_files(self, query: str, page: int = 1) -> Optional[List[str]]:
+    async def aclose(self) -> None:
+        """Close the search client."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def search_files(self, query: str, page: int = 1) -> Optional[List[str]]:
         """
         Search for files on GitHub.
 
+        Pages still fresh in ``search_cache`` are answered without a request.
+
         Args:
             query: Search query
             page: Page number
@@ -149,6 +457,14 @@ class GitHubClient:
         Returns:
             List of file URLs or None if search failed
         """
+        if self.search_cache:
+            cached = self.search_cache.get(query, page)
+            if cached is not None:
+                GITHUB_SEARCHES.inc("cached")
+                logger.debug(f"✓ GitHub search '{query}' (page {page}) - {len(cached)} cached results")
+                return cached
+
+        await self.rate_limiter.acquire()
 
         start_time = time.time()
         logger.info(f"Searching GitHub for: {query} (page {page})")
@@ -160,23 +476,25 @@ class GitHubClient:
         }
 
         try:
-            response = requests.get(
+            response = await self._get_client().get(
                 self.base_url,
                 params=params,
-                headers=self.headers,
                 timeout=10,
             )
             elapsed_time = time.time() - start_time
+            GITHUB_SEARCH_SECONDS.observe(elapsed_time)
 
-            if not response.ok:
+            if not response.is_success:
+                GITHUB_SEARCHES.inc("status")
                 logger.warning(
                     f"✗ GitHub search '{query}' - Status: {response.status_code}, Time: {elapsed_time:.2f}s"
                 )
                 return None
 
-            soup = BeautifulSoup(response.text, "lxml")
-            all_a = soup.find_all("a", {"data-testid": "link-to-search-result"})
-            results = [f"https://github.com{a.get('href')}" for a in all_a]
+            results = extract_search_results(response.text)
+            GITHUB_SEARCHES.inc("ok")
+            if self.search_cache:
+                self.search_cache.put(query, page, results)
 
             logger.info(
                 f"✓ GitHub search '{query}' - Found {len(results)} results, Status: {response.status_code}, Time: {elapsed_time:.2f}s"
@@ -185,12 +503,66 @@ class GitHubClient:
 
         except Exception as e:
             elapsed_time = time.time() - start_time
+            GITHUB_SEARCHES.inc("error")
             logger.error(
                 f"✗ GitHub search '{query}' - Error: {e}, Time: {elapsed_time:.2f}s"
             )
             return None
 
+    async def search_query(self, query: str, depth: int = DEPTH) -> Set[str]:
+        """
+        Search all pages of a query concurrently.
+
+        Pages start as the rate limiter allows. Once a page comes back empty, the
+        pages after it are cancelled, since results never resume after a gap.
+
+        Args:
+            query: Search query
+            depth: Number of pages to search
+
+        Returns:
+            Set of file URLs found on the pages before the first empty one
+        """
+        tasks = {
+            asyncio.create_task(self.search_files(query, page)): page
+            for page in range(1, depth + 1)
+        }
+        results: Dict[int, List[str]] = {}
+        last_page = depth
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = tasks[task]
+                    if task.cancelled() or page > last_page:
+                        continue
+                    links = task.result()
+                    if links is None:
+                        logger.debug(f"No links found on page {page} for {query}")
+                    elif links:
+                        results[page] = links
+                        logger.debug(f"Found {len(links)} links on page {page} for {query}")
+                    else:
+                        logger.debug(f"Page {page} for {query} is empty, stopping")
+                        last_page = page - 1
+                        for other in pending:
+                            if tasks[other] > page:
+                                other.cancel()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {link for page, links in results.items() if page <= last_page for link in links}
+
 
 # Global instances
 http_client = HTTPClient()
 github_client = GitHubClient()
+
+CONCURRENCY_LIMIT.set_function(lambda: http_client.fetch_limiter.limit, "fetch")
+CONCURRENCY_LIMIT.set_function(lambda: http_client.check_limiter.limit, "check")
+CONCURRENCY_LIMIT.set_function(lambda: http_client.prescreen_limiter.limit, "prescreen")
+EVENT_LOOP_LAG.set_function(lambda: http_client.lag_monitor.lag)
@@ -0,0 +1,122 @@
+"""
+Embedded proxy judge server.
+
+The judge answers every GET with the caller's IP address and the request
+headers it received, in the same shape as the ip-api.com response the checker
+already understands (a ``query`` field holding the IP). Pointing ``JudgeURL`` at
+it lets checks run without any third-party service.
+"""
+
+import asyncio
+import re
+
+import orjson
+from aiohttp import web
+from loguru import logger
+
+from proxy_parser.config import JUDGE_HOST, JUDGE_PORT
+
+# Headers through which proxies reveal themselves or the client behind them
+PROXY_HEADERS = frozenset(
+    {
+        "via",
+        "forwarded",
+        "forwarded-for",
+        "x-forwarded-for",
+        "x-forwarded-host",
+        "x-real-ip",
+        "x-client-ip",
+        "client-ip",
+        "x-originating-ip",
+        "x-proxy-id",
+        "proxy-connection",
+        "proxy-authorization",
+    }
+)
+
+
+# Separators between the entries of a header value and the parameters of an entry
+TOKEN_SEPARATORS = re.compile(r"[,;\s]+")
+
+
+def header_addresses(value: str) -> set[str]:
+    """
+    Split a header value into whole tokens, reduced to the bare address.
+
+    ``for=`` style keys, quotes, IPv6 brackets and ports are stripped, so
+    ``for="[2001:db8::1]:4711"`` and ``203.0.113.5:8080`` compare equal to the
+    plain address.
+
+    Args:
+        value: Header value as received
+
+    Returns:
+        Lower-cased tokens of the value
+    """
+    addresses = set()
+    for token in TOKEN_SEPARATORS.split(value):
+        token = token.rpartition("=")[2].strip('"')
+        if token.startswith("["):
+            token = token[1:].partition("]")[0]
+        elif token.count(":") == 1:
+            token = token.partition(":")[0]
+        if token:
+            addresses.add(token.lower())
+    return addresses
+
+
+def anonymity_level(headers: dict[str, str], real_ip: str | None = None) -> str:
+    """
+    Classify a proxy from the request headers echoed by the judge.
+
+    Args:
+        headers: Headers the judge received through the proxy
+        real_ip: Our own public IP address, if known
+
+    Returns:
+        "transparent" if our IP leaked, "anonymous" if the proxy reveals itself,
+        "elite" otherwise
+    """
+    lowered = {name.lower(): value for name, value in headers.items()}
+    if real_ip and any(real_ip.lower() in header_addresses(value) for value in lowered.values()):
+        return "transparent"
+    if PROXY_HEADERS.intersection(lowered):
+        return "anonymous"
+    return "elite"
+
+
+async def handle_judge(request: web.Request) -> web.Response:
+    """Echo the caller's IP and request headers as JSON."""
+    payload = {
+        "status": "success",
+        "query": request.remote,
+        "headers": {str(name): value for name, value in request.headers.items()},
+    }
+    return web.Response(body=orjson.dumps(payload), content_type="application/json")
+
+
+def create_judge_app() -> web.Application:
+    """Create the judge application; every path is answered."""
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle_judge)
+    return app
+
+
+async def run_judge(host: str = JUDGE_HOST, port: int = JUDGE_PORT) -> None:
+    """
+    Serve the judge until cancelled.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+    """
+    runner = web.AppRunner(create_judge_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port, backlog=4096)
+    await site.start()
+    logger.info(f"⚖️ Judge listening on http://{host}:{port}/")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
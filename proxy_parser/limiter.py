@@ -0,0 +1,286 @@
+"""
+Adaptive concurrency limits for outgoing connections.
+
+Every source fetch, TCP pre-screen and proxy check holds a slot of an
+``AdaptiveLimiter`` while its socket is open. The limits start from what the process may open
+(``RLIMIT_NOFILE``) and follow AIMD: after every window of completed requests a
+limit grows by a fixed step if it was reached and nothing looked congested, and
+is cut by a factor when the failure rate rose above its usual level or the
+event loop fell behind. Running out of file descriptors or local ports cuts it
+at once.
+"""
+
+import asyncio
+import errno
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from loguru import logger
+
+from proxy_parser.config import (
+    ADAPTIVE_CONCURRENCY,
+    CONCURRENCY_DECREASE,
+    CONCURRENCY_INCREASE,
+    CONCURRENCY_WINDOW,
+    ERROR_TOLERANCE,
+    FETCH_CONNECTIONS,
+    MAX_CONNECTIONS,
+    MAX_LOOP_LAG,
+    MIN_CONNECTIONS,
+    PRESCREEN_ENABLED,
+    PRESCREEN_WORKERS,
+)
+
+# Errors caused by local resource exhaustion rather than by the remote side
+LOCAL_SOCKET_ERRORS = frozenset({errno.EMFILE, errno.ENFILE, errno.EADDRNOTAVAIL, errno.ENOBUFS})
+
+# File descriptors kept free for the state store, caches, logs and listeners
+RESERVED_FILES = 64
+
+# Weight of the latest window in the failure-rate baseline
+BASELINE_ALPHA = 0.2
+
+# Largest share of the non-fetch descriptors the pre-screen may hold
+PRESCREEN_SHARE = 0.25
+
+# Event loop lag sampling
+LAG_INTERVAL = 0.1
+LAG_ALPHA = 0.3
+
+
+def open_files_limit() -> Optional[int]:
+    """Soft RLIMIT_NOFILE of the process, or None where unknown or unlimited."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return None if soft == resource.RLIM_INFINITY else soft
+
+
+def connection_budgets(
+    open_files: Optional[int] = None, prescreen: bool = PRESCREEN_ENABLED
+) -> tuple[int, int, int]:
+    """
+    Split the file descriptors the process may open between fetches, checks and the pre-screen.
+
+    The pre-screen runs alongside the checks it feeds, so it takes its share
+    out of what the checks would otherwise get.
+
+    Args:
+        open_files: File descriptor limit (defaults to the soft RLIMIT_NOFILE)
+        prescreen: Whether the TCP pre-screen needs more than a token budget
+
+    Returns:
+        Maximum concurrent (source fetches, proxy checks, pre-screen
+        connections); without a known limit, the configured FetchConnections,
+        MaxConnections and PrescreenWorkers
+    """
+    open_files = open_files or open_files_limit()
+    if open_files is None:
+        return FETCH_CONNECTIONS, MAX_CONNECTIONS, PRESCREEN_WORKERS
+    usable = max(open_files - RESERVED_FILES, 3 * MIN_CONNECTIONS)
+    fetch = max(min(FETCH_CONNECTIONS, usable // 2), MIN_CONNECTIONS)
+    rest = usable - fetch
+    prescreen_budget = MIN_CONNECTIONS
+    if prescreen:
+        prescreen_budget = max(min(PRESCREEN_WORKERS, int(rest * PRESCREEN_SHARE)), MIN_CONNECTIONS)
+    return fetch, max(rest - prescreen_budget, MIN_CONNECTIONS), prescreen_budget
+
+
+def is_local_error(error: BaseException) -> bool:
+    """Whether an error, or one it was raised from, is local resource exhaustion."""
+    while error is not None:
+        if isinstance(error, OSError) and error.errno in LOCAL_SOCKET_ERRORS:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a task sleeping at a fixed interval."""
+
+    def __init__(self, interval: float = LAG_INTERVAL):
+        self.interval = interval
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self) -> None:
+        """Start sampling in the running loop unless already sampling there."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self.lag = 0.0
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        if task.get_loop() is asyncio.get_running_loop():
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0.0)
+            self.lag += LAG_ALPHA * (lag - self.lag)
+
+
+class AdaptiveLimiter:
+    """
+    Semaphore whose size follows additive-increase / multiplicative-decrease.
+
+    Outcomes are counted per window of ``window`` completed requests. At the
+    end of a window the limit is multiplied by ``decrease`` if the failure rate
+    exceeded its baseline by more than ``error_tolerance`` or the event loop lag
+    exceeded ``max_lag``; otherwise it grows by ``increase`` if requests had to
+    wait for a slot. The baseline is a moving average of the failure rate, so a
+    workload where most requests fail anyway (dead proxies) only counts as
+    congested when failures rise. A local socket error (EMFILE, EADDRNOTAVAIL,
+    ...) decreases the limit immediately. At most one decrease happens per
+    window, so one burst of failures cannot collapse the limit.
+
+    Waiters are served in FIFO order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        minimum: int = MIN_CONNECTIONS,
+        maximum: Optional[int] = None,
+        adaptive: bool = ADAPTIVE_CONCURRENCY,
+        window: int = CONCURRENCY_WINDOW,
+        increase: int = CONCURRENCY_INCREASE,
+        decrease: float = CONCURRENCY_DECREASE,
+        error_tolerance: float = ERROR_TOLERANCE,
+        max_lag: float = MAX_LOOP_LAG,
+        lag_monitor: Optional[LoopLagMonitor] = None,
+        timeout_errors: tuple[type[BaseException], ...] = (TimeoutError,),
+    ):
+        self.name = name
+        self.maximum = max(maximum or initial, 1)
+        self.minimum = min(max(minimum, 1), self.maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.adaptive = adaptive
+        self.window = window
+        self.increase = increase
+        self.decrease = decrease
+        self.error_tolerance = error_tolerance
+        self.max_lag = max_lag
+        self.lag_monitor = lag_monitor
+        self.timeout_errors = timeout_errors
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._completed = 0
+        self._failed = 0
+        self._saturated = False
+        self._decreased = False
+        self._baseline: Optional[float] = None
+
+    async def acquire(self) -> None:
+        """Wait for a free slot and take it."""
+        if self.adaptive and self.lag_monitor:
+            self.lag_monitor.ensure_started()
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        self._saturated = True
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self, outcome: str = "ok") -> None:
+        """
+        Give a slot back.
+
+        Args:
+            outcome: "ok", "timeout", "error", "local_error" or "cancelled"
+                (not counted)
+        """
+        self.in_flight -= 1
+        if self.adaptive and outcome != "cancelled":
+            self._record(outcome)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the body; an exception it raises is counted as a failure."""
+        await self.acquire()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            outcome = self.classify(e)
+            raise
+        finally:
+            self.release(outcome)
+
+    def classify(self, error: BaseException) -> str:
+        """Map an exception to the outcome it stands for."""
+        if isinstance(error, asyncio.CancelledError):
+            return "cancelled"
+        if isinstance(error, self.timeout_errors):
+            return "timeout"
+        if is_local_error(error):
+            return "local_error"
+        return "error"
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def _record(self, outcome: str) -> None:
+        self._completed += 1
+        if outcome != "ok":
+            self._failed += 1
+        if outcome == "local_error" and not self._decreased:
+            self._decrease("local socket error")
+        if self._completed >= self.window:
+            self._adjust()
+
+    def _adjust(self) -> None:
+        """Apply the AIMD rule at the end of a window and start the next one."""
+        rate = self._failed / self._completed
+        baseline = rate if self._baseline is None else self._baseline
+        lag = self.lag_monitor.lag if self.lag_monitor else 0.0
+
+        if not self._decreased:
+            if lag > self.max_lag:
+                self._decrease(f"event loop lag {lag * 1000:.0f}ms")
+            elif rate > baseline + self.error_tolerance:
+                self._decrease(f"failure rate {rate:.0%} over baseline {baseline:.0%}")
+            elif self._saturated and self.limit < self.maximum:
+                self.limit = min(self.limit + self.increase, self.maximum)
+                logger.debug(f"{self.name} concurrency raised to {self.limit}")
+
+        self._baseline = baseline + BASELINE_ALPHA * (rate - baseline)
+        self._completed = 0
+        self._failed = 0
+        self._saturated = False
+        self._decreased = False
+
+    def _decrease(self, reason: str) -> None:
+        previous = self.limit
+        self.limit = max(int(self.limit * self.decrease), self.minimum)
+        self._decreased = True
+        if self.limit != previous:
+            logger.info(f"📉 {self.name} concurrency {previous} → {self.limit} ({reason})")
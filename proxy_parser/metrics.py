@@ -0,0 +1,278 @@
+"""
+Prometheus metrics for the parsing and checking pipeline.
+
+Counters, gauges and histograms are plain dicts keyed by label values, updated
+inline at the existing timing points; recording a value is a dict lookup and
+an addition, cheap enough to leave on at full check rate. ``render`` formats
+every metric in the Prometheus text exposition format, and
+``start_metrics_server`` serves it on ``/metrics``.
+"""
+
+import bisect
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator, Optional
+
+from aiohttp import web
+from loguru import logger
+
+from proxy_parser.config import METRICS_HOST, METRICS_PORT
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket bounds in seconds
+CHECK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+FETCH_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY: list["Metric"] = []
+
+
+class Metric(ABC):
+    """Base of the metric types: a name, help text and label names."""
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: Optional[list["Metric"]] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        if registry is not None:
+            registry.append(self)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Yield the sample lines of the metric."""
+
+    def render(self) -> str:
+        """Format the metric with its HELP and TYPE lines."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count, one per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add to the count of the given label values."""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current count of the given label values."""
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """Value that goes up and down, set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the value of the given label values."""
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add to the value of the given label values."""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Subtract from the value of the given label values."""
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set_function(self, function: Optional[Callable[[], float]], *labels: str) -> None:
+        """Read the value from ``function`` on every scrape; None removes it."""
+        if function is None:
+            self._functions.pop(labels, None)
+            self._values.pop(labels, None)
+        else:
+            self._functions[labels] = function
+
+    def value(self, *labels: str) -> float:
+        """Current value of the given label values."""
+        function = self._functions.get(labels)
+        return function() if function else self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labels in {**self._values, **self._functions}:
+            value = self.value(*labels)
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets, plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = CHECK_BUCKETS,
+        registry: Optional[list[Metric]] = REGISTRY,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: a count per bucket (not cumulative) plus one for +Inf
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record a value for the given label values."""
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        """Number of values observed for the given label values."""
+        return sum(self._counts.get(labels, ()))
+
+    def samples(self) -> Iterator[str]:
+        names = (*self.labelnames, "le")
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                label_text = _format_labels(names, (*labels, _format_value(bound)))
+                yield f"{self.name}_bucket{label_text} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(self._sums[labels])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+def render() -> str:
+    """Format every registered metric in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# Proxy checks (ProxyChecker)
+CHECKS_STARTED = Counter(
+    "proxy_parser_checks_started_total", "Proxy checks started", ("protocol",)
+)
+CHECKS_SUCCEEDED = Counter(
+    "proxy_parser_checks_succeeded_total", "Proxy checks that returned a working proxy", ("protocol",)
+)
+CHECKS_FAILED = Counter(
+    "proxy_parser_checks_failed_total", "Proxy checks that failed", ("protocol", "reason")
+)
+CHECK_SECONDS = Histogram(
+    "proxy_parser_check_duration_seconds",
+    "Duration of proxy checks",
+    ("protocol", "result"),
+    CHECK_BUCKETS,
+)
+CHECKS_IN_FLIGHT = Gauge("proxy_parser_checks_in_flight", "Proxy checks currently running")
+
+# Source fetches (HTTPClient)
+SOURCE_FETCHES = Counter(
+    "proxy_parser_source_fetches_total", "Source fetches by outcome", ("outcome",)
+)
+SOURCE_BYTES = Counter("proxy_parser_source_bytes_total", "Source body bytes downloaded")
+SOURCE_FETCH_SECONDS = Histogram(
+    "proxy_parser_source_fetch_duration_seconds",
+    "Duration of source fetches",
+    ("outcome",),
+    FETCH_BUCKETS,
+)
+
+# GitHub search (GitHubClient)
+GITHUB_SEARCHES = Counter(
+    "proxy_parser_github_searches_total", "GitHub search pages by outcome", ("outcome",)
+)
+GITHUB_SEARCH_SECONDS = Histogram(
+    "proxy_parser_github_search_duration_seconds",
+    "Duration of GitHub search requests",
+    (),
+    FETCH_BUCKETS,
+)
+
+# Cycles (ProxyOrchestrator)
+STAGE_SECONDS = Histogram(
+    "proxy_parser_stage_duration_seconds",
+    "Duration of cycle stages",
+    ("stage",),
+    (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0),
+)
+CYCLE_PROXIES = Gauge(
+    "proxy_parser_cycle_proxies", "Proxies handled by the last cycle", ("kind",)
+)
+QUEUE_DEPTH = Gauge("proxy_parser_queue_depth", "Items waiting in internal queues", ("queue",))
+
+# Concurrency (AdaptiveLimiter)
+CONCURRENCY_LIMIT = Gauge(
+    "proxy_parser_concurrency_limit", "Current adaptive connection limit", ("budget",)
+)
+EVENT_LOOP_LAG = Gauge(
+    "proxy_parser_event_loop_lag_seconds", "Smoothed delay of event loop wake-ups"
+)
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    """Serve every metric in the text exposition format."""
+    return web.Response(body=render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> web.AppRunner:
+    """
+    Serve ``/metrics`` in the background of the running event loop.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+
+    Returns:
+        Runner to clean up when done
+    """
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"📈 Metrics available at http://{host}:{port}/metrics")
+    return runner
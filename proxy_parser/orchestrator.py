@@ -3,23 +3,92 @@ Main orchestrator for proxy parsing operations.
 """
 
 import asyncio
+import itertools
 import logging
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
 
-from proxy_parser.config import NOT_CHECKED_PROXIES_FILE, CHECKED_PROXIES_FILE
+from proxy_parser.config import (
+    NOT_CHECKED_PROXIES_FILE,
+    CHECKED_PROXIES_FILE,
+    PRESCREEN_ENABLED,
+    STATE_STORE_ENABLED,
+    SCHEDULER_ENABLED,
+    SOURCE_RANKING_ENABLED,
+    SOURCE_CACHE_ENABLED,
+    GITHUB_SEARCH_TTL,
+    PIPELINE_ENABLED,
+    PIPELINE_QUEUE_SIZE,
+    CHECK_PROCESSES,
+)
+from proxy_parser.cache import SearchCache, SourceCache
 from proxy_parser.parsers import ProxyParser
-from proxy_parser.checkers import ProxyChecker
+from proxy_parser.checkers import ProxyChecker, TCPPrescreener
+from proxy_parser.distributed import Coordinator
 from proxy_parser.file_operations import FileManager, FileManagerJson
+from proxy_parser.http_client import GitHubClient, http_client
+from proxy_parser.metrics import CYCLE_PROXIES, QUEUE_DEPTH, STAGE_SECONDS
+from proxy_parser.packed import PackedProxySet
+from proxy_parser.scheduler import RecheckScheduler
+from proxy_parser.sharding import ShardedChecker
+from proxy_parser.sources import SourceRanker
+from proxy_parser.store import ProxyStore
+from proxy_parser.writer import SnapshotJsonlWriter
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of the pipeline queue
+_DONE = object()
+
 
 class ProxyOrchestrator:
     """Orchestrates the entire proxy parsing workflow."""
 
-    def __init__(self, file_manager: FileManagerJson):
+    def __init__(
+        self,
+        file_manager: FileManagerJson,
+        prescreen: bool = PRESCREEN_ENABLED,
+        state_store: bool = STATE_STORE_ENABLED,
+        pipeline: bool = PIPELINE_ENABLED,
+        processes: int = CHECK_PROCESSES,
+    ):
         self.file_manager = file_manager
-        self.parser = ProxyParser(file_manager)
-        self.checker = ProxyChecker()
+        self.pipeline = pipeline
+        self.store = ProxyStore() if state_store else None
+        # Its own search client, so the search cache does not leak into the shared one
+        self.search_client = GitHubClient(
+            search_cache=SearchCache() if GITHUB_SEARCH_TTL else None
+        )
+        self.parser = ProxyParser(
+            file_manager,
+            store=self.store,
+            source_cache=SourceCache() if SOURCE_CACHE_ENABLED else None,
+            source_ranker=(
+                SourceRanker(self.store) if self.store and SOURCE_RANKING_ENABLED else None
+            ),
+            search_client=self.search_client,
+        )
+        self.checker: ProxyChecker | ShardedChecker | Coordinator
+        self.use_processes(processes)
+        self.scheduler = (
+            RecheckScheduler(self.store) if self.store and SCHEDULER_ENABLED else None
+        )
+        self.prescreener = TCPPrescreener() if prescreen else None
+
+    def use_processes(self, processes: int) -> None:
+        """
+        Choose between checking in this process and sharding across processes.
+
+        Args:
+            processes: Number of checker processes; 1 checks in the current loop
+        """
+        if processes > 1:
+            self.checker = ShardedChecker(processes, store=self.store)
+        else:
+            self.checker = ProxyChecker(store=self.store)
+
+    def use_coordinator(self) -> None:
+        """Hand checks to remote workers (``--worker``) instead of checking locally."""
+        self.checker = Coordinator(store=self.store)
 
     async def run_full_cycle(self) -> None:
         """
@@ -27,7 +96,13 @@ class ProxyOrchestrator:
         1. Update sources from GitHub
         2. Parse proxies from sources
         3. Check proxies for validity
+
+        In pipeline mode steps 2 and 3 overlap, see ``run_pipeline_cycle``.
         """
+        if self.pipeline:
+            await self.run_pipeline_cycle()
+            return
+
         logger.info("🚀 Starting full proxy parsing cycle")
         cycle_start_time = asyncio.get_event_loop().time()
 
@@ -35,8 +110,9 @@ class ProxyOrchestrator:
             # Step 1: Update sources
             logger.info("📡 Step 1: Updating sources from GitHub")
             step1_start = asyncio.get_event_loop().time()
-            self.parser.update_sources()
+            await self.parser.update_sources()
             step1_time = asyncio.get_event_loop().time() - step1_start
+            STAGE_SECONDS.observe(step1_time, "update_sources")
             logger.info(f"✅ Step 1 completed in {step1_time:.2f}s")
 
             # Step 2: Parse proxies
@@ -44,6 +120,7 @@ class ProxyOrchestrator:
             step2_start = asyncio.get_event_loop().time()
             unchecked_proxies = await self.parser.parse_unchecked_proxies()
             step2_time = asyncio.get_event_loop().time() - step2_start
+            STAGE_SECONDS.observe(step2_time, "parse")
 
             if not unchecked_proxies:
                 logger.warning("⚠️ No proxies found in this cycle")
@@ -64,9 +141,11 @@ class ProxyOrchestrator:
             step3_start = asyncio.get_event_loop().time()
             await self.check_proxies()
             step3_time = asyncio.get_event_loop().time() - step3_start
+            STAGE_SECONDS.observe(step3_time, "check")
             logger.info(f"✅ Step 3 completed in {step3_time:.2f}s")
 
             cycle_time = asyncio.get_event_loop().time() - cycle_start_time
+            STAGE_SECONDS.observe(cycle_time, "cycle")
             logger.info(f"🎉 Full cycle completed successfully in {cycle_time:.2f}s")
 
         except Exception as e:
@@ -78,40 +157,179 @@ class ProxyOrchestrator:
         """
         Check all unchecked proxies and save working ones.
         """
-        # Load unchecked proxies
+        # Stream unchecked proxies from disk instead of loading them all at once
         logger.info("📂 Loading unchecked proxies for validation")
-        unchecked_proxies: set[str] = await self.parser.get_unchecked_proxies(
-            str(NOT_CHECKED_PROXIES_FILE)
-        )
+        lines = self.file_manager.iter_lines(NOT_CHECKED_PROXIES_FILE)
+        first_line = next(lines, None)
 
-        if not unchecked_proxies:
+        if first_line is None:
             logger.warning("⚠️ No unchecked proxies to check")
             return
-        logger.info(f"🔍 Starting validation of {len(unchecked_proxies)} proxies")
+        logger.info(f"🔍 Starting validation of proxies from {NOT_CHECKED_PROXIES_FILE}")
+        candidates_count = 0
+
+        def candidates() -> Iterator[str]:
+            nonlocal candidates_count
+            for line in itertools.chain([first_line], lines):
+                candidates_count += 1
+                yield line
+
+        # Skip proxies that are backing off and cap the cycle at the check budget
+        to_check = candidates()
+        scheduled_count = None
+        if self.scheduler:
+            to_check = await self.store.run(self.scheduler.select, to_check)
+            scheduled_count = len(to_check)
+
+        # Optionally drop proxies that do not even accept a TCP connection
+        if self.prescreener:
+            logger.info("🔌 Pre-screening proxies with a TCP connect")
+            to_check = self.prescreener.filter(to_check)
+
+        start_time = asyncio.get_event_loop().time()
+        working_count = await self._check_and_save(to_check)
+
+        elapsed_time = asyncio.get_event_loop().time() - start_time
+        checked_count = candidates_count if scheduled_count is None else scheduled_count
+        success_rate = (working_count / checked_count) * 100 if checked_count else 0
+        CYCLE_PROXIES.set(candidates_count, "candidates")
+        CYCLE_PROXIES.set(checked_count, "checked")
+        CYCLE_PROXIES.set(working_count, "working")
+
+        logger.info(
+            f"📊 Proxy validation summary: {working_count}/{checked_count} working ({success_rate:.1f}% success rate) in {elapsed_time:.2f}s"
+        )
+        if scheduled_count is not None:
+            logger.info(
+                f"📊 Scheduler skipped {candidates_count - scheduled_count}/{candidates_count} candidates"
+            )
+        if self.prescreener:
+            logger.info(
+                f"📊 TCP pre-screen pruned {self.prescreener.pruned_count}/{checked_count} proxies"
+            )
+
+    async def _check_and_save(self, proxies: Iterable[str] | AsyncIterable[str]) -> int:
+        """
+        Check proxies and publish the working ones as the new checked proxies file.
 
-        # Clear checked proxies file
-        self.file_manager.clear_file(CHECKED_PROXIES_FILE)
+        Results are written to a temporary file that replaces the checked
+        proxies file atomically once checking finishes, so readers keep seeing
+        the previous complete snapshot meanwhile. If checking fails, the
+        previous snapshot stays in place.
+
+        Args:
+            proxies: Iterable or async iterable of proxy strings
+
+        Returns:
+            Number of working proxies
+        """
+        # Records are written from a background thread to the next snapshot
+        writer = SnapshotJsonlWriter(CHECKED_PROXIES_FILE).open()
 
         # Check proxies and save working ones
         working_count = 0
         start_time = asyncio.get_event_loop().time()
 
-        async for proxy, response_data, elapsed_time_of_proxy in self.checker.check_proxies_generator(
-            unchecked_proxies
-        ):
-            if proxy and response_data:
-                logger.info(f'Proxy = {proxy}, Response = {response_data}')
-                self.file_manager.append_to_file(CHECKED_PROXIES_FILE, {'proxy': proxy, 'info': response_data, 'elapsed_time': elapsed_time_of_proxy})
-                working_count += 1
-                logger.debug(f"✅ Working proxy: {proxy}")
+        try:
+            async for proxy, response_data, elapsed_time_of_proxy in self.checker.check_proxies_generator(
+                proxies
+            ):
+                if proxy and response_data:
+                    logger.info(f'Proxy = {proxy}, Response = {response_data}')
+                    writer.write({'proxy': proxy, 'info': response_data, 'elapsed_time': elapsed_time_of_proxy})
+                    working_count += 1
+                    logger.debug(f"✅ Working proxy: {proxy}")
+                    if working_count == 1:
+                        first_time = asyncio.get_event_loop().time() - start_time
+                        logger.info(f"⚡ First working proxy found after {first_time:.2f}s")
+        except BaseException:
+            await asyncio.to_thread(writer.discard)
+            raise
+        await asyncio.to_thread(writer.publish)
+        logger.info(f"💾 Published {working_count} working proxies to {CHECKED_PROXIES_FILE}")
+        return working_count
 
-        elapsed_time = asyncio.get_event_loop().time() - start_time
-        success_rate = (
-            (working_count / len(unchecked_proxies)) * 100 if unchecked_proxies else 0
-        )
+    async def run_pipeline_cycle(self) -> None:
+        """
+        Run a cycle where checking starts as soon as the first source is parsed.
+
+        Sources already on disk are fetched while GitHub is searched, and the
+        sources the search adds are fetched after it. The proxies of each finished
+        source are deduplicated against everything seen this cycle and pushed
+        through a bounded queue into the checker, so parsing and checking overlap. With the
+        scheduler, proxies that are backing off are skipped and the check budget
+        caps the cycle on a first-come basis (ranking needs every candidate).
+        The unchecked proxies file is written at the end, as in staged mode.
+        """
+        logger.info("🚀 Starting pipelined proxy parsing cycle")
+        cycle_start_time = asyncio.get_event_loop().time()
 
+        logger.info("🔀 Updating, parsing and checking concurrently")
+        seen = PackedProxySet()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        queued_count = 0
+        QUEUE_DEPTH.set_function(queue.qsize, "pipeline")
+
+        async def enqueue(source_urls: dict[str, list[str]]) -> None:
+            nonlocal queued_count
+            async for protocol, addresses in self.parser.iter_source_proxies(source_urls):
+                new_proxies = seen.add_new(protocol, addresses)
+                if self.scheduler:
+                    new_proxies = await self.store.run(self.scheduler.filter_due, new_proxies)
+                    if self.scheduler.budget:
+                        remaining = max(self.scheduler.budget - queued_count, 0)
+                        new_proxies = new_proxies[:remaining]
+                for proxy in new_proxies:
+                    await queue.put(proxy)
+                queued_count += len(new_proxies)
+
+        async def produce() -> None:
+            # Known sources are parsed while GitHub is searched; sources found by
+            # the search are parsed once it finishes
+            update = asyncio.create_task(self.parser.update_sources())
+            try:
+                known_urls = self.parser.get_source_urls()
+                await enqueue(known_urls)
+                await update
+                found_urls = {
+                    protocol: [url for url in urls if url not in known_urls.get(protocol, ())]
+                    for protocol, urls in self.parser.get_source_urls().items()
+                }
+                await enqueue(found_urls)
+            except Exception as e:
+                logger.error(f"❌ Error while parsing sources: {e}")
+            finally:
+                update.cancel()
+                await asyncio.gather(update, return_exceptions=True)
+                await queue.put(_DONE)
+
+        async def queued() -> AsyncIterator[str]:
+            while (proxy := await queue.get()) is not _DONE:
+                yield proxy
+
+        to_check: AsyncIterable[str] = queued()
+        if self.prescreener:
+            to_check = self.prescreener.filter(to_check)
+
+        producer = asyncio.create_task(produce())
+        try:
+            working_count = await self._check_and_save(to_check)
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            QUEUE_DEPTH.set_function(None, "pipeline")
+
+        logger.info("💾 Saving unchecked proxies")
+        await self.parser.save_unchecked_proxies(seen, str(NOT_CHECKED_PROXIES_FILE))
+
+        cycle_time = asyncio.get_event_loop().time() - cycle_start_time
+        STAGE_SECONDS.observe(cycle_time, "cycle")
+        CYCLE_PROXIES.set(len(seen), "candidates")
+        CYCLE_PROXIES.set(queued_count, "checked")
+        CYCLE_PROXIES.set(working_count, "working")
         logger.info(
-            f"📊 Proxy validation summary: {working_count}/{len(unchecked_proxies)} working ({success_rate:.1f}% success rate) in {elapsed_time:.2f}s"
+            f"🎉 Pipelined cycle completed - {working_count}/{queued_count} working, "
+            f"{len(seen)} unique proxies found in {cycle_time:.2f}s"
         )
 
     async def run_infinite_cycle(self, timeout_seconds: int) -> None:
@@ -126,21 +344,38 @@ class ProxyOrchestrator:
         )
         cycle_count = 0
 
-        while True:
-            cycle_count += 1
-            logger.info(f"🔄 Starting cycle #{cycle_count}")
+        try:
+            while True:
+                cycle_count += 1
+                logger.info(f"🔄 Starting cycle #{cycle_count}")
 
-            try:
-                await self.run_full_cycle()
+                try:
+                    await self.run_full_cycle()
 
-                # Wait before next cycle
-                logger.info(f"⏳ Waiting {timeout_seconds} seconds before next cycle")
-                await asyncio.sleep(timeout_seconds)
+                    # Wait before next cycle
+                    logger.info(f"⏳ Waiting {timeout_seconds} seconds before next cycle")
+                    await asyncio.sleep(timeout_seconds)
 
-            except KeyboardInterrupt:
-                logger.info("🛑 Received interrupt signal, stopping infinite cycle")
-                break
-            except Exception as e:
-                logger.error(f"❌ Error in infinite cycle #{cycle_count}: {e}")
-                logger.info(f"⏳ Waiting {timeout_seconds} seconds before retry")
-                await asyncio.sleep(timeout_seconds)
+                except KeyboardInterrupt:
+                    logger.info("🛑 Received interrupt signal, stopping infinite cycle")
+                    break
+                except Exception as e:
+                    logger.error(f"❌ Error in infinite cycle #{cycle_count}: {e}")
+                    logger.info(f"⏳ Waiting {timeout_seconds} seconds before retry")
+                    await asyncio.sleep(timeout_seconds)
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Release network resources and the state store that live for the duration of a run.
+
+        In infinite mode the pooled clients are kept across cycles and closed only
+        when the loop stops.
+        """
+        await http_client.aclose()
+        await self.search_client.aclose()
+        if isinstance(self.checker, Coordinator):
+            await self.checker.close()
+        if self.store:
+            self.store.close()
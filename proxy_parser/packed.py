@@ -0,0 +1,184 @@
+"""
+Compact integer-packed proxy sets.
+"""
+
+from typing import Iterable, Iterator
+
+import numpy as np
+
+# Protocol tags, assigned on first use and shared by every set so packed values
+# from different sets compare equal
+_PROTOCOLS: list[str] = []
+
+# Proxies formatted per block when iterating, so only a block of strings is alive
+ITER_BLOCK_SIZE = 65_536
+
+# Values kept in a hash set by add_new before they are merged into the sorted array
+RECENT_LIMIT = 262_144
+
+_EMPTY = np.empty(0, dtype=np.uint64)
+
+# (shift, mask) of the tag, the four octets and the port in a packed value
+_FIELDS = ((48, 0xFFFF), (40, 255), (32, 255), (24, 255), (16, 255), (0, 0xFFFF))
+
+
+def protocol_tag(protocol: str) -> int:
+    """Return the tag of a protocol, registering it if it is new."""
+    try:
+        return _PROTOCOLS.index(protocol)
+    except ValueError:
+        _PROTOCOLS.append(protocol)
+        return len(_PROTOCOLS) - 1
+
+
+def pack_addresses(protocol: str, addresses: Iterable[str]) -> np.ndarray:
+    """
+    Pack ip:port strings of one protocol into 64-bit integers.
+
+    Each value is ``tag << 48 | ip << 16 | port``.
+
+    Args:
+        protocol: Protocol of every address
+        addresses: Strings in format ip:port, as returned by the extractors
+
+    Returns:
+        Unsorted uint64 array, one value per address
+    """
+    text = ".".join(addresses).replace(":", ".")
+    if not text:
+        return _EMPTY
+    fields = np.fromstring(text, dtype=np.uint64, sep=".")
+    if fields.size % 5:
+        raise ValueError(f"Malformed ip:port in {protocol} addresses")
+    fields = fields.reshape(-1, 5)
+    packed = np.uint64(protocol_tag(protocol)) << np.uint64(48)
+    for column, shift in zip(fields.T, (40, 32, 24, 16, 0)):
+        packed = packed | (column << np.uint64(shift))
+    return packed
+
+
+def pack_proxy(protocol: str, address: str) -> int:
+    """Pack a single ip:port of a protocol; see ``pack_addresses``."""
+    return int(pack_addresses(protocol, (address,))[0])
+
+
+class PackedProxySet:
+    """
+    Set of protocol://ip:port proxies stored as one sorted uint64 array.
+
+    Uses 8 bytes per proxy instead of a str object plus a hash table slot.
+    Additions are buffered and merged with a single sort and dedupe, so adding
+    many sources costs one vectorized union rather than one per source.
+    Iterating yields the same strings the str-based sets held, ordered by
+    protocol, address and port.
+    """
+
+    def __init__(self, values: np.ndarray = _EMPTY):
+        self._values = np.unique(values)
+        self._pending: list[np.ndarray] = []
+        self._recent: set[int] = set()
+
+    def add(self, protocol: str, addresses: Iterable[str]) -> None:
+        """
+        Add ip:port strings of one protocol.
+
+        Args:
+            protocol: Protocol of every address
+            addresses: Strings in format ip:port
+        """
+        packed = pack_addresses(protocol, addresses)
+        if packed.size:
+            self._pending.append(packed)
+
+    def add_new(self, protocol: str, addresses: Iterable[str]) -> list[str]:
+        """
+        Add ip:port strings of one protocol and return the ones not seen before.
+
+        Meant for deduplicating a stream: values are checked against the sorted
+        array with a binary search and against a bounded set of recent values,
+        so the array is only re-sorted every ``RECENT_LIMIT`` new proxies.
+
+        Args:
+            protocol: Protocol of every address
+            addresses: Strings in format ip:port
+
+        Returns:
+            New proxies in format protocol://ip:port, each returned once
+        """
+        addresses = list(addresses)
+        packed = pack_addresses(protocol, addresses)
+        if not packed.size:
+            return []
+
+        unique, indices = np.unique(packed, return_index=True)
+        values = self._compact()
+        if values.size:
+            positions = np.minimum(np.searchsorted(values, unique), values.size - 1)
+            fresh = values[positions] != unique
+            unique, indices = unique[fresh], indices[fresh]
+
+        new = []
+        for value, index in zip(unique.tolist(), indices.tolist()):
+            if value not in self._recent:
+                self._recent.add(value)
+                new.append(f"{protocol}://{addresses[index]}")
+
+        if len(self._recent) >= RECENT_LIMIT:
+            self._merge_recent()
+        return new
+
+    def update(self, other: "PackedProxySet") -> None:
+        """Add every proxy of another set."""
+        self._pending.append(other.values)
+
+    def _merge_recent(self) -> None:
+        self._pending.append(np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent)))
+        self._recent = set()
+
+    def _compact(self) -> np.ndarray:
+        if self._pending:
+            self._values = np.unique(np.concatenate([self._values, *self._pending]))
+            self._pending = []
+        return self._values
+
+    @property
+    def values(self) -> np.ndarray:
+        """Sorted, deduplicated packed values."""
+        if self._recent:
+            self._merge_recent()
+        return self._compact()
+
+    def __or__(self, other: "PackedProxySet") -> "PackedProxySet":
+        return PackedProxySet(np.concatenate([self.values, other.values]))
+
+    def __len__(self) -> int:
+        return int(self.values.size)
+
+    def __contains__(self, proxy: object) -> bool:
+        if not isinstance(proxy, str) or "://" not in proxy:
+            return False
+        protocol, address = proxy.split("://", 1)
+        if protocol not in _PROTOCOLS:
+            return False
+        try:
+            value = np.uint64(pack_proxy(protocol, address))
+        except (ValueError, IndexError):
+            return False
+        index = np.searchsorted(self.values, value)
+        return bool(index < self.values.size and self.values[index] == value)
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.values
+        for start in range(0, values.size, ITER_BLOCK_SIZE):
+            block = values[start:start + ITER_BLOCK_SIZE]
+            columns = [
+                ((block >> np.uint64(shift)) & np.uint64(mask)).tolist()
+                for shift, mask in _FIELDS
+            ]
+            for tag, first, second, third, fourth, port in zip(*columns):
+                yield f"{_PROTOCOLS[tag]}://{first}.{second}.{third}.{fourth}:{port}"
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the packed values."""
+        return int(self.values.nbytes)
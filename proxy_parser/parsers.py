@@ -3,91 +3,144 @@ Proxy parsing functionality.
 """
 
 import asyncio
-from typing import List, Set
+from typing import AsyncGenerator, Dict, List, Set, Tuple, Union
 from pathlib import Path
 
-from proxy_parser.config import REGEX_PATTERN, SEARCH_QUERIES, DEPTH
-from proxy_parser.http_client import http_client, github_client
+from proxy_parser.cache import SourceCache
+from proxy_parser.config import SEARCH_QUERIES, DEPTH
+from proxy_parser.extract import ProxyExtractor
+from proxy_parser.http_client import (
+    FETCH_STATUS,
+    GitHubClient,
+    http_client,
+    github_client,
+    to_raw_url,
+)
 from proxy_parser.file_operations import FileManager
+from proxy_parser.packed import PackedProxySet
+from proxy_parser.sources import SourceRanker
+from proxy_parser.store import ProxyStore
 from loguru import logger
 
+# Answers meaning a source is gone for good, unlike timeouts, 429s and 5xx
+GONE_STATUSES = frozenset({404, 410})
+
 
 class ProxyParser:
     """Handles proxy parsing operations."""
 
-    def __init__(self, file_manager: FileManager):
+    def __init__(
+        self,
+        file_manager: FileManager,
+        store: ProxyStore | None = None,
+        source_cache: SourceCache | None = None,
+        source_ranker: SourceRanker | None = None,
+        search_client: GitHubClient | None = None,
+    ):
         self.file_manager = file_manager
+        self.store = store
+        self.source_cache = source_cache
+        self.source_ranker = source_ranker
+        self.search_client = search_client
 
-    async def fetch_source(self, source_link: str) -> Set[str]:
+    async def fetch_source(self, source_link: str, protocol: str | None = None) -> Set[str]:
         """
         Fetch and parse proxies from a source URL.
 
+        With the state store, the outcome of the fetch is recorded for the
+        source, and when ``protocol`` is given the proxies are recorded as seen
+        and credited to it.
+
         Args:
             source_link: URL to fetch proxies from
+            protocol: Protocol of the source's proxies
 
         Returns:
             Set of found proxy strings
         """
+        source_link = to_raw_url(source_link)
         logger.info(f"Fetching proxies from source: {source_link}")
         start_time = asyncio.get_event_loop().time()
 
-        text = await http_client.get_text(source_link)
+        cached = self.source_cache.get(source_link) if self.source_cache else None
+        extractor = ProxyExtractor()
+        proxies: Set[str] = set()
+
+        def consume(chunk: bytes) -> None:
+            proxies.update(extractor.feed(chunk))
+
+        response = await http_client.fetch_chunks(
+            source_link, consume, validators=SourceCache.validators(cached)
+        )
         elapsed_time = asyncio.get_event_loop().time() - start_time
 
-        if not text:
+        if response and response.status == 304 and cached:
+            proxies = set(cached["proxies"])
+            logger.info(
+                f"✓ Reused {len(proxies)} cached proxies from unchanged {source_link} in {elapsed_time:.2f}s"
+            )
+            await self._record_fetch(source_link, protocol, proxies, unchanged=True)
+            return proxies
+
+        if not response or response.status != 200:
             logger.warning(
                 f"✗ No content received from {source_link} in {elapsed_time:.2f}s"
             )
+            gone = FETCH_STATUS.get() in GONE_STATUSES
+            await self._record_fetch(source_link, protocol, None, gone=gone)
             return set()
 
-        proxies = set()
-        for match in REGEX_PATTERN.finditer(text):
-            proxy = match.group(1)
-            if proxy:
-                proxies.add(proxy)
+        proxies.update(extractor.flush())
+
+        if self.source_cache:
+            self.source_cache.put(source_link, response.etag, response.last_modified, proxies)
 
         logger.info(
             f"✓ Parsed {len(proxies)} proxies from {source_link} in {elapsed_time:.2f}s"
         )
+        await self._record_fetch(source_link, protocol, proxies)
         return proxies
 
-    async def get_proxies(self, sources_urls: List[str]) -> List[Set[str]]:
+    async def _record_fetch(
+        self,
+        source_link: str,
+        protocol: str | None,
+        proxies: Set[str] | None,
+        gone: bool = False,
+        unchanged: bool = False,
+    ) -> None:
         """
-        Fetch proxies from multiple sources concurrently.
-
-        Args:
-            sources_urls: List of URLs to fetch from
+        Record a fetch in the state store, on the store's thread.
 
-        Returns:
-            List of proxy sets from each source
+        None proxies means the fetch failed. The proxies of an unchanged (304)
+        source were recorded when it was last downloaded, so they are only
+        written again if the store has never seen the source succeed.
         """
-        logger.info(f"Fetching proxies from {len(sources_urls)} sources concurrently")
-        start_time = asyncio.get_event_loop().time()
-
-        tasks = [self.fetch_source(url) for url in sources_urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Filter out exceptions and return valid results
-        valid_results = []
-        failed_count = 0
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"✗ Failed to fetch from {sources_urls[i]}: {result}")
-                failed_count += 1
-            else:
-                valid_results.append(result)
+        if not self.store:
+            return
+        store = self.store
 
-        elapsed_time = asyncio.get_event_loop().time() - start_time
-        total_proxies = sum(len(proxy_set) for proxy_set in valid_results)
+        def record() -> None:
+            record_seen = bool(protocol and proxies) and not (
+                unchanged and store.is_known_source(source_link)
+            )
+            store.record_source_fetch(
+                source_link, proxies is not None, len(proxies or ()), gone=gone
+            )
+            if record_seen:
+                store.upsert_seen(
+                    (f"{protocol}://{proxy}" for proxy in proxies), source=source_link
+                )
 
-        logger.info(
-            f"✓ Completed fetching from {len(sources_urls)} sources - {len(valid_results)} successful, {failed_count} failed, {total_proxies} total proxies in {elapsed_time:.2f}s"
-        )
-        return valid_results
+        await store.run(record)
 
-    def update_sources(self) -> None:
+    async def update_sources(self) -> None:
         """
         Update source files by searching GitHub for proxy files.
+
+        All queries, and the pages of each query, are searched concurrently under
+        the GitHub client's rate limiter. The parser's own ``search_client`` is
+        used when it has one, the shared client otherwise.
         """
         logger.info("Starting GitHub source update")
         start_time = asyncio.get_event_loop().time()
@@ -95,22 +148,24 @@ class ProxyParser:
         total_links = 0
         successful_searches = 0
 
-        for query, file_name in SEARCH_QUERIES.items():
-            logger.info(f"Searching for {query}")
+        search_client = self.search_client or github_client
+        queries = list(SEARCH_QUERIES.items())
+        results = await asyncio.gather(
+            *(search_client.search_query(query, DEPTH) for query, _ in queries),
+            return_exceptions=True,
+        )
+
+        for (query, file_name), all_links in zip(queries, results):
             path_to_source = self.file_manager.sources_path / file_name
 
-            all_links = set()
-            for page in range(DEPTH):
-                links_from_github = github_client.search_files(query, page + 1)
-                if links_from_github:
-                    all_links.update(links_from_github)
-                    logger.debug(
-                        f"Found {len(links_from_github)} links on page {page + 1} for {query}"
-                    )
-                else:
-                    logger.debug(f"No links found on page {page + 1} for {query}")
-
-            if all_links:
+            if all_links and not isinstance(all_links, Exception) and self.source_ranker:
+                # Searches keep finding sources that were pruned as dead
+                dead = self.source_ranker.dead([to_raw_url(link) for link in all_links])
+                all_links = [link for link in all_links if to_raw_url(link) not in dead]
+
+            if isinstance(all_links, Exception):
+                logger.error(f"✗ GitHub search failed for query {query}: {all_links}")
+            elif all_links:
                 logger.info(f"✓ Found {len(all_links)} total links for {query}")
                 self.file_manager.append_iterable_to_file(path_to_source, all_links)
                 self.file_manager.clean_duplicates(path_to_source)
@@ -124,16 +179,16 @@ class ProxyParser:
             f"✓ GitHub source update completed - {successful_searches}/{len(SEARCH_QUERIES)} searches successful, {total_links} total links in {elapsed_time:.2f}s"
         )
 
-    async def parse_unchecked_proxies(self) -> Set[str]:
+    def get_source_urls(self) -> Dict[str, List[str]]:
         """
-        Parse proxies from all source files.
+        Read the source files.
+
+        With a source ranker, sources are ordered by yield, dead ones are also
+        removed from their source file, and demoted ones are left out unless due.
 
         Returns:
-            Set of all found proxy strings
+            Mapping of protocol to source URLs, normalized to raw links and deduplicated
         """
-        logger.info("Starting proxy parsing from sources")
-        start_time = asyncio.get_event_loop().time()
-
         sources_list = self.file_manager.get_files_from_folder(
             self.file_manager.sources_path
         )
@@ -141,39 +196,102 @@ class ProxyParser:
 
         logger.info(f"Found {len(sources_dict)} source files to parse")
 
-        all_proxies = set()
-
+        source_urls = {}
         for protocol, urls in sources_dict.items():
             if not urls:
                 logger.warning(f"No URLs found for protocol: {protocol}")
                 continue
+            # Blob and raw links to the same file would otherwise be fetched twice
+            source_urls[protocol] = list(dict.fromkeys(to_raw_url(url) for url in urls))
+            if self.source_ranker:
+                source_urls[protocol] = self._rank_sources(protocol, urls, source_urls[protocol])
+        return source_urls
+
+    def _rank_sources(self, protocol: str, lines: List[str], urls: List[str]) -> List[str]:
+        """Order a protocol's sources and prune the dead ones from its source file."""
+        dead = self.source_ranker.dead(urls)
+        if dead:
+            path_to_source = self.file_manager.sources_path / f"{protocol}.txt"
+            self.file_manager.write_lines(
+                path_to_source, [line for line in lines if to_raw_url(line) not in dead]
+            )
+            logger.info(f"✓ Pruned {len(dead)} dead {protocol} sources from {path_to_source}")
+        return self.source_ranker.rank([url for url in urls if url not in dead])
 
-            logger.info(f"Parsing {protocol} proxies from {len(urls)} sources")
-            proxy_sets = await self.get_proxies(urls)
+    async def iter_source_proxies(
+        self, source_urls: Dict[str, List[str]]
+    ) -> AsyncGenerator[Tuple[str, Set[str]], None]:
+        """
+        Fetch all sources concurrently and yield each one's proxies as soon as it is parsed.
+
+        Args:
+            source_urls: Mapping of protocol to source URLs
 
-            # Combine all proxies from this protocol
-            protocol_proxies = set()
-            for proxy_set in proxy_sets:
-                protocol_proxies.update(proxy_set)
+        Yields:
+            Tuples of (protocol, proxies) in completion order
+        """
+
+        async def fetch(protocol: str, url: str) -> Tuple[str, Set[str]]:
+            try:
+                return protocol, await self.fetch_source(url, protocol)
+            except Exception as e:
+                logger.error(f"✗ Failed to fetch from {url}: {e}")
+                return protocol, set()
+
+        tasks = [
+            asyncio.create_task(fetch(protocol, url))
+            for protocol, urls in source_urls.items()
+            for url in urls
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def parse_unchecked_proxies(self) -> PackedProxySet:
+        """
+        Parse proxies from all source files.
+
+        Returns:
+            Packed set of all found proxies in format protocol://ip:port
+        """
+        logger.info("Starting proxy parsing from sources")
+        start_time = asyncio.get_event_loop().time()
+
+        source_urls = self.get_source_urls()
+        for protocol, urls in source_urls.items():
+            logger.info(f"Parsing {protocol} proxies from {len(urls)} sources")
 
-            # Add protocol prefix
-            formatted_proxies = {f"{protocol}://{proxy}" for proxy in protocol_proxies}
-            all_proxies.update(formatted_proxies)
+        # Pack every source as soon as its fetch completes so its strings can
+        # be freed, instead of holding all of a protocol's sets until the end
+        protocol_proxies = {protocol: PackedProxySet() for protocol in source_urls}
+        async for protocol, addresses in self.iter_source_proxies(source_urls):
+            protocol_proxies[protocol].add(protocol, addresses)
+            del addresses
 
-            logger.info(f"✓ Found {len(formatted_proxies)} {protocol} proxies")
+        all_proxies = PackedProxySet()
+        for protocol, proxies in protocol_proxies.items():
+            logger.info(f"✓ Found {len(proxies)} {protocol} proxies")
+            all_proxies.update(proxies)
 
         elapsed_time = asyncio.get_event_loop().time() - start_time
         logger.info(
-            f"✓ Proxy parsing completed - {len(all_proxies)} total proxies found in {elapsed_time:.2f}s"
+            f"✓ Proxy parsing completed - {len(all_proxies)} total proxies found "
+            f"({all_proxies.nbytes} bytes packed) in {elapsed_time:.2f}s"
         )
         return all_proxies
 
-    async def save_unchecked_proxies(self, proxies: Set[str], file_path: str) -> None:
+    async def save_unchecked_proxies(
+        self, proxies: Union[Set[str], PackedProxySet], file_path: str
+    ) -> None:
         """
         Save unchecked proxies to file.
 
         Args:
-            proxies: Set of proxy strings
+            proxies: Set or packed set of proxy strings
             file_path: Path to save proxies to
         """
         if not proxies:
@@ -181,7 +299,7 @@ class ProxyParser:
             return
 
         logger.info(f"Saving {len(proxies)} proxies to {file_path}")
-        self.file_manager.write_lines(Path(file_path), list(proxies))
+        self.file_manager.write_lines(Path(file_path), proxies)
         logger.info(f"✓ Saved {len(proxies)} proxies to {file_path}")
 
     async def get_unchecked_proxies(self, file_path: str) -> set[str]:
@@ -0,0 +1,280 @@
+"""
+In-process pool of working proxies for embedding in scrapers.
+"""
+
+import asyncio
+import bisect
+import random
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Optional
+
+# Latency floor for weights, so a near-zero measurement cannot dominate picks
+MIN_LATENCY = 0.01
+
+# Initial slots of the weight tree; it doubles when the pool outgrows it
+INITIAL_CAPACITY = 64
+
+
+@dataclass
+class PoolEntry:
+    """A proxy in the pool."""
+
+    proxy: str
+    latency: float
+    info: dict[str, Any] = field(default_factory=dict)
+    failures: int = 0
+    index: int = 0
+
+
+class ProxyPool:
+    """
+    Working proxies with O(1) rotation and latency-ordered selection.
+
+    Entries live in a list (for O(1) indexing), a dict from proxy to entry (for
+    O(1) lookup), a list of (latency, proxy) pairs kept sorted (for fastest
+    picks) and a Fenwick tree of 1 / latency weights by list position (for
+    O(log n) exact weighted picks and weight updates). Evicting swaps the last
+    entry into the freed slot, and picks index into these structures directly,
+    so nothing copies the pool.
+
+    Every method runs without awaiting, so under asyncio it is atomic with
+    respect to other tasks and needs no lock; the pool is not thread-safe.
+    """
+
+    def __init__(self, max_failures: int = 3):
+        """
+        Args:
+            max_failures: Failures reported by ``mark_failed`` before a proxy is evicted
+        """
+        self.max_failures = max_failures
+        self._entries: list[PoolEntry] = []
+        self._by_proxy: dict[str, PoolEntry] = {}
+        self._by_latency: list[tuple[float, str]] = []
+        self._cursor = 0
+        # Weight of each list position, and the Fenwick tree over them (1-based)
+        self._weights: list[float] = [0.0] * INITIAL_CAPACITY
+        self._tree: list[float] = [0.0] * (INITIAL_CAPACITY + 1)
+        self._not_empty = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, proxy: object) -> bool:
+        return proxy in self._by_proxy
+
+    def get(self, proxy: str) -> Optional[PoolEntry]:
+        """Get the entry of a proxy, or None if it is not in the pool."""
+        return self._by_proxy.get(proxy)
+
+    def add(self, proxy: str, latency: float, info: Optional[dict[str, Any]] = None) -> None:
+        """
+        Add a working proxy, or update its latency and info if already pooled.
+
+        Args:
+            proxy: Proxy in format protocol://ip:port
+            latency: Check latency in seconds
+            info: Judge response of the check
+        """
+        entry = self._by_proxy.get(proxy)
+        if entry is not None:
+            self._unindex_latency(entry)
+            entry.latency = latency
+            entry.failures = 0
+            if info is not None:
+                entry.info = info
+        else:
+            entry = PoolEntry(proxy, latency, info or {}, index=len(self._entries))
+            self._entries.append(entry)
+            self._by_proxy[proxy] = entry
+            if entry.index >= len(self._weights):
+                self._grow()
+        bisect.insort(self._by_latency, (latency, proxy))
+        self._set_weight(entry.index, self._weight(latency))
+        self._not_empty.set()
+
+    async def fill(self, results: AsyncIterable[tuple[str, dict[str, Any], float]]) -> int:
+        """
+        Add working proxies as a checker reports them.
+
+        Args:
+            results: Tuples of (proxy, response_data, elapsed_time), e.g.
+                ``ProxyChecker.check_proxies_generator(...)``
+
+        Returns:
+            Number of proxies added or refreshed
+        """
+        count = 0
+        async for proxy, response_data, elapsed_time in results:
+            self.add(proxy, elapsed_time, response_data)
+            count += 1
+        return count
+
+    def evict(self, proxy: str) -> bool:
+        """
+        Remove a proxy from the pool.
+
+        Args:
+            proxy: Proxy to remove
+
+        Returns:
+            True if the proxy was pooled
+        """
+        entry = self._by_proxy.pop(proxy, None)
+        if entry is None:
+            return False
+
+        last = self._entries.pop()
+        self._set_weight(last.index, 0.0)
+        if last is not entry:
+            last.index = entry.index
+            self._entries[entry.index] = last
+            self._set_weight(last.index, self._weight(last.latency))
+        self._unindex_latency(entry)
+
+        if not self._entries:
+            # Start from exact zeros again, dropping accumulated rounding
+            self._weights = [0.0] * len(self._weights)
+            self._tree = [0.0] * len(self._tree)
+            self._not_empty.clear()
+        return True
+
+    def mark_failed(self, proxy: str) -> bool:
+        """
+        Report that a proxy failed for the caller; it is evicted after ``max_failures``.
+
+        Args:
+            proxy: Proxy that failed
+
+        Returns:
+            True if the proxy was evicted
+        """
+        entry = self._by_proxy.get(proxy)
+        if entry is None:
+            return False
+        entry.failures += 1
+        if entry.failures >= self.max_failures:
+            return self.evict(proxy)
+        return False
+
+    def mark_success(self, proxy: str, latency: Optional[float] = None) -> None:
+        """
+        Report that a proxy worked, resetting its failures.
+
+        Args:
+            proxy: Proxy that worked
+            latency: Observed latency in seconds, replacing the checked one
+        """
+        entry = self._by_proxy.get(proxy)
+        if entry is None:
+            return
+        entry.failures = 0
+        if latency is not None:
+            self.add(proxy, latency)
+
+    def round_robin(self) -> Optional[str]:
+        """
+        Get the next proxy in rotation.
+
+        An eviction moves the last proxy into the freed slot, so it may be
+        served once early or late in the current round.
+
+        Returns:
+            Proxy string, or None if the pool is empty
+        """
+        if not self._entries:
+            return None
+        if self._cursor >= len(self._entries):
+            self._cursor = 0
+        entry = self._entries[self._cursor]
+        self._cursor += 1
+        return entry.proxy
+
+    def weighted_random(self) -> Optional[str]:
+        """
+        Get a random proxy, with probability proportional to 1 / latency.
+
+        Draws a point in [0, total weight) and descends the weight tree to the
+        position whose cumulative weight covers it, in O(log n).
+
+        Returns:
+            Proxy string, or None if the pool is empty
+        """
+        if not self._entries:
+            return None
+        tree = self._tree
+        target = random.random() * self._total_weight()
+        position = 0
+        step = 1 << (len(tree) - 1).bit_length() - 1
+        while step:
+            upper = position + step
+            if upper < len(tree) and tree[upper] <= target:
+                target -= tree[upper]
+                position = upper
+            step >>= 1
+        # Rounding can leave the draw just past the last weight
+        return self._entries[min(position, len(self._entries) - 1)].proxy
+
+    def fastest(self, count: int = 1) -> list[str]:
+        """
+        Get the lowest-latency proxies.
+
+        Args:
+            count: Number of proxies
+
+        Returns:
+            Up to ``count`` proxies, fastest first
+        """
+        return [proxy for _, proxy in self._by_latency[:count]]
+
+    def random_fastest(self, count: int) -> Optional[str]:
+        """
+        Get a uniformly random proxy among the ``count`` fastest.
+
+        Args:
+            count: Size of the fast tier to pick from
+
+        Returns:
+            Proxy string, or None if the pool is empty
+        """
+        if not self._by_latency:
+            return None
+        return self._by_latency[random.randrange(min(count, len(self._by_latency)))][1]
+
+    async def wait_not_empty(self) -> None:
+        """Wait until the pool has at least one proxy."""
+        await self._not_empty.wait()
+
+    @staticmethod
+    def _weight(latency: float) -> float:
+        return 1.0 / max(latency, MIN_LATENCY)
+
+    def _set_weight(self, index: int, weight: float) -> None:
+        delta = weight - self._weights[index]
+        self._weights[index] = weight
+        tree = self._tree
+        position = index + 1
+        while position < len(tree):
+            tree[position] += delta
+            position += position & -position
+
+    def _total_weight(self) -> float:
+        total = 0.0
+        position = len(self._tree) - 1
+        while position:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def _grow(self) -> None:
+        """Double the weight tree's capacity, rebuilding it in O(n)."""
+        self._weights.extend([0.0] * len(self._weights))
+        tree = [0.0, *self._weights]
+        for position in range(1, len(tree)):
+            parent = position + (position & -position)
+            if parent < len(tree):
+                tree[parent] += tree[position]
+        self._tree = tree
+
+    def _unindex_latency(self, entry: PoolEntry) -> None:
+        position = bisect.bisect_left(self._by_latency, (entry.latency, entry.proxy))
+        del self._by_latency[position]
@@ -0,0 +1,136 @@
+"""
+Liveness-aware selection of which candidates to check in a cycle.
+"""
+
+import heapq
+import time
+from typing import Iterable, Optional
+
+from loguru import logger
+
+from proxy_parser.config import CHECK_BUDGET, BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS
+from proxy_parser.store import ProxyStore, batched
+
+# Liveness and staleness assumed for proxies that were never checked, so that they
+# rank below proxies known to be alive and above mostly dead ones
+UNKNOWN_LIVENESS = 0.5
+UNKNOWN_STALENESS = 0.25
+
+
+class RecheckScheduler:
+    """
+    Pick the candidates worth checking this cycle.
+
+    Proxies that failed N times in a row are not rechecked until
+    ``base * 2 ** (N - 1)`` seconds (capped at ``max_backoff``) have passed since
+    their last check. Due candidates are ranked by liveness (EWMA of success)
+    plus staleness, and at most ``budget`` of them are returned.
+    """
+
+    def __init__(
+        self,
+        store: ProxyStore,
+        budget: int = CHECK_BUDGET,
+        base_backoff: float = BACKOFF_BASE_SECONDS,
+        max_backoff: float = BACKOFF_MAX_SECONDS,
+    ):
+        self.store = store
+        self.budget = budget
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+    def backoff(self, consecutive_failures: int) -> float:
+        """Return how long to wait before rechecking after this many failures."""
+        if consecutive_failures <= 0:
+            return 0.0
+        return min(self.base_backoff * 2 ** (consecutive_failures - 1), self.max_backoff)
+
+    def score(
+        self,
+        now: float,
+        last_checked: Optional[float],
+        consecutive_failures: int,
+        liveness: float,
+    ) -> Optional[float]:
+        """
+        Score a candidate, or return None if it is still backing off.
+
+        Args:
+            now: Current timestamp
+            last_checked: When the proxy was last checked (None if never)
+            consecutive_failures: Failed checks in a row
+            liveness: EWMA of check success in [0, 1]
+
+        Returns:
+            Priority (higher is checked first) or None if not due
+        """
+        if last_checked is None:
+            return UNKNOWN_LIVENESS + UNKNOWN_STALENESS
+
+        age = now - last_checked
+        if age < self.backoff(consecutive_failures):
+            return None
+        return liveness + min(age / self.max_backoff, 1.0)
+
+    def filter_due(self, candidates: list[str], now: Optional[float] = None) -> list[str]:
+        """
+        Drop the candidates that are still backing off, without ranking.
+
+        Used when candidates arrive as a stream and cannot be ranked as a whole.
+
+        Args:
+            candidates: Proxy strings
+            now: Current timestamp (defaults to the current time)
+
+        Returns:
+            Candidates that are due, in input order
+        """
+        now = now or time.time()
+        due = []
+        for batch in batched(candidates, self.store.batch_size):
+            states = self.store.get_schedule_states(batch)
+            due.extend(
+                proxy
+                for proxy in batch
+                if proxy not in states or self.score(now, *states[proxy]) is not None
+            )
+        return due
+
+    def select(self, candidates: Iterable[str], now: Optional[float] = None) -> list[str]:
+        """
+        Select the candidates to check this cycle.
+
+        Candidates are looked up in the store in batches, so only the selected
+        proxies are kept in memory.
+
+        Args:
+            candidates: Proxy strings found this cycle
+            now: Current timestamp (defaults to the current time)
+
+        Returns:
+            Proxies to check, highest priority first
+        """
+        now = now or time.time()
+        total = 0
+        backing_off = 0
+        heap: list[tuple[float, str]] = []
+
+        for batch in batched(candidates, self.store.batch_size):
+            total += len(batch)
+            states = self.store.get_schedule_states(batch)
+            for proxy in batch:
+                state = states.get(proxy)
+                priority = self.score(now, *state) if state else self.score(now, None, 0, 0.0)
+                if priority is None:
+                    backing_off += 1
+                elif not self.budget or len(heap) < self.budget:
+                    heapq.heappush(heap, (priority, proxy))
+                elif priority > heap[0][0]:
+                    heapq.heapreplace(heap, (priority, proxy))
+
+        selected = [proxy for _, proxy in sorted(heap, reverse=True)]
+        logger.info(
+            f"✓ Scheduled {len(selected)}/{total} proxies for checking - {backing_off} backing off, "
+            f"{total - backing_off - len(selected)} over budget"
+        )
+        return selected
@@ -0,0 +1,218 @@
+"""
+Proxy checking sharded across worker processes.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import queue
+import time
+from typing import Any, AsyncGenerator, AsyncIterable, Iterable, Optional
+
+from proxy_parser.checkers import ProxyChecker, _aiter, bounded_map, record_check
+from proxy_parser.config import (
+    CHECK_WORKERS,
+    JUDGE_URL,
+    PROXY_CHECK_TIMEOUT,
+    PROXY_CHECK_URL,
+    SHARD_BATCH_SIZE,
+)
+from proxy_parser.http_client import http_client
+from proxy_parser.store import ProxyStore
+
+logger = logging.getLogger(__name__)
+
+# Results are sent back to the parent in batches of this size, or after this long
+RESULT_BATCH_SIZE = 100
+RESULT_FLUSH_SECONDS = 0.5
+
+# How long the parent waits on the result queue before checking worker liveness
+POLL_SECONDS = 0.5
+
+
+async def _put(target: multiprocessing.Queue, item: Any) -> None:
+    """Put on a bounded process queue without blocking the event loop or a thread."""
+    while True:
+        try:
+            target.put_nowait(item)
+            return
+        except queue.Full:
+            await asyncio.sleep(0.01)
+
+
+def _worker_main(
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    workers: int,
+    timeout: int,
+    check_url: str,
+) -> None:
+    """Entry point of a worker process."""
+    asyncio.run(_worker_loop(tasks, results, workers, timeout, check_url))
+
+
+async def _worker_loop(
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    workers: int,
+    timeout: int,
+    check_url: str,
+) -> None:
+    """
+    Check batches from the task queue until the stop marker arrives.
+
+    Every outcome, working or not, is sent back as (proxy, result, reason,
+    elapsed) so the parent can record it and its metrics; result is the
+    ``check_proxy`` tuple or None and reason is None for working proxies.
+    """
+    loop = asyncio.get_running_loop()
+    checker = ProxyChecker(timeout=timeout, workers=workers, check_url=check_url)
+    if JUDGE_URL:
+        await checker.detect_real_ip()
+
+    async def candidates() -> AsyncGenerator[str, None]:
+        while (batch := await loop.run_in_executor(None, tasks.get)) is not None:
+            for proxy in batch:
+                yield proxy
+
+    # The result queue is unbounded, so putting on it never blocks
+    pending: list[tuple[str, Any, Optional[str], float]] = []
+    flushed_at = time.monotonic()
+    try:
+        async for proxy, outcome in bounded_map(
+            checker.check_proxy_outcome, candidates(), workers
+        ):
+            pending.append((proxy, *outcome))
+            now = time.monotonic()
+            if len(pending) >= RESULT_BATCH_SIZE or now - flushed_at >= RESULT_FLUSH_SECONDS:
+                results.put(pending)
+                pending = []
+                flushed_at = now
+        if pending:
+            results.put(pending)
+    finally:
+        await http_client.aclose()
+        results.put(None)
+
+
+class ShardedChecker:
+    """
+    Check proxies in several processes, each with its own event loop and ProxyChecker.
+
+    The parent splits candidates into batches on a shared queue, so idle
+    processes pull the next batch and the load balances itself. Results stream
+    back on a second queue. Only the parent touches the state store and output
+    files, and it records the check metrics from the streamed outcomes.
+    ``check_proxies_generator`` matches ``ProxyChecker`` so the orchestrator can
+    use either one.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        timeout: int = PROXY_CHECK_TIMEOUT,
+        workers: int = CHECK_WORKERS,
+        check_url: str = PROXY_CHECK_URL,
+        store: Optional[ProxyStore] = None,
+        batch_size: int = SHARD_BATCH_SIZE,
+    ):
+        self.processes = processes
+        self.timeout = timeout
+        # Total concurrency stays at `workers`; only the CPU work is spread out
+        self.workers_per_process = max(1, math.ceil(workers / processes))
+        self.check_url = check_url
+        self.store = store
+        self.batch_size = batch_size
+
+    async def check_proxies_generator(
+        self, proxies: Iterable[str] | AsyncIterable[str]
+    ) -> AsyncGenerator[tuple[str, dict[str, Any], float], None]:
+        """
+        Check proxies across the worker processes.
+
+        Args:
+            proxies: Iterable or async iterable of proxy strings
+
+        Yields:
+            Tuples of (proxy, response_data, elapsed_time) for working proxies
+        """
+        context = multiprocessing.get_context("spawn")
+        tasks = context.Queue(maxsize=self.processes * 4)
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=_worker_main,
+                args=(tasks, results, self.workers_per_process, self.timeout, self.check_url),
+                daemon=True,
+            )
+            for _ in range(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        logger.info(
+            f"Started {self.processes} checker processes with {self.workers_per_process} workers each"
+        )
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+
+        async def feed() -> None:
+            batch: list[str] = []
+            try:
+                async for proxy in _aiter(proxies):
+                    batch.append(proxy)
+                    if len(batch) >= self.batch_size:
+                        await _put(tasks, batch)
+                        batch = []
+                if batch:
+                    await _put(tasks, batch)
+            except Exception as e:
+                logger.error(f"✗ Error reading proxies for checker processes: {e}")
+            for _ in workers:
+                await _put(tasks, None)
+
+        feeder = asyncio.create_task(feed())
+        working_count = 0
+        failed_count = 0
+        finished = 0
+
+        try:
+            while finished < len(workers):
+                try:
+                    batch = await loop.run_in_executor(None, results.get, True, POLL_SECONDS)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        logger.error("✗ All checker processes exited before finishing")
+                        break
+                    continue
+
+                if batch is None:
+                    finished += 1
+                    continue
+
+                if self.store:
+                    await self.store.run(
+                        self.store.record_results,
+                        [(proxy, result[2] if result else None) for proxy, result, _, _ in batch],
+                    )
+                for proxy, result, reason, elapsed in batch:
+                    record_check(proxy, elapsed, reason)
+                    if result:
+                        working_count += 1
+                        yield result
+                    else:
+                        failed_count += 1
+        finally:
+            feeder.cancel()
+            await asyncio.gather(feeder, return_exceptions=True)
+            for worker in workers:
+                if finished < len(workers):
+                    worker.terminate()
+                worker.join(timeout=5)
+
+        elapsed_time = loop.time() - start_time
+        logger.info(
+            f"✓ Sharded checking completed - {working_count} working, {failed_count} failed "
+            f"across {self.processes} processes in {elapsed_time:.2f}s"
+        )
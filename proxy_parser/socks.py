@@ -0,0 +1,258 @@
+"""
+Minimal SOCKS4/4a/5 client on top of asyncio streams.
+
+Only what a proxy check needs is implemented: a CONNECT handshake without
+authentication followed by a single HTTP/1.1 request whose response is read
+until Content-Length is satisfied or the proxy closes the connection.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import ssl
+import struct
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+SOCKS_PROTOCOLS = ("socks4", "socks4a", "socks5")
+
+# Upper bound for a judge response; anything bigger is not a judge
+MAX_RESPONSE_SIZE = 64 * 1024
+
+SOCKS4_GRANTED = 0x5A
+SOCKS5_NO_AUTH = 0x00
+SOCKS5_SUCCEEDED = 0x00
+
+# SOCKS4 cannot carry host names, so judge hosts are resolved locally once
+_resolved_hosts: Dict[str, bytes] = {}
+
+
+class SocksError(Exception):
+    """Raised when a SOCKS proxy rejects the handshake or answers garbage."""
+
+
+async def _socks4_connect(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    host: str,
+    port: int,
+    remote_dns: bool,
+) -> None:
+    """Perform a SOCKS4 (or SOCKS4a when remote_dns is set) CONNECT."""
+    suffix = b""
+    try:
+        address = ipaddress.IPv4Address(host).packed
+    except ValueError:
+        if remote_dns:
+            # SOCKS4a: an invalid 0.0.0.x address tells the proxy to resolve the name
+            address = b"\x00\x00\x00\x01"
+            suffix = host.encode("idna") + b"\x00"
+        elif host in _resolved_hosts:
+            address = _resolved_hosts[host]
+        else:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, family=socket.AF_INET, type=socket.SOCK_STREAM
+            )
+            address = _resolved_hosts[host] = socket.inet_aton(infos[0][4][0])
+
+    writer.write(struct.pack(">BBH", 4, 1, port) + address + b"\x00" + suffix)
+    await writer.drain()
+
+    reply = await reader.readexactly(8)
+    if reply[1] != SOCKS4_GRANTED:
+        raise SocksError(f"SOCKS4 request rejected with code {reply[1]:#x}")
+
+
+async def _socks5_connect(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    host: str,
+    port: int,
+) -> None:
+    """Perform a SOCKS5 CONNECT without authentication."""
+    writer.write(b"\x05\x01" + bytes([SOCKS5_NO_AUTH]))
+    await writer.drain()
+
+    version, method = await reader.readexactly(2)
+    if version != 5 or method != SOCKS5_NO_AUTH:
+        raise SocksError(f"SOCKS5 proxy refused no-auth method ({version}, {method:#x})")
+
+    try:
+        address = ipaddress.ip_address(host)
+        destination = (b"\x01" if address.version == 4 else b"\x04") + address.packed
+    except ValueError:
+        name = host.encode("idna")
+        destination = b"\x03" + bytes([len(name)]) + name
+
+    writer.write(b"\x05\x01\x00" + destination + struct.pack(">H", port))
+    await writer.drain()
+
+    version, reply, _, address_type = await reader.readexactly(4)
+    if version != 5 or reply != SOCKS5_SUCCEEDED:
+        raise SocksError(f"SOCKS5 request rejected with code {reply:#x}")
+
+    # Skip the bound address and port
+    if address_type == 1:
+        await reader.readexactly(4 + 2)
+    elif address_type == 3:
+        length = (await reader.readexactly(1))[0]
+        await reader.readexactly(length + 2)
+    elif address_type == 4:
+        await reader.readexactly(16 + 2)
+    else:
+        raise SocksError(f"SOCKS5 reply has unknown address type {address_type}")
+
+
+async def open_socks_connection(
+    protocol: str, proxy_host: str, proxy_port: int, host: str, port: int
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Open a stream to host:port tunnelled through a SOCKS proxy.
+
+    Args:
+        protocol: One of "socks4", "socks4a" or "socks5"
+        proxy_host: Proxy IP address or host name
+        proxy_port: Proxy port
+        host: Destination host name or IP address
+        port: Destination port
+
+    Returns:
+        Tuple of (reader, writer) connected to the destination
+    """
+    if protocol not in SOCKS_PROTOCOLS:
+        raise SocksError(f"Unsupported proxy protocol: {protocol}")
+
+    reader, writer = await asyncio.open_connection(proxy_host, proxy_port)
+    try:
+        if protocol == "socks5":
+            await _socks5_connect(reader, writer, host, port)
+        else:
+            await _socks4_connect(reader, writer, host, port, remote_dns=protocol == "socks4a")
+    except BaseException:
+        writer.close()
+        raise
+    return reader, writer
+
+
+def _decode_chunked(body: bytes) -> bytes:
+    """Decode a chunked transfer-encoded body."""
+    decoded = bytearray()
+    position = 0
+    while True:
+        line_end = body.index(b"\r\n", position)
+        size = int(body[position:line_end].split(b";", 1)[0], 16)
+        if size == 0:
+            return bytes(decoded)
+        start = line_end + 2
+        decoded += body[start:start + size]
+        position = start + size + 2
+
+
+def _content_length(head: bytes) -> int | None:
+    """Return the Content-Length of a response head, if present."""
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            return int(value)
+    return None
+
+
+async def _read_response(reader: asyncio.StreamReader) -> bytes:
+    """Read a response until the body is complete, EOF or MAX_RESPONSE_SIZE."""
+    raw = b""
+    length = None
+    while len(raw) < MAX_RESPONSE_SIZE:
+        chunk = await reader.read(MAX_RESPONSE_SIZE - len(raw))
+        if not chunk:
+            break
+        raw += chunk
+
+        head, separator, body = raw.partition(b"\r\n\r\n")
+        if separator:
+            if length is None:
+                length = _content_length(head)
+            if length is not None and len(body) >= length:
+                break
+    return raw
+
+
+def parse_http_response(raw: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Parse a complete HTTP/1.x response.
+
+    Args:
+        raw: Raw response bytes, read until the connection was closed
+
+    Returns:
+        Tuple of (status, headers with lower-cased names, body)
+    """
+    head, separator, body = raw.partition(b"\r\n\r\n")
+    if not separator:
+        raise SocksError("Incomplete HTTP response")
+
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    parts = status_line.split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise SocksError(f"Malformed HTTP status line: {status_line[:64]!r}")
+
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = _decode_chunked(body)
+    elif "content-length" in headers:
+        body = body[: int(headers["content-length"])]
+
+    return int(parts[1]), headers, body
+
+
+async def socks_http_get(
+    protocol: str,
+    proxy_host: str,
+    proxy_port: int,
+    url: str,
+    headers: Dict[str, str],
+    timeout: float,
+) -> Tuple[int, bytes]:
+    """
+    Make a single HTTP GET request through a SOCKS proxy.
+
+    Args:
+        protocol: One of "socks4", "socks4a" or "socks5"
+        proxy_host: Proxy IP address or host name
+        proxy_port: Proxy port
+        url: URL to fetch (http or https)
+        headers: Extra request headers
+        timeout: Total time allowed for handshake, request and response
+
+    Returns:
+        Tuple of (status, body)
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    host = parts.hostname or ""
+    port = parts.port or (443 if secure else 80)
+    target = parts.path or "/"
+    if parts.query:
+        target += f"?{parts.query}"
+
+    request_headers = {"Host": parts.netloc, **headers, "Connection": "close"}
+    request = f"GET {target} HTTP/1.1\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in request_headers.items()
+    )
+
+    async with asyncio.timeout(timeout):
+        reader, writer = await open_socks_connection(protocol, proxy_host, proxy_port, host, port)
+        try:
+            if secure:
+                await writer.start_tls(ssl.create_default_context(), server_hostname=host)
+            writer.write(request.encode("latin-1") + b"\r\n")
+            await writer.drain()
+            raw = await _read_response(reader)
+        finally:
+            writer.close()
+
+    status, _, body = parse_http_response(raw)
+    return status, body
@@ -0,0 +1,134 @@
+"""
+Yield-based ordering and pruning of source URLs.
+"""
+
+import time
+from typing import Any, Optional
+
+from loguru import logger
+
+from proxy_parser.config import (
+    SOURCE_BACKOFF_BASE,
+    SOURCE_MAX_FAILURES,
+    SOURCE_MIN_FETCHES,
+    SOURCE_DEMOTED_INTERVAL,
+)
+from proxy_parser.store import ProxyStore, batched
+
+# Working proxies are what a source is for; unique candidates only break ties
+UNIQUE_WEIGHT = 0.001
+
+
+class SourceRanker:
+    """
+    Order sources by what they contribute and drop the ones that contribute nothing.
+
+    A source is dead after ``max_failures`` permanent answers (404, 410) with
+    no successful fetch in between; dead sources are dropped and not added back
+    when the GitHub search finds them again. Transient failures (timeouts, 429s,
+    5xx, a local outage) never make a source dead: after ``max_failures`` of them
+    in a row the source is only rested, starting at ``base_backoff`` seconds and
+    doubling per further failure up to ``demoted_interval``, so an outage of the
+    host costs at most a delayed retry. A source is demoted when, after
+    ``min_fetches`` fetches, none of the proxies first found in it is working; a
+    demoted source is fetched at most once per ``demoted_interval`` seconds.
+    Everything else is fetched best score first, and never fetched sources
+    before all of them, so they get evaluated.
+    """
+
+    def __init__(
+        self,
+        store: ProxyStore,
+        max_failures: int = SOURCE_MAX_FAILURES,
+        min_fetches: int = SOURCE_MIN_FETCHES,
+        demoted_interval: float = SOURCE_DEMOTED_INTERVAL,
+        base_backoff: float = SOURCE_BACKOFF_BASE,
+    ):
+        self.store = store
+        self.max_failures = max_failures
+        self.min_fetches = min_fetches
+        self.demoted_interval = demoted_interval
+        self.base_backoff = base_backoff
+
+    @staticmethod
+    def score(stats: dict[str, Any]) -> float:
+        """Working proxies contributed, then unique candidates, minus failures in a row."""
+        return (
+            stats["working_count"]
+            + UNIQUE_WEIGHT * stats["unique_count"]
+            - stats["consecutive_failures"]
+        )
+
+    def is_dead(self, stats: Optional[dict[str, Any]]) -> bool:
+        """Whether a source answered 404 or 410 too many times to keep."""
+        return bool(stats and self.max_failures and stats["gone_count"] >= self.max_failures)
+
+    def rest_seconds(self, stats: dict[str, Any]) -> float:
+        """Minimum delay between fetches of a source that is not dead; 0 if none."""
+        rest = 0.0
+        extra_failures = stats["consecutive_failures"] - self.max_failures
+        if self.max_failures and extra_failures >= 0:
+            rest = min(self.base_backoff * 2**extra_failures, self.demoted_interval)
+        if self.is_demoted(stats):
+            rest = max(rest, self.demoted_interval)
+        return rest
+
+    def is_demoted(self, stats: Optional[dict[str, Any]]) -> bool:
+        """Whether a source was fetched enough times without contributing a working proxy."""
+        return bool(
+            stats
+            and self.min_fetches
+            and stats["fetch_count"] >= self.min_fetches
+            and stats["working_count"] == 0
+        )
+
+    def stats(self, urls: list[str]) -> dict[str, dict[str, Any]]:
+        """Look up the statistics of many sources in batches."""
+        stats: dict[str, dict[str, Any]] = {}
+        for batch in batched(urls, self.store.batch_size):
+            stats.update(self.store.get_source_stats(batch))
+        return stats
+
+    def dead(self, urls: list[str]) -> set[str]:
+        """Return the URLs among ``urls`` that are dead."""
+        stats = self.stats(urls)
+        return {url for url in urls if self.is_dead(stats.get(url))}
+
+    def rank(self, urls: list[str], now: Optional[float] = None) -> list[str]:
+        """
+        Select and order the sources to fetch this cycle.
+
+        Args:
+            urls: Source URLs of one protocol
+            now: Current timestamp (defaults to the current time)
+
+        Returns:
+            URLs to fetch: unknown sources first, then by score, then demoted or
+            failing sources that are due; dead and resting sources are left out
+        """
+        now = now or time.time()
+        stats = self.stats(urls)
+        unknown, scored, demoted = [], [], []
+        dead_count = resting_count = 0
+
+        for url in urls:
+            entry = stats.get(url)
+            if entry is None:
+                unknown.append(url)
+            elif self.is_dead(entry):
+                dead_count += 1
+            elif rest := self.rest_seconds(entry):
+                if now - (entry["last_fetched"] or 0) >= rest:
+                    demoted.append(url)
+                else:
+                    resting_count += 1
+            else:
+                scored.append(url)
+
+        scored.sort(key=lambda url: self.score(stats[url]), reverse=True)
+        if dead_count or resting_count or demoted:
+            logger.info(
+                f"✓ Ranked {len(urls)} sources - {dead_count} dead, {resting_count} resting, "
+                f"{len(demoted)} demoted or failing but due"
+            )
+        return unknown + scored + demoted
@@ -0,0 +1,366 @@
+"""
+Persistent per-proxy state shared across cycles.
+"""
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+import orjson
+from loguru import logger
+
+from proxy_parser.config import STATE_DB_FILE, STORE_BATCH_SIZE, LATENCY_HISTORY_SIZE
+
+T = TypeVar("T")
+
+# Weight of the latest check in the liveness moving average
+LIVENESS_ALPHA = 0.3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proxies (
+    proxy TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_checked REAL,
+    last_success REAL,
+    last_failure REAL,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    liveness REAL NOT NULL DEFAULT 0,
+    latencies TEXT NOT NULL DEFAULT '[]',
+    source TEXT
+) WITHOUT ROWID
+"""
+
+SOURCES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    url TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_fetched REAL,
+    fetch_count INTEGER NOT NULL DEFAULT 0,
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    gone_count INTEGER NOT NULL DEFAULT 0,
+    last_candidates INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID
+"""
+
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Split an iterable into lists of at most `size` items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class ProxyStore:
+    """
+    SQLite store keyed by proxy with first-seen time and check history.
+
+    Writing a large source or a batch of results takes long enough to stall
+    the event loop, so async code goes through ``run``, which executes store
+    work on the store's own thread, one call at a time and in order.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = STATE_DB_FILE,
+        batch_size: int = STORE_BATCH_SIZE,
+        history_size: int = LATENCY_HISTORY_SIZE,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.history_size = history_size
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(SCHEMA)
+        self.connection.execute(SOURCES_SCHEMA)
+        columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(proxies)")}
+        if "source" not in columns:
+            # Stores created before sources were tracked
+            self.connection.execute("ALTER TABLE proxies ADD COLUMN source TEXT")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS proxies_source ON proxies (source)")
+        columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(sources)")}
+        if "gone_count" not in columns:
+            self.connection.execute(
+                "ALTER TABLE sources ADD COLUMN gone_count INTEGER NOT NULL DEFAULT 0"
+            )
+        self.connection.commit()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="proxy-store")
+
+    async def run(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a function that uses the store on the store's thread.
+
+        Args:
+            function: Store method, or a function calling store methods
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            What the function returned
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(function, *args, **kwargs))
+
+    def upsert_seen(
+        self, proxies: Iterable[str], now: Optional[float] = None, source: Optional[str] = None
+    ) -> int:
+        """
+        Record that proxies were found in sources during this cycle.
+
+        New proxies get their first-seen time; known ones only get last_seen updated.
+        A proxy is credited to the first source it was found in.
+
+        Args:
+            proxies: Proxy strings in format protocol://ip:port
+            now: Timestamp to record (defaults to the current time)
+            source: URL of the source the proxies were found in
+
+        Returns:
+            Number of proxies written
+        """
+        now = now or time.time()
+        written = 0
+        try:
+            with self.connection:
+                for batch in batched(proxies, self.batch_size):
+                    self.connection.executemany(
+                        "INSERT INTO proxies (proxy, first_seen, last_seen, source) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(proxy) DO UPDATE SET last_seen = excluded.last_seen, "
+                        "source = COALESCE(source, excluded.source)",
+                        ((proxy, now, now, source) for proxy in batch),
+                    )
+                    written += len(batch)
+            logger.debug(f"Upserted {written} seen proxies into {self.db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Error upserting seen proxies into {self.db_path}: {e}")
+        return written
+
+    def record_results(
+        self, results: Iterable[tuple[str, Optional[float]]], now: Optional[float] = None
+    ) -> int:
+        """
+        Record check outcomes.
+
+        Args:
+            results: Tuples of (proxy, latency); latency is None for a failed check
+            now: Timestamp to record (defaults to the current time)
+
+        Returns:
+            Number of results written
+        """
+        now = now or time.time()
+        written = 0
+        try:
+            with self.connection:
+                for batch in batched(results, self.batch_size):
+                    self._record_batch(batch, now)
+                    written += len(batch)
+            logger.debug(f"Recorded {written} check results into {self.db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Error recording check results into {self.db_path}: {e}")
+        return written
+
+    def _record_batch(self, batch: list[tuple[str, Optional[float]]], now: float) -> None:
+        """Merge one batch of results with the stored history."""
+        placeholders = ",".join("?" * len(batch))
+        rows = self.connection.execute(
+            f"SELECT proxy, consecutive_failures, liveness, latencies FROM proxies "
+            f"WHERE proxy IN ({placeholders}) AND last_checked IS NOT NULL",
+            [proxy for proxy, _ in batch],
+        )
+        # Running state per proxy, so repeated proxies within a batch chain correctly
+        known = {
+            row["proxy"]: (row["consecutive_failures"], row["liveness"], orjson.loads(row["latencies"]))
+            for row in rows
+        }
+
+        updates = []
+        for proxy, latency in batch:
+            ok = latency is not None
+            if proxy in known:
+                failures, liveness, latencies = known[proxy]
+                liveness = LIVENESS_ALPHA * ok + (1 - LIVENESS_ALPHA) * liveness
+            else:
+                # The first check seeds the average
+                failures, liveness, latencies = 0, float(ok), []
+
+            if ok:
+                latencies = (latencies + [round(latency, 4)])[-self.history_size:]
+            failures = 0 if ok else failures + 1
+            known[proxy] = (failures, liveness, latencies)
+
+            updates.append(
+                (
+                    proxy,
+                    now,
+                    now,
+                    now,
+                    now if ok else None,
+                    None if ok else now,
+                    failures,
+                    int(ok),
+                    int(not ok),
+                    liveness,
+                    orjson.dumps(latencies).decode(),
+                )
+            )
+
+        self.connection.executemany(
+            """
+            INSERT INTO proxies (
+                proxy, first_seen, last_seen, last_checked, last_success, last_failure,
+                consecutive_failures, success_count, failure_count, liveness, latencies
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(proxy) DO UPDATE SET
+                last_checked = excluded.last_checked,
+                last_success = COALESCE(excluded.last_success, last_success),
+                last_failure = COALESCE(excluded.last_failure, last_failure),
+                consecutive_failures = excluded.consecutive_failures,
+                success_count = success_count + excluded.success_count,
+                failure_count = failure_count + excluded.failure_count,
+                liveness = excluded.liveness,
+                latencies = excluded.latencies
+            """,
+            updates,
+        )
+
+    def get_schedule_states(
+        self, proxies: list[str]
+    ) -> dict[str, tuple[Optional[float], int, float]]:
+        """
+        Get the fields the recheck scheduler needs for a batch of proxies.
+
+        Args:
+            proxies: Proxy strings (at most a few thousand per call)
+
+        Returns:
+            Mapping of proxy to (last_checked, consecutive_failures, liveness) for known proxies
+        """
+        placeholders = ",".join("?" * len(proxies))
+        rows = self.connection.execute(
+            f"SELECT proxy, last_checked, consecutive_failures, liveness FROM proxies "
+            f"WHERE proxy IN ({placeholders})",
+            proxies,
+        )
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def get(self, proxy: str) -> Optional[dict[str, Any]]:
+        """
+        Get the stored state of a proxy.
+
+        Args:
+            proxy: Proxy string
+
+        Returns:
+            State as a dict (latencies decoded) or None if unknown
+        """
+        row = self.connection.execute(
+            "SELECT * FROM proxies WHERE proxy = ?", (proxy,)
+        ).fetchone()
+        if row is None:
+            return None
+        state = dict(row)
+        state["latencies"] = orjson.loads(state["latencies"])
+        return state
+
+    def record_source_fetch(
+        self,
+        url: str,
+        ok: bool,
+        candidates: int,
+        now: Optional[float] = None,
+        gone: bool = False,
+    ) -> None:
+        """
+        Record the outcome of fetching a source.
+
+        ``consecutive_failures`` counts every failed fetch in a row, while
+        ``gone_count`` only counts permanent answers (404, 410) since the last
+        successful fetch, so timeouts and outages in between do not reset it.
+
+        Args:
+            url: Source URL
+            ok: Whether the source answered with content (or an unchanged 304)
+            candidates: Proxies extracted from it
+            now: Timestamp to record (defaults to the current time)
+            gone: Whether the failure was a permanent answer
+        """
+        now = now or time.time()
+        try:
+            with self.connection:
+                self.connection.execute(
+                    """
+                    INSERT INTO sources (
+                        url, first_seen, last_fetched, fetch_count, failure_count,
+                        consecutive_failures, gone_count, last_candidates
+                    ) VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        last_fetched = excluded.last_fetched,
+                        fetch_count = fetch_count + 1,
+                        failure_count = failure_count + excluded.failure_count,
+                        consecutive_failures = CASE WHEN excluded.failure_count
+                            THEN consecutive_failures + 1 ELSE 0 END,
+                        gone_count = CASE WHEN excluded.failure_count
+                            THEN gone_count + excluded.gone_count ELSE 0 END,
+                        last_candidates = excluded.last_candidates
+                    """,
+                    (url, now, now, int(not ok), int(not ok), int(gone and not ok), candidates),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error recording fetch of {url} into {self.db_path}: {e}")
+
+    def is_known_source(self, url: str) -> bool:
+        """Whether a source was fetched successfully before."""
+        row = self.connection.execute(
+            "SELECT 1 FROM sources WHERE url = ? AND fetch_count > failure_count", (url,)
+        ).fetchone()
+        return row is not None
+
+    def get_source_stats(self, urls: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Get fetch statistics and yield of sources.
+
+        Besides the sources columns, every entry has ``unique_count`` (proxies
+        first found in the source) and ``working_count`` (those of them whose last
+        check succeeded).
+
+        Args:
+            urls: Source URLs (at most a few thousand per call)
+
+        Returns:
+            Mapping of URL to statistics for sources fetched at least once
+        """
+        if not urls:
+            return {}
+        placeholders = ",".join("?" * len(urls))
+        rows = self.connection.execute(
+            f"""
+            SELECT sources.*,
+                (SELECT COUNT(*) FROM proxies WHERE proxies.source = sources.url) AS unique_count,
+                (SELECT COUNT(*) FROM proxies WHERE proxies.source = sources.url
+                    AND proxies.last_success IS NOT NULL
+                    AND proxies.consecutive_failures = 0) AS working_count
+            FROM sources WHERE url IN ({placeholders})
+            """,
+            urls,
+        )
+        return {row["url"]: dict(row) for row in rows}
+
+    def count(self) -> int:
+        """Return the number of known proxies."""
+        return self.connection.execute("SELECT COUNT(*) FROM proxies").fetchone()[0]
+
+    def close(self) -> None:
+        """Wait for pending store work and close the database connection."""
+        self._executor.shutdown(wait=True)
+        self.connection.close()
@@ -0,0 +1,248 @@
+"""
+Buffered JSONL writer that keeps file I/O off the event loop.
+"""
+
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+from loguru import logger
+
+from proxy_parser.config import (
+    KEEP_GENERATIONS,
+    WRITER_BATCH_SIZE,
+    WRITER_FLUSH_SECONDS,
+    WRITER_FSYNC,
+    WRITER_FSYNC_SECONDS,
+)
+
+# Durability policies: never fsync (the OS decides), fsync at most every
+# WRITER_FSYNC_SECONDS, or fsync after every batch
+FSYNC_POLICIES = ("none", "periodic", "batch")
+
+
+class BufferedJsonlWriter:
+    """
+    Append JSON records to a JSONL file from a background thread.
+
+    ``write`` only appends the record to an in-memory buffer, so it is cheap
+    enough to call from the event loop for every result. The thread serializes
+    and writes the buffer as one block when it holds ``batch_size`` records or
+    ``flush_seconds`` after the previous write, whichever comes first. Records
+    written before ``flush`` or ``close`` returns are on disk, subject to the
+    fsync policy.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = WRITER_BATCH_SIZE,
+        flush_seconds: float = WRITER_FLUSH_SECONDS,
+        fsync: str = WRITER_FSYNC,
+        fsync_seconds: float = WRITER_FSYNC_SECONDS,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}, expected one of {FSYNC_POLICIES}")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.fsync = fsync
+        self.fsync_seconds = fsync_seconds
+        self.written_count = 0
+        self._buffer: list[Any] = []
+        self._submitted = 0
+        self._flush_requested = False
+        self._closing = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+
+    def open(self, truncate: bool = False) -> "BufferedJsonlWriter":
+        """
+        Open the file and start the writer thread.
+
+        Args:
+            truncate: Empty the file first instead of appending to it
+
+        Returns:
+            The writer itself
+        """
+        self._file = self.path.open("wb" if truncate else "ab")
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, record: Any) -> None:
+        """
+        Queue a record for writing.
+
+        Args:
+            record: JSON-serializable object, written as one line
+        """
+        with self._condition:
+            self._buffer.append(record)
+            self._submitted += 1
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self) -> None:
+        """Block until every record queued so far is written."""
+        if self._thread is None:
+            return
+        with self._condition:
+            target = self._submitted
+            self._flush_requested = True
+            self._condition.notify()
+            self._condition.wait_for(
+                lambda: self.written_count >= target or not self._thread.is_alive()
+            )
+
+    def close(self, sync: bool = False) -> None:
+        """
+        Write the remaining records, stop the thread and close the file.
+
+        Args:
+            sync: fsync the file before closing it, whatever the policy
+        """
+        if self._thread is None:
+            return
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+        if sync:
+            self._sync()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "BufferedJsonlWriter":
+        return self.open()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        synced_at = time.monotonic()
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self._buffer) >= self.batch_size
+                    or self._flush_requested
+                    or self._closing,
+                    timeout=self.flush_seconds,
+                )
+                batch, self._buffer = self._buffer, []
+                self._flush_requested = False
+                closing = self._closing
+
+            if batch:
+                synced_at = self._write_batch(batch, synced_at)
+            with self._condition:
+                self.written_count += len(batch)
+                self._condition.notify_all()
+            if closing and not batch:
+                break
+
+        if self.fsync == "periodic":
+            self._sync()
+
+    def _write_batch(self, batch: list[Any], synced_at: float) -> float:
+        """Write one batch and fsync it if the policy asks; returns the last fsync time."""
+        try:
+            self._file.write(
+                b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in batch)
+            )
+            self._file.flush()
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} JSONL records to {self.path}: {e}")
+            return synced_at
+
+        now = time.monotonic()
+        if self.fsync == "batch" or (
+            self.fsync == "periodic" and now - synced_at >= self.fsync_seconds
+        ):
+            self._sync()
+            return now
+        return synced_at
+
+    def _sync(self) -> None:
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.error(f"Error syncing {self.path}: {e}")
+
+
+def generation_path(path: Path, generation: int) -> Path:
+    """Path of an older generation of a snapshot, e.g. parsed.1.jsonl for parsed.jsonl."""
+    return path.with_name(f"{path.stem}.{generation}{path.suffix}")
+
+
+class SnapshotJsonlWriter(BufferedJsonlWriter):
+    """
+    Build a new version of a JSONL file next to it and swap it in when complete.
+
+    Records go to a hidden temporary file in the same directory. ``publish``
+    syncs it and renames it over the target with ``os.replace``, so readers of
+    the target see either the previous snapshot or the new one, never a partial
+    file. The replaced snapshot is kept as ``<stem>.1<suffix>`` and older ones
+    shift up, up to ``keep_generations``. ``discard`` drops the new version and
+    leaves the published one untouched.
+    """
+
+    def __init__(self, path: Path, keep_generations: int = KEEP_GENERATIONS, **kwargs: Any):
+        super().__init__(path.with_name(f".{path.name}.tmp"), **kwargs)
+        self.target_path = path
+        self.keep_generations = keep_generations
+
+    def open(self, truncate: bool = True) -> "SnapshotJsonlWriter":
+        """Start a new snapshot; a leftover temporary file is always truncated."""
+        super().open(truncate=True)
+        return self
+
+    def publish(self) -> None:
+        """Write the remaining records and atomically replace the target with them."""
+        self.close(sync=True)
+        self._rotate()
+        os.replace(self.path, self.target_path)
+        self._sync_directory()
+        logger.debug(f"Published {self.written_count} records to {self.target_path}")
+
+    def discard(self) -> None:
+        """Stop writing and delete the unpublished snapshot."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def _rotate(self) -> None:
+        """Shift older generations up and keep the current target as generation 1."""
+        if self.keep_generations <= 0 or not self.target_path.exists():
+            return
+        for generation in range(self.keep_generations - 1, 0, -1):
+            older = generation_path(self.target_path, generation)
+            if older.exists():
+                os.replace(older, generation_path(self.target_path, generation + 1))
+
+        # Link rather than move, so the target exists until os.replace swaps it
+        first = generation_path(self.target_path, 1)
+        first.unlink(missing_ok=True)
+        try:
+            os.link(self.target_path, first)
+        except OSError:
+            shutil.copy2(self.target_path, first)
+
+    def _sync_directory(self) -> None:
+        """Make the rename itself durable unless the fsync policy is none."""
+        if self.fsync == "none" or not hasattr(os, "O_DIRECTORY"):
+            return
+        descriptor = os.open(self.target_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        except OSError as e:
+            logger.error(f"Error syncing {self.target_path.parent}: {e}")
+        finally:
+            os.close(descriptor)
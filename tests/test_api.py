@@ -0,0 +1,133 @@
+"""
+Tests for the api module.
+"""
+
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from aiohttp import web
+
+from proxy_parser.api import ProxyAPI, ProxyIndex
+from proxy_parser.config import JUDGE_URL, PROXY_CHECK_URL
+from proxy_parser.http_client import HTTPClient
+from proxy_parser.writer import SnapshotJsonlWriter
+
+def ip_api_record(proxy: str, elapsed_time: float, country: str = "", country_code: str = "") -> dict:
+    """Build a check result the way the checker stores an ip-api.com answer."""
+    ip = proxy.split("://", 1)[1].rsplit(":", 1)[0]
+    # What ip-api returns for the fields of PROXY_CHECK_URL; location fields are
+    # left out for addresses it cannot place
+    info = {"query": ip}
+    if country_code:
+        info.update(country=country, countryCode=country_code, regionName="", city="")
+    return {"proxy": proxy, "info": info, "elapsed_time": elapsed_time}
+
+
+RECORDS = [
+    ip_api_record("socks5://1.1.1.1:1080", 0.9, "United States", "US"),
+    ip_api_record("socks5://2.2.2.2:1080", 0.2, "United States", "US"),
+    ip_api_record("socks5://3.3.3.3:1080", 0.1, "Germany", "DE"),
+    ip_api_record("http://4.4.4.4:8080", 0.5, "United States", "US"),
+    ip_api_record("http://5.5.5.5:8080", 0.3),
+]
+
+
+def publish(path, records):
+    writer = SnapshotJsonlWriter(path).open()
+    for record in records:
+        writer.write(record)
+    writer.publish()
+
+
+class TestProxyIndex:
+    """Test cases for ProxyIndex class."""
+
+    @pytest.mark.skipif(bool(JUDGE_URL), reason="checks use the embedded judge")
+    def test_check_url_requests_country_code(self):
+        """Test that the ip-api fields the checker requests include countryCode (bit 2)."""
+        fields = int(parse_qs(urlsplit(PROXY_CHECK_URL).query)["fields"][0])
+
+        assert fields & 2
+
+    def test_fastest_by_protocol_and_country(self):
+        """Test that groups are filtered by protocol and country and sorted by latency."""
+        index = ProxyIndex(RECORDS)
+
+        assert [r["proxy"] for r in index.fastest("socks5", "us")] == [
+            "socks5://2.2.2.2:1080",
+            "socks5://1.1.1.1:1080",
+        ]
+        assert [r["proxy"] for r in index.fastest(country="US")] == [
+            "socks5://2.2.2.2:1080",
+            "http://4.4.4.4:8080",
+            "socks5://1.1.1.1:1080",
+        ]
+        assert [r["proxy"] for r in index.fastest(limit=2)] == [
+            "socks5://3.3.3.3:1080",
+            "socks5://2.2.2.2:1080",
+        ]
+        assert index.fastest("socks4") == []
+
+    def test_max_latency(self):
+        """Test that the latency cap keeps only fast enough proxies."""
+        index = ProxyIndex(RECORDS)
+
+        assert [r["proxy"] for r in index.fastest("http", max_latency=0.4)] == ["http://5.5.5.5:8080"]
+        assert index.random("socks5", "US", max_latency=0.05) is None
+        assert index.random("socks5", "US", max_latency=0.2)["proxy"] == "socks5://2.2.2.2:1080"
+
+    def test_stats(self):
+        """Test the per-protocol and per-country counts."""
+        assert ProxyIndex(RECORDS).stats() == {
+            "total": 5,
+            "protocols": {"socks5": 3, "http": 2},
+            "countries": {"US": 3, "DE": 1},
+        }
+
+
+@pytest.fixture
+async def api(tmp_path):
+    """Serve the API over a published snapshot on a free local port."""
+    path = tmp_path / "parsed.jsonl"
+    publish(path, RECORDS)
+    proxy_api = ProxyAPI(path)
+    await proxy_api.refresh()
+    runner = web.AppRunner(proxy_api.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = HTTPClient()
+
+    yield proxy_api, client, f"http://127.0.0.1:{port}"
+
+    await client.aclose()
+    await runner.cleanup()
+
+
+class TestProxyAPI:
+    """Test cases for the query endpoints."""
+
+    async def test_queries(self, api):
+        """Test the fastest, random and stats endpoints."""
+        _, client, url = api
+
+        fastest = await client.get_json(f"{url}/proxies?protocol=socks5&country=US&limit=1")
+        assert [record["proxy"] for record in fastest] == ["socks5://2.2.2.2:1080"]
+
+        record = await client.get_json(f"{url}/proxies/random?protocol=http")
+        assert record["proxy"] in {"http://4.4.4.4:8080", "http://5.5.5.5:8080"}
+
+        stats = await client.get_json(f"{url}/stats")
+        assert stats["total"] == 5
+
+    async def test_refresh_after_publish(self, api, tmp_path):
+        """Test that a newly published snapshot replaces the index."""
+        proxy_api, client, url = api
+        assert not await proxy_api.refresh()
+
+        publish(tmp_path / "parsed.jsonl", RECORDS[:1])
+        assert await proxy_api.refresh()
+
+        stats = await client.get_json(f"{url}/stats")
+        assert stats["total"] == 1
@@ -0,0 +1,27 @@
+"""
+Tests for the cache module.
+"""
+
+from proxy_parser.cache import SearchCache
+
+
+class TestSearchCache:
+    """Test cases for SearchCache class."""
+
+    def test_entries_expire_after_ttl(self, tmp_path):
+        """Test that a page is served until its TTL runs out."""
+        cache = SearchCache(tmp_path, ttl=60)
+        cache.put("path:proxies.txt", 2, ["https://raw.githubusercontent.com/o/r/main/p.txt"], now=1000)
+
+        assert cache.get("path:proxies.txt", 2, now=1059) == [
+            "https://raw.githubusercontent.com/o/r/main/p.txt"
+        ]
+        assert cache.get("path:proxies.txt", 2, now=1060) is None
+        assert cache.get("path:proxies.txt", 3, now=1000) is None
+
+    def test_empty_page_is_cached(self, tmp_path):
+        """Test that an empty page is a hit, not a miss."""
+        cache = SearchCache(tmp_path, ttl=60)
+        cache.put("q", 5, [], now=1000)
+
+        assert cache.get("q", 5, now=1001) == []
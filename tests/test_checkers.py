@@ -2,10 +2,13 @@
 Tests for the checkers module.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import patch, AsyncMock
 
-from proxy_parser.checkers import ProxyChecker
+from proxy_parser.checkers import ProxyChecker, TCPPrescreener, bounded_map
+from proxy_parser.limiter import AdaptiveLimiter
 
 
 class TestProxyChecker:
@@ -83,3 +86,117 @@ class TestProxyChecker:
 
             assert len(results) == 1
             assert results[0] == ("http://192.168.1.1:8080", {"query": "192.168.1.1"})
+
+    async def test_check_proxies_generator_streams_async_iterable(self, checker):
+        """Test that proxies can be fed lazily from an async iterable."""
+
+        async def proxies():
+            for i in range(50):
+                yield f"http://10.0.0.{i}:8080"
+
+        async def fake_check(proxy):
+            return proxy, {"query": proxy}, 0.1
+
+        with patch.object(checker, "check_proxy", side_effect=fake_check):
+            results = [result async for result in checker.check_proxies_generator(proxies(), workers=4)]
+
+        assert len(results) == 50
+        assert {result[0] for result in results} == {f"http://10.0.0.{i}:8080" for i in range(50)}
+
+
+class TestBoundedMap:
+    """Test cases for the bounded worker pool."""
+
+    async def test_in_flight_is_bounded(self):
+        """Test that no more than `workers` calls run at once and input is pulled lazily."""
+        in_flight = 0
+        peak = 0
+        pulled = 0
+
+        def items():
+            nonlocal pulled
+            for i in range(1000):
+                pulled += 1
+                yield i
+
+        async def work(item):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return item * 2
+
+        consumed = 0
+        async for item, result in bounded_map(work, items(), workers=8):
+            assert result == item * 2
+            consumed += 1
+            # The feeder never runs far ahead of the consumer
+            assert pulled - consumed <= 8 * 4
+
+        assert consumed == 1000
+        assert peak <= 8
+
+    async def test_exceptions_yield_none(self):
+        """Test that a failing call yields None instead of stopping the pool."""
+
+        async def work(item):
+            if item == 2:
+                raise ValueError("boom")
+            return item
+
+        results = dict([entry async for entry in bounded_map(work, [1, 2, 3], workers=2)])
+
+        assert results == {1: 1, 2: None, 3: 3}
+
+
+class TestTCPPrescreener:
+    """Test cases for the TCP pre-screen stage."""
+
+    async def test_filter_prunes_closed_ports(self):
+        """Test that only proxies accepting a TCP connection pass."""
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        open_port = server.sockets[0].getsockname()[1]
+
+        # Grab a free port and close it again so nothing listens there
+        probe = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        closed_port = probe.sockets[0].getsockname()[1]
+        probe.close()
+        await probe.wait_closed()
+
+        prescreener = TCPPrescreener(timeout=1, workers=4)
+        proxies = [f"http://127.0.0.1:{open_port}", f"socks5://127.0.0.1:{closed_port}"]
+
+        survivors = [proxy async for proxy in prescreener.filter(proxies)]
+
+        server.close()
+        await server.wait_closed()
+
+        assert survivors == [f"http://127.0.0.1:{open_port}"]
+        assert prescreener.passed_count == 1
+        assert prescreener.pruned_count == 1
+
+    async def test_connections_stay_within_prescreen_budget(self):
+        """Test that no more connections are open at once than the pre-screen limiter allows."""
+        open_now = peak = 0
+
+        async def open_connection(host, port):
+            nonlocal open_now, peak
+            open_now += 1
+            peak = max(peak, open_now)
+            await asyncio.sleep(0.01)
+            open_now -= 1
+            raise ConnectionRefusedError()
+
+        limiter = AdaptiveLimiter("prescreen", 3, adaptive=False)
+        prescreener = TCPPrescreener(timeout=1, workers=50)
+        proxies = [f"http://10.0.0.{i}:80" for i in range(20)]
+
+        with patch("proxy_parser.checkers.http_client.prescreen_limiter", limiter), patch(
+            "asyncio.open_connection", open_connection
+        ):
+            survivors = [proxy async for proxy in prescreener.filter(proxies)]
+
+        assert survivors == []
+        assert peak == 3
+        assert limiter.in_flight == 0
@@ -0,0 +1,265 @@
+"""
+Tests for the distributed module.
+"""
+
+import asyncio
+from collections import Counter
+
+import orjson
+
+from proxy_parser import metrics
+from proxy_parser.checkers import CHECK_FAILURE, ProxyChecker
+from proxy_parser.distributed import Coordinator, DistributedWorker
+from proxy_parser.store import ProxyStore
+
+
+class FakeChecker(ProxyChecker):
+    """Checker whose proxies ending in an even port work and odd ones time out, counting every check."""
+
+    def __init__(self, checked: Counter):
+        super().__init__(timeout=1, workers=4)
+        self.checked = checked
+
+    async def check_proxy(self, proxy):
+        await asyncio.sleep(0)
+        self.checked[proxy] += 1
+        if int(proxy.rsplit(":", 1)[1]) % 2 == 0:
+            return proxy, {"query": "127.0.0.1"}, 0.1
+        CHECK_FAILURE.set(("timeout", 1.0))
+        return None
+
+
+async def lease(port: int, token: str = "") -> tuple[asyncio.StreamReader, asyncio.StreamWriter, dict]:
+    """Open a raw connection, say hello and lease one batch."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(orjson.dumps({"type": "hello", "token": token}) + b"\n")
+    await writer.drain()
+    hello = orjson.loads(await reader.readline())
+    if hello["type"] != "ack":
+        return reader, writer, hello
+    writer.write(orjson.dumps({"type": "lease"}) + b"\n")
+    await writer.drain()
+    return reader, writer, orjson.loads(await reader.readline())
+
+
+class TestCoordinator:
+    """Test cases for Coordinator and DistributedWorker."""
+
+    async def test_workers_check_every_proxy_once(self, tmp_path):
+        """Test that two workers split the candidates and results are recorded."""
+        proxies = [f"http://10.0.0.1:{port}" for port in range(1000, 1050)]
+        store = ProxyStore(tmp_path / "state.sqlite3")
+        coordinator = Coordinator(host="127.0.0.1", port=0, batch_size=7, store=store)
+        await coordinator.start()
+        checked = Counter()
+        workers = [
+            DistributedWorker("127.0.0.1", coordinator.port, checker=FakeChecker(checked))
+            for _ in range(2)
+        ]
+        tasks = [asyncio.create_task(worker.run()) for worker in workers]
+        succeeded = metrics.CHECKS_SUCCEEDED.value("http")
+        timed_out = metrics.CHECKS_FAILED.value("http", "timeout")
+
+        try:
+            results = [
+                result
+                async for result in coordinator.check_proxies_generator(iter(proxies))
+            ]
+        finally:
+            await coordinator.close()
+            await asyncio.wait_for(asyncio.gather(*tasks), 5)
+
+        # The fake checker records nothing itself, so these come from the coordinator
+        assert metrics.CHECKS_SUCCEEDED.value("http") == succeeded + 25
+        assert metrics.CHECKS_FAILED.value("http", "timeout") == timed_out + 25
+
+        assert set(checked) == set(proxies)
+        assert all(count == 1 for count in checked.values())
+        assert sorted(proxy for proxy, _, _ in results) == proxies[::2]
+        assert store.count() == 50
+        store.close()
+
+    async def test_empty_input_finishes_without_workers(self):
+        """Test that nothing to check ends the generator immediately."""
+        coordinator = Coordinator(host="127.0.0.1", port=0)
+        try:
+            results = [
+                result
+                async for result in coordinator.check_proxies_generator([])
+            ]
+        finally:
+            await coordinator.close()
+
+        assert results == []
+
+    async def test_disconnected_lease_is_requeued(self):
+        """Test that a batch held by a worker that disconnects goes to another worker."""
+        proxies = [f"http://10.0.0.1:{port}" for port in range(2000, 2004)]
+        coordinator = Coordinator(host="127.0.0.1", port=0, batch_size=10)
+        await coordinator.start()
+        generator = coordinator.check_proxies_generator(proxies)
+        first = asyncio.create_task(anext(generator, None))
+        await asyncio.sleep(0.05)
+
+        _, writer, reply = await lease(coordinator.port)
+        assert reply["proxies"] == proxies
+        writer.close()
+        await asyncio.sleep(0.05)
+
+        checked = Counter()
+        worker = asyncio.create_task(
+            DistributedWorker("127.0.0.1", coordinator.port, checker=FakeChecker(checked)).run()
+        )
+        try:
+            results = [await first] + [result async for result in generator]
+        finally:
+            await coordinator.close()
+            await asyncio.wait_for(worker, 5)
+
+        assert set(checked) == set(proxies)
+        assert sorted(proxy for proxy, _, _ in results) == proxies[::2]
+
+    async def test_expired_lease_is_requeued(self):
+        """Test that a batch never reported is leased again after it expires."""
+        proxies = [f"http://10.0.0.1:{port}" for port in range(3000, 3002)]
+        coordinator = Coordinator(host="127.0.0.1", port=0, batch_size=10, lease_seconds=0.2)
+        await coordinator.start()
+        generator = coordinator.check_proxies_generator(proxies)
+        first = asyncio.create_task(anext(generator, None))
+        await asyncio.sleep(0.05)
+
+        reader, writer, reply = await lease(coordinator.port)
+        stale_id = reply["id"]
+        await asyncio.sleep(0.4)
+
+        _, other_writer, reply = await lease(coordinator.port)
+        assert reply["type"] == "batch"
+        assert reply["proxies"] == proxies
+        other_writer.write(
+            orjson.dumps(
+                {
+                    "type": "results",
+                    "id": reply["id"],
+                    "results": [
+                        [proxies[0], {"query": "127.0.0.1"}, 0.1, None],
+                        [proxies[1], None, 1.0, "timeout"],
+                    ],
+                }
+            )
+            + b"\n"
+        )
+
+        # Results for the expired lease arrive late and are ignored
+        writer.write(orjson.dumps({"type": "results", "id": stale_id, "results": []}) + b"\n")
+        await writer.drain()
+        assert orjson.loads(await reader.readline()) == {"type": "ack", "accepted": False}
+
+        try:
+            results = [await first] + [result async for result in generator]
+        finally:
+            writer.close()
+            other_writer.close()
+            await coordinator.close()
+
+        assert [proxy for proxy, _, _ in results] == [proxies[0]]
+
+    async def test_report_is_checked_against_lease(self):
+        """Test that foreign proxies in a report are dropped and omitted ones are re-queued."""
+        proxies = ["http://1.1.1.1:80", "http://2.2.2.2:80"]
+        coordinator = Coordinator(host="127.0.0.1", port=0, batch_size=10)
+        await coordinator.start()
+        generator = coordinator.check_proxies_generator(proxies)
+        first = asyncio.create_task(anext(generator, None))
+        await asyncio.sleep(0.05)
+
+        reader, writer, reply = await lease(coordinator.port)
+        writer.write(
+            orjson.dumps(
+                {
+                    "type": "results",
+                    "id": reply["id"],
+                    "results": [
+                        ["http://6.6.6.6:666", {"query": "6.6.6.6"}, 0.1, None],
+                        [proxies[0], None, 1.0, "timeout"],
+                    ],
+                }
+            )
+            + b"\n"
+        )
+        await writer.drain()
+        assert orjson.loads(await reader.readline())["accepted"] is True
+
+        writer.write(orjson.dumps({"type": "lease"}) + b"\n")
+        await writer.drain()
+        requeued = orjson.loads(await reader.readline())
+        assert requeued["proxies"] == [proxies[1]]
+        writer.write(
+            orjson.dumps(
+                {"type": "results", "id": requeued["id"], "results": [[proxies[1], {"query": "x"}, 0.2, None]]}
+            )
+            + b"\n"
+        )
+        await writer.drain()
+
+        try:
+            results = [await first] + [result async for result in generator]
+        finally:
+            writer.close()
+            await coordinator.close()
+
+        assert [proxy for proxy, _, _ in results] == [proxies[1]]
+
+    async def test_only_the_lease_holder_can_report(self):
+        """Test that another connection cannot complete a lease and empty data is a failure."""
+        proxies = ["http://1.1.1.1:80", "http://2.2.2.2:80"]
+        coordinator = Coordinator(host="127.0.0.1", port=0, batch_size=1)
+        await coordinator.start()
+        generator = coordinator.check_proxies_generator(proxies)
+        first = asyncio.create_task(anext(generator, None))
+        await asyncio.sleep(0.05)
+        invalid = metrics.CHECKS_FAILED.value("http", "invalid_response")
+
+        async def report(reader, writer, lease_id, results):
+            message = {"type": "results", "id": lease_id, "results": results}
+            writer.write(orjson.dumps(message) + b"\n")
+            await writer.drain()
+            return orjson.loads(await reader.readline())["accepted"]
+
+        reader_a, writer_a, lease_a = await lease(coordinator.port)
+        reader_b, writer_b, lease_b = await lease(coordinator.port)
+        stolen = [[lease_a["proxies"][0], {"query": "x"}, 0.1, None]]
+
+        assert await report(reader_b, writer_b, lease_a["id"], stolen) is False
+        assert await report(reader_a, writer_a, lease_a["id"], [[lease_a["proxies"][0], {}, 0.1, None]])
+        assert await report(
+            reader_b, writer_b, lease_b["id"], [[lease_b["proxies"][0], {"query": "x"}, 0.2, None]]
+        )
+        # Asking for more finds the input exhausted and finishes the job
+        writer_b.write(orjson.dumps({"type": "lease"}) + b"\n")
+        await writer_b.drain()
+        assert orjson.loads(await reader_b.readline())["type"] == "wait"
+
+        try:
+            results = [await first] + [result async for result in generator]
+        finally:
+            writer_a.close()
+            writer_b.close()
+            await coordinator.close()
+
+        assert [proxy for proxy, _, _ in results] == lease_b["proxies"]
+        assert metrics.CHECKS_FAILED.value("http", "invalid_response") == invalid + 1
+
+    async def test_wrong_token_is_rejected(self):
+        """Test that a coordinator with a token refuses workers without it."""
+        coordinator = Coordinator(host="127.0.0.1", port=0, token="secret")
+        await coordinator.start()
+        try:
+            _, writer, reply = await lease(coordinator.port, token="guess")
+            writer.close()
+            assert reply == {"type": "error", "error": "unauthorized"}
+
+            _, writer, reply = await lease(coordinator.port, token="secret")
+            writer.close()
+            assert reply == {"type": "wait", "retry": 1.0}
+        finally:
+            await coordinator.close()
@@ -0,0 +1,79 @@
+"""
+Tests for the extract module.
+"""
+
+import random
+
+from proxy_parser.config import REGEX_PATTERN
+from proxy_parser import extract
+from proxy_parser.extract import ProxyExtractor, find_proxies
+
+
+def expected(text: str) -> set[str]:
+    """Proxies REGEX_PATTERN finds in the whole text."""
+    return {m.group(1) for m in REGEX_PATTERN.finditer(text) if m.group(1)}
+
+
+def extract_chunked(data: bytes, cuts: list[int]) -> set[str]:
+    """Run ProxyExtractor over data split at the given offsets."""
+    extractor = ProxyExtractor()
+    found = set()
+    bounds = [0, *sorted(cuts), len(data)]
+    for start, end in zip(bounds, bounds[1:]):
+        found.update(extractor.feed(data[start:end]))
+    found.update(extractor.flush())
+    return found
+
+
+def near_proxy(rng: random.Random) -> str:
+    """Something shaped like ip:port, often out of range or with leading zeros."""
+    parts = [str(rng.choice([0, 1, 25, 255, 256, 999, rng.randint(0, 300)])) for _ in range(4)]
+    parts = [rng.choice(["", "0", "1"]) + part if rng.random() < 0.1 else part for part in parts]
+    port = str(rng.choice([0, 80, 65535, 65536, 99999, rng.randint(0, 70000)]))
+    return rng.choice(["", "1", "12"]) + ".".join(parts) + rng.choice([":", "."]) + port
+
+
+class TestFindProxies:
+    """Test cases for find_proxies function."""
+
+    def test_matches_regex_pattern(self):
+        """Test that find_proxies returns exactly the REGEX_PATTERN matches, in order."""
+        rng = random.Random(12)
+        for _ in range(2000):
+            text = "".join(
+                near_proxy(rng) + rng.choice(["\n", " ", ".", ":", "", "a", "<td>"])
+                for _ in range(rng.randint(0, 8))
+            )
+            found = find_proxies(text.encode())
+
+            assert found == [m.group(1) for m in REGEX_PATTERN.finditer(text) if m.group(1)]
+
+    def test_rescans_from_inside_invalid_candidate(self):
+        """Test that a match starting inside an out-of-range first octet is found."""
+        assert find_proxies(b"2994.1.1.1:80 8.8.8.8:053 9.9.9.9:53") == ["94.1.1.1:80", "9.9.9.9:53"]
+
+
+class TestProxyExtractor:
+    """Test cases for ProxyExtractor class."""
+
+    def test_random_chunkings_match_regex(self):
+        """Test that any chunking finds exactly what the regex finds on the whole body."""
+        rng = random.Random(7)
+        alphabet = "0123456789....:::: ab\n"
+        for _ in range(200):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 300)))
+            text += " 8.8.8.8:53 1.2.3.4:8080\n"
+            data = text.encode()
+            cuts = [rng.randint(0, len(data)) for _ in range(rng.randint(0, 10))]
+
+            assert extract_chunked(data, cuts) == expected(text)
+
+    def test_long_match_byte_run_is_bounded(self, monkeypatch):
+        """Test that a body without separators does not grow the carry unbounded."""
+        monkeypatch.setattr(extract, "MAX_CARRY", 32)
+        extractor = ProxyExtractor()
+
+        for _ in range(100):
+            list(extractor.feed(b"1234567890"))
+
+        assert len(extractor._carry) <= 32 + 10
@@ -0,0 +1,158 @@
+"""
+Tests for the http_client module.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+
+from proxy_parser.cache import SearchCache
+from proxy_parser.http_client import (
+    GitHubClient,
+    HTTPClient,
+    RateLimiter,
+    extract_search_results,
+    to_raw_url,
+)
+
+
+class TestHTTPClient:
+    """Test cases for HTTPClient class."""
+
+    async def test_pooled_client_is_reused(self):
+        """Test that source fetches share one pooled client until closed."""
+        client = HTTPClient()
+
+        first = client._get_client()
+        second = client._get_client()
+
+        assert first is second
+        await client.aclose()
+        assert first.is_closed
+
+    async def test_pooled_client_recreated_after_close(self):
+        """Test that a closed pooled client is replaced on next use."""
+        client = HTTPClient()
+
+        first = client._get_client()
+        await client.aclose()
+        second = client._get_client()
+
+        assert second is not first
+        assert not second.is_closed
+        await client.aclose()
+
+    async def test_check_session_is_shared(self):
+        """Test that proxy checks share one aiohttp session until closed."""
+        client = HTTPClient()
+
+        session = client._get_session()
+
+        assert client._get_session() is session
+        await client.aclose()
+        assert session.closed
+
+    async def test_fetch_chunks_streams_body(self):
+        """Test that a 200 body is handed over in chunks and validators are returned."""
+        def handler(request):
+            assert request.headers["If-None-Match"] == '"old"'
+            return httpx.Response(200, content=b"1.2.3.4:80\n" * 1000, headers={"ETag": '"new"'})
+
+        client = HTTPClient()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        body = bytearray()
+
+        response = await client.fetch_chunks(
+            "https://example.com/list.txt", body.extend, validators={"If-None-Match": '"old"'}
+        )
+        await client.aclose()
+
+        assert response.status == 200
+        assert body == b"1.2.3.4:80\n" * 1000
+        assert response.etag == '"new"'
+
+    async def test_fetch_chunks_not_modified(self):
+        """Test that a 304 answer is returned without consuming a body."""
+        client = HTTPClient()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(304)))
+        body = bytearray()
+
+        response = await client.fetch_chunks("https://example.com/list.txt", body.extend)
+        await client.aclose()
+
+        assert response.status == 304
+        assert not body
+
+
+class TestToRawUrl:
+    """Test cases for to_raw_url."""
+
+    def test_blob_link_with_line_anchor(self):
+        """Test that blob links become raw links without the fragment."""
+        url = "https://github.com/owner/repo/blob/0123abc/dir/sub%20dir/http_proxies.txt#L4"
+
+        assert to_raw_url(url) == "https://raw.githubusercontent.com/owner/repo/0123abc/dir/sub%20dir/http_proxies.txt"
+
+    def test_other_urls_unchanged(self):
+        """Test that non-blob URLs are left alone."""
+        for url in (
+            "https://raw.githubusercontent.com/owner/repo/main/proxies.txt",
+            "https://github.com/owner/repo",
+            "https://example.com/blob/a/b/c/d",
+        ):
+            assert to_raw_url(url) == url
+
+
+class TestGitHubClient:
+    """Test cases for GitHubClient class."""
+
+    def test_extract_search_results(self):
+        """Test that only result anchors are extracted, whatever the attribute order."""
+        page = (
+            '<a href="/other">x</a>'
+            '<a data-testid="link-to-search-result" class="x" href="/o/r/blob/main/a%20b.txt#L1">a</a>'
+            '<a class="y" href="/o/r/blob/dev/p&amp;q.txt" data-testid="link-to-search-result">b</a>'
+        )
+
+        assert extract_search_results(page) == [
+            "https://raw.githubusercontent.com/o/r/main/a%20b.txt",
+            "https://raw.githubusercontent.com/o/r/dev/p&q.txt",
+        ]
+
+    async def test_search_query_stops_after_empty_page(self):
+        """Test that pages after the first empty one are dropped."""
+        client = GitHubClient(rate_limit=0)
+        pages = {1: ["a"], 2: None, 3: ["c"], 4: [], 5: ["e"]}
+        requested = []
+
+        async def search_files(query, page):
+            requested.append(page)
+            # Later pages answer first, so the empty page has to discard them
+            await asyncio.sleep(0.01 * (6 - page))
+            return pages[page]
+
+        with patch.object(client, "search_files", side_effect=search_files):
+            assert await client.search_query("q", depth=5) == {"a", "c"}
+
+    async def test_cached_page_skips_request(self, tmp_path):
+        """Test that a fresh cached page is returned without touching the network."""
+        cache = SearchCache(tmp_path, ttl=3600)
+        cache.put("q", 1, ["https://raw.githubusercontent.com/o/r/main/p.txt"])
+        client = GitHubClient(rate_limit=0, search_cache=cache)
+
+        with patch.object(client, "_get_client", side_effect=AssertionError("network used")):
+            assert await client.search_files("q", 1) == [
+                "https://raw.githubusercontent.com/o/r/main/p.txt"
+            ]
+
+    async def test_rate_limiter_spaces_calls(self):
+        """Test that calls beyond the burst wait for tokens."""
+        limiter = RateLimiter(rate=50, burst=2)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        for _ in range(4):
+            await limiter.acquire()
+
+        assert loop.time() - start >= 0.035
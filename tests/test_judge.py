@@ -0,0 +1,84 @@
+"""
+Tests for the judge module.
+"""
+
+import pytest
+from aiohttp import web
+
+from proxy_parser.checkers import ProxyChecker
+from proxy_parser.http_client import HTTPClient, http_client
+from proxy_parser.judge import anonymity_level, create_judge_app
+
+
+@pytest.fixture
+async def judge_url():
+    """Run the judge on a free local port."""
+    runner = web.AppRunner(create_judge_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    yield f"http://127.0.0.1:{port}/judge"
+
+    await runner.cleanup()
+
+
+class TestJudge:
+    """Test cases for the judge endpoint."""
+
+    async def test_echoes_ip_and_headers(self, judge_url):
+        """Test that the judge returns the caller IP and request headers."""
+        client = HTTPClient(headers={"User-Agent": "judge-test", "X-Forwarded-For": "198.51.100.1"})
+
+        result = await client.get_json(judge_url, timeout=2)
+        await client.aclose()
+
+        assert result["query"] == "127.0.0.1"
+        assert result["headers"]["User-Agent"] == "judge-test"
+        assert result["headers"]["X-Forwarded-For"] == "198.51.100.1"
+
+    async def test_detect_real_ip(self, judge_url):
+        """Test that the checker learns its own IP from the judge."""
+        checker = ProxyChecker(check_url=judge_url, timeout=2)
+
+        try:
+            assert await checker.detect_real_ip() == "127.0.0.1"
+        finally:
+            await http_client.aclose()
+
+
+class TestAnonymityLevel:
+    """Test cases for anonymity_level."""
+
+    def test_transparent(self):
+        """Test that a leaked real IP means transparent."""
+        headers = {"X-Forwarded-For": "203.0.113.5", "Via": "1.1 squid"}
+
+        assert anonymity_level(headers, real_ip="203.0.113.5") == "transparent"
+
+    def test_anonymous(self):
+        """Test that proxy headers without our IP mean anonymous."""
+        headers = {"Via": "1.1 squid", "User-Agent": "x"}
+
+        assert anonymity_level(headers, real_ip="203.0.113.5") == "anonymous"
+
+    def test_elite(self):
+        """Test that no proxy headers mean elite."""
+        headers = {"User-Agent": "x", "Accept": "*/*"}
+
+        assert anonymity_level(headers, real_ip="203.0.113.5") == "elite"
+
+    def test_ip_inside_other_ip_is_not_a_leak(self):
+        """Test that our IP appearing as part of another address does not count."""
+        headers = {"X-Forwarded-For": "11.2.3.45, 10.0.0.1", "Via": "1.1 squid"}
+
+        assert anonymity_level(headers, real_ip="1.2.3.4") == "anonymous"
+
+    def test_transparent_in_listed_and_forwarded_values(self):
+        """Test that our IP is found among list entries, with ports and in Forwarded."""
+        listed = {"X-Forwarded-For": "10.0.0.1,203.0.113.5:8080"}
+        forwarded = {"Forwarded": 'for="[2001:DB8::1]:4711";proto=http'}
+
+        assert anonymity_level(listed, real_ip="203.0.113.5") == "transparent"
+        assert anonymity_level(forwarded, real_ip="2001:db8::1") == "transparent"
@@ -0,0 +1,155 @@
+"""
+Tests for the limiter module.
+"""
+
+import asyncio
+import errno
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from proxy_parser.config import MIN_CONNECTIONS
+from proxy_parser.limiter import AdaptiveLimiter, LoopLagMonitor, connection_budgets
+
+
+def limiter(**kwargs) -> AdaptiveLimiter:
+    """Create a limiter with small, explicit settings."""
+    settings = dict(
+        initial=4, minimum=1, maximum=8, adaptive=True, window=10,
+        increase=2, decrease=0.5, error_tolerance=0.1, max_lag=0.5,
+    )
+    settings.update(kwargs)
+    return AdaptiveLimiter("test", **settings)
+
+
+async def run_window(limiter: AdaptiveLimiter, outcomes: list[str]) -> None:
+    """Complete one request per outcome, with one extra request waiting on the limit."""
+    for _ in range(limiter.limit):
+        await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    for outcome in outcomes:
+        limiter.release(outcome)
+        if limiter.in_flight < limiter.limit:
+            await limiter.acquire()
+    await waiter
+    while limiter.in_flight:
+        limiter.release("cancelled")
+
+
+class TestAdaptiveLimiter:
+    """Test cases for AdaptiveLimiter class."""
+
+    async def test_limits_concurrency(self):
+        """Test that no more than ``limit`` holders run at once and waiters are served."""
+        sem = limiter(initial=2, adaptive=False)
+        running = peak = 0
+
+        async def hold():
+            nonlocal running, peak
+            async with sem.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(hold() for _ in range(6)))
+
+        assert peak == 2
+        assert sem.in_flight == 0
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """Test that cancelling a waiting acquire leaves the limiter usable."""
+        sem = limiter(initial=1, adaptive=False)
+        await sem.acquire()
+        waiter = asyncio.create_task(sem.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        sem.release()
+        await asyncio.wait_for(sem.acquire(), timeout=1)
+        assert sem.in_flight == 1
+
+    async def test_additive_increase_when_saturated(self):
+        """Test that a healthy window at the limit raises it by the step, up to the maximum."""
+        sem = limiter()
+
+        await run_window(sem, ["ok"] * 10)
+        assert sem.limit == 6
+        await run_window(sem, ["ok"] * 10)
+        await run_window(sem, ["ok"] * 10)
+        assert sem.limit == 8
+
+    async def test_multiplicative_decrease_on_failure_rise(self):
+        """Test that failures above the baseline halve the limit but a steady rate does not."""
+        sem = limiter(initial=8)
+
+        await run_window(sem, ["timeout"] * 5 + ["ok"] * 5)
+        assert sem.limit == 8  # the first window only sets the baseline
+
+        await run_window(sem, ["timeout"] * 9 + ["ok"])
+        assert sem.limit == 4
+
+    async def test_local_error_decreases_once_per_window(self):
+        """Test that EMFILE-like errors cut the limit immediately, once per window."""
+        sem = limiter(initial=8)
+
+        async def exhaust():
+            async with sem.slot():
+                raise OSError(errno.EMFILE, "Too many open files")
+
+        for _ in range(3):
+            with pytest.raises(OSError):
+                await exhaust()
+
+        assert sem.limit == 4
+
+    async def test_event_loop_lag_decreases(self):
+        """Test that a lagging event loop cuts the limit."""
+        sem = limiter(initial=8, lag_monitor=SimpleNamespace(lag=1.0, ensure_started=lambda: None))
+
+        await run_window(sem, ["ok"] * 10)
+
+        assert sem.limit == 4
+
+    async def test_fixed_when_not_adaptive(self):
+        """Test that AdaptiveConcurrency = false keeps the limit."""
+        sem = limiter(adaptive=False)
+
+        await run_window(sem, ["timeout"] * 10)
+
+        assert sem.limit == 4
+
+
+class TestLoopLagMonitor:
+    """Test cases for LoopLagMonitor class."""
+
+    async def test_measures_blocking(self):
+        """Test that blocking the loop shows up as lag."""
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.ensure_started()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        assert monitor.lag > 0.01
+
+
+def test_connection_budgets_fit_open_files():
+    """Test that the fetch, check and pre-screen budgets together stay below the open files limit."""
+    fetch, check, prescreen = connection_budgets(1024, prescreen=True)
+
+    assert fetch + check + prescreen <= 1024
+    assert fetch >= 1 and prescreen >= 1 and check > prescreen
+
+
+def test_connection_budgets_without_prescreen():
+    """Test that a disabled pre-screen leaves its share to the checks."""
+    _, check_without, prescreen_without = connection_budgets(1024, prescreen=False)
+    _, check_with, _ = connection_budgets(1024, prescreen=True)
+
+    assert check_without > check_with
+    assert prescreen_without == MIN_CONNECTIONS
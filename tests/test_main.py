@@ -1,6 +1,9 @@
 import os
+import sys
 import configparser
+import importlib
 import pytest
+from unittest.mock import patch
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
 
@@ -55,3 +58,15 @@ def test_config_savepath_is_valid():
     assert len(dir_path) > 0, "SavePath is empty"
     # Directory may not exist yet, so just check it's a plausible path
     assert not dir_path.startswith("//"), "SavePath should not start with //"
+
+
+def test_import_opens_no_state_store():
+    """Importing the CLI must not open the state store or create caches."""
+    sys.modules.pop("proxy_parser.__main__", None)
+    with (
+        patch("proxy_parser.orchestrator.ProxyStore", side_effect=AssertionError("store opened")),
+        patch("proxy_parser.orchestrator.SourceCache", side_effect=AssertionError("cache created")),
+    ):
+        cli = importlib.import_module("proxy_parser.__main__")
+
+    assert not hasattr(cli, "orchestrator")
@@ -0,0 +1,117 @@
+"""
+Tests for the metrics module.
+"""
+
+import asyncio
+import socket
+
+from proxy_parser import metrics
+from proxy_parser.checkers import ProxyChecker
+from proxy_parser.http_client import HTTPClient, http_client
+from proxy_parser.metrics import Counter, Gauge, Histogram, start_metrics_server
+
+BODY = b'{"status":"success","query":"127.0.0.1"}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\nConnection: close\r\n\r\n" + BODY
+)
+
+
+async def fake_proxy(reader, writer):
+    """Answer any proxied request with a judge-style JSON body."""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(RESPONSE)
+    await writer.drain()
+    writer.close()
+
+
+def closed_port() -> int:
+    """Return a port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestMetricTypes:
+    """Test cases for the metric types and the text format."""
+
+    def test_counter_and_gauge_render(self):
+        """Test samples, labels and escaping of counters and gauges."""
+        counter = Counter("test_events_total", "Events", ("kind",), registry=None)
+        counter.inc('a"b')
+        counter.inc('a"b', amount=2)
+        gauge = Gauge("test_depth", "Depth", ("queue",), registry=None)
+        gauge.set(1.5, "x")
+        gauge.set_function(lambda: 7, "y")
+
+        assert counter.render().splitlines() == [
+            "# HELP test_events_total Events",
+            "# TYPE test_events_total counter",
+            'test_events_total{kind="a\\"b"} 3',
+        ]
+        assert gauge.render().splitlines()[2:] == ['test_depth{queue="x"} 1.5', 'test_depth{queue="y"} 7']
+
+        gauge.set_function(None, "y")
+        assert gauge.render().splitlines()[2:] == ['test_depth{queue="x"} 1.5']
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket placement, +Inf, sum and count."""
+        histogram = Histogram("test_seconds", "Seconds", ("stage",), (0.1, 1.0), registry=None)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "check")
+
+        assert histogram.render().splitlines()[2:] == [
+            'test_seconds_bucket{stage="check",le="0.1"} 2',
+            'test_seconds_bucket{stage="check",le="1"} 3',
+            'test_seconds_bucket{stage="check",le="+Inf"} 4',
+            'test_seconds_sum{stage="check"} 3.65',
+            'test_seconds_count{stage="check"} 4',
+        ]
+
+
+class TestCheckMetrics:
+    """Test cases for the metrics recorded by ProxyChecker."""
+
+    async def test_check_outcomes(self):
+        """Test that working and failed checks are counted by protocol and reason."""
+        server = await asyncio.start_server(fake_proxy, "127.0.0.1", 0)
+        working = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        dead = f"http://127.0.0.1:{closed_port()}"
+        checker = ProxyChecker(timeout=5, check_url="http://judge.invalid/json/")
+        started = metrics.CHECKS_STARTED.value("http")
+        succeeded = metrics.CHECKS_SUCCEEDED.value("http")
+        refused = metrics.CHECKS_FAILED.value("http", "connect_error")
+        observed = metrics.CHECK_SECONDS.count("http", "working")
+
+        try:
+            assert await checker.check_proxy(working)
+            assert await checker.check_proxy(dead) is None
+        finally:
+            server.close()
+            await http_client.aclose()
+
+        assert metrics.CHECKS_STARTED.value("http") == started + 2
+        assert metrics.CHECKS_SUCCEEDED.value("http") == succeeded + 1
+        assert metrics.CHECKS_FAILED.value("http", "connect_error") == refused + 1
+        assert metrics.CHECK_SECONDS.count("http", "working") == observed + 1
+        assert metrics.CHECKS_IN_FLIGHT.value() == 0
+
+
+class TestMetricsServer:
+    """Test cases for the /metrics endpoint."""
+
+    async def test_serves_text_format(self):
+        """Test that the endpoint serves every registered metric."""
+        runner = await start_metrics_server("127.0.0.1", 0)
+        host, port = runner.addresses[0][:2]
+        client = HTTPClient()
+        body = bytearray()
+        try:
+            await client.fetch_chunks(f"http://{host}:{port}/metrics", body.extend)
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+        text = body.decode()
+
+        assert "# TYPE proxy_parser_checks_started_total counter" in text
+        assert "# TYPE proxy_parser_check_duration_seconds histogram" in text
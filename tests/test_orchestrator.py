@@ -0,0 +1,102 @@
+"""
+Tests for the orchestrator module.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from proxy_parser.file_operations import FileManagerJson
+from proxy_parser.http_client import github_client
+from proxy_parser.orchestrator import ProxyOrchestrator
+
+
+class TestPipelineCycle:
+    """Test cases for the pipelined cycle."""
+
+    @pytest.fixture
+    def orchestrator(self, tmp_path):
+        """Create a pipelined ProxyOrchestrator writing into tmp_path."""
+        file_manager = FileManagerJson(tmp_path / "sources", tmp_path / "proxies")
+        orchestrator = ProxyOrchestrator(
+            file_manager, prescreen=False, state_store=False, pipeline=True
+        )
+        orchestrator.parser.update_sources = AsyncMock()
+        orchestrator.parser.get_source_urls = Mock(return_value={"http": ["a", "b"]})
+        with (
+            patch("proxy_parser.orchestrator.CHECKED_PROXIES_FILE", tmp_path / "parsed.jsonl"),
+            patch("proxy_parser.orchestrator.NOT_CHECKED_PROXIES_FILE", tmp_path / "unchecked.txt"),
+        ):
+            yield orchestrator
+
+    async def test_checks_each_proxy_once_while_parsing(self, orchestrator, tmp_path):
+        """Test that proxies reach the checker deduplicated, before parsing finishes."""
+        checked = []
+        parsing_done = False
+
+        async def iter_source_proxies(source_urls):
+            nonlocal parsing_done
+            for protocol, proxies in [
+                ("http", {"1.1.1.1:80", "2.2.2.2:80"}),
+                ("http", {"2.2.2.2:80", "3.3.3.3:80"}),
+                ("socks5", {"1.1.1.1:80"}),
+            ]:
+                # Source fetches wait on the network between results
+                await asyncio.sleep(0.01)
+                yield protocol, proxies
+            parsing_done = True
+
+        async def check_proxies_generator(proxies):
+            async for proxy in proxies:
+                checked.append((proxy, parsing_done))
+                yield proxy, {"query": "1.1.1.1"}, 0.1
+
+        orchestrator.parser.iter_source_proxies = iter_source_proxies
+        orchestrator.checker.check_proxies_generator = check_proxies_generator
+
+        await orchestrator.run_full_cycle()
+
+        assert sorted(proxy for proxy, _ in checked) == [
+            "http://1.1.1.1:80",
+            "http://2.2.2.2:80",
+            "http://3.3.3.3:80",
+            "socks5://1.1.1.1:80",
+        ]
+        assert not checked[0][1]
+        assert len((tmp_path / "parsed.jsonl").read_text().splitlines()) == 4
+        assert len((tmp_path / "unchecked.txt").read_text().splitlines()) == 4
+
+    async def test_failed_check_keeps_previous_snapshot(self, orchestrator, tmp_path):
+        """Test that parsed.jsonl is only replaced by a completed check."""
+        (tmp_path / "parsed.jsonl").write_text('{"proxy": "http://9.9.9.9:80"}\n')
+
+        async def check_proxies_generator(proxies):
+            yield "http://1.1.1.1:80", {"query": "1.1.1.1"}, 0.1
+            raise RuntimeError("checker crashed")
+
+        orchestrator.checker.check_proxies_generator = check_proxies_generator
+
+        with pytest.raises(RuntimeError):
+            await orchestrator._check_and_save(["http://1.1.1.1:80"])
+
+        assert (tmp_path / "parsed.jsonl").read_text() == '{"proxy": "http://9.9.9.9:80"}\n'
+        assert sorted(path.name for path in tmp_path.iterdir() if path.is_file()) == ["parsed.jsonl"]
+
+
+class TestConstruction:
+    """Test cases for what creating an orchestrator touches."""
+
+    async def test_search_cache_stays_with_the_orchestrator(self, tmp_path):
+        """Test that the search cache goes to the orchestrator's client, not the shared one."""
+        file_manager = FileManagerJson(tmp_path / "sources", tmp_path / "proxies")
+
+        with patch("proxy_parser.orchestrator.GITHUB_SEARCH_TTL", 60), patch(
+            "proxy_parser.orchestrator.SearchCache", return_value=Mock()
+        ) as search_cache:
+            orchestrator = ProxyOrchestrator(file_manager, prescreen=False, state_store=False)
+
+        assert orchestrator.search_client.search_cache is search_cache.return_value
+        assert orchestrator.parser.search_client is orchestrator.search_client
+        assert github_client.search_cache is None
+        await orchestrator.close()
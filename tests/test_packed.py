@@ -0,0 +1,68 @@
+"""
+Tests for the packed module.
+"""
+
+import pytest
+
+from proxy_parser.packed import PackedProxySet, pack_proxy
+
+
+class TestPackedProxySet:
+    """Test cases for PackedProxySet class."""
+
+    def test_round_trip_and_dedupe(self):
+        """Test that proxies come back as the same strings, once each."""
+        proxies = PackedProxySet()
+        proxies.add("http", {"1.2.3.4:80", "255.255.255.255:65535"})
+        proxies.add("http", {"1.2.3.4:80", "10.0.0.1:0"})
+        proxies.add("socks5", {"1.2.3.4:80"})
+
+        assert len(proxies) == 4
+        assert set(proxies) == {
+            "http://1.2.3.4:80",
+            "http://255.255.255.255:65535",
+            "http://10.0.0.1:0",
+            "socks5://1.2.3.4:80",
+        }
+
+    def test_contains(self):
+        """Test membership by proxy string."""
+        proxies = PackedProxySet()
+        proxies.add("https", ["8.8.8.8:53"])
+
+        assert "https://8.8.8.8:53" in proxies
+        assert "https://8.8.8.8:54" not in proxies
+        assert "http://8.8.8.8:53" not in proxies
+        assert "not a proxy" not in proxies
+
+    def test_union(self):
+        """Test that union and update merge without duplicates."""
+        first, second = PackedProxySet(), PackedProxySet()
+        first.add("http", ["1.1.1.1:80", "2.2.2.2:80"])
+        second.add("http", ["2.2.2.2:80", "3.3.3.3:80"])
+
+        assert len(first | second) == 3
+        first.update(second)
+        assert list(first) == ["http://1.1.1.1:80", "http://2.2.2.2:80", "http://3.3.3.3:80"]
+
+    def test_add_new_returns_unseen_only(self, monkeypatch):
+        """Test stream dedupe across the recent set and the sorted array."""
+        monkeypatch.setattr("proxy_parser.packed.RECENT_LIMIT", 2)
+        proxies = PackedProxySet()
+
+        assert proxies.add_new("http", ["1.1.1.1:80", "1.1.1.1:80"]) == ["http://1.1.1.1:80"]
+        assert proxies.add_new("http", ["1.1.1.1:80", "2.2.2.2:80"]) == ["http://2.2.2.2:80"]
+        assert proxies.add_new("http", ["2.2.2.2:80", "3.3.3.3:80"]) == ["http://3.3.3.3:80"]
+        assert proxies.add_new("socks4", ["3.3.3.3:80"]) == ["socks4://3.3.3.3:80"]
+        assert len(proxies) == 4
+
+    def test_pack_proxy_layout(self):
+        """Test the ip and port bits of a packed value."""
+        value = pack_proxy("http", "1.2.3.4:8080")
+
+        assert value & 0xFFFF_FFFF_FFFF == (0x01020304 << 16) | 8080
+
+    def test_malformed_address_raises(self):
+        """Test that a value that is not ip:port is rejected."""
+        with pytest.raises(ValueError):
+            PackedProxySet().add("http", ["1.2.3:80"])
@@ -6,8 +6,22 @@ import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from pathlib import Path
 
+from proxy_parser.cache import SourceCache
+from proxy_parser.http_client import TextResponse
 from proxy_parser.parsers import ProxyParser
 from proxy_parser.file_operations import FileManager, FileManagerJson
+from proxy_parser.store import ProxyStore
+
+
+def streamed(*chunks: bytes, etag=None):
+    """Build a fetch_chunks mock that streams the given chunks."""
+
+    async def fetch_chunks(url, consume, validators=None):
+        for chunk in chunks:
+            consume(chunk)
+        return TextResponse(200, etag, None)
+
+    return AsyncMock(side_effect=fetch_chunks)
 
 
 class TestProxyParser:
@@ -29,12 +43,13 @@ class TestProxyParser:
         """Test fetching from source with empty response."""
         with patch("proxy_parser.parsers.http_client") as mock_client:
             # Mock the async method properly
-            mock_client.get_text = AsyncMock(return_value=None)
+            mock_client.fetch_chunks = AsyncMock(return_value=None)
 
             result = await parser.fetch_source("http://example.com")
 
             assert result == set()
-            mock_client.get_text.assert_called_once_with("http://example.com")
+            mock_client.fetch_chunks.assert_called_once()
+            assert mock_client.fetch_chunks.call_args.kwargs == {"validators": {}}
 
     async def test_fetch_source_with_proxies(self, parser):
         """Test fetching from source with proxy data."""
@@ -42,56 +57,97 @@ class TestProxyParser:
 
         with patch("proxy_parser.parsers.http_client") as mock_client:
             # Mock the async method properly
-            mock_client.get_text = AsyncMock(return_value=sample_text)
+            mock_client.fetch_chunks = streamed(sample_text.encode())
 
             result = await parser.fetch_source("http://example.com")
 
             expected = {"192.168.1.1:8080", "10.0.0.1:3128"}
             assert result == expected
 
-    async def test_get_proxies_success(self, parser):
-        """Test getting proxies from multiple sources."""
-        urls = ["http://source1.com", "http://source2.com"]
-
-        with patch.object(parser, "fetch_source") as mock_fetch:
-            mock_fetch.side_effect = [
-                {"192.168.1.1:8080", "10.0.0.1:3128"},
-                {"172.16.0.1:9090"},
-            ]
-
-            result = await parser.get_proxies(urls)
+    async def test_fetch_source_match_split_across_chunks(self, parser):
+        """Test that a proxy split between two chunks is extracted once."""
+        with patch("proxy_parser.parsers.http_client") as mock_client:
+            mock_client.fetch_chunks = streamed(b"a 192.168.", b"1.1:80", b"80 b 10.0.0.1:3128")
 
-            assert len(result) == 2
-            assert result[0] == {"192.168.1.1:8080", "10.0.0.1:3128"}
-            assert result[1] == {"172.16.0.1:9090"}
+            result = await parser.fetch_source("http://example.com")
 
-    async def test_get_proxies_with_exceptions(self, parser):
-        """Test getting proxies with some sources failing."""
-        urls = ["http://source1.com", "http://source2.com"]
+            assert result == {"192.168.1.1:8080", "10.0.0.1:3128"}
 
-        with patch.object(parser, "fetch_source") as mock_fetch:
-            mock_fetch.side_effect = [{"192.168.1.1:8080"}, Exception("Network error")]
+    async def test_fetch_source_not_modified_reuses_cache(self, parser, tmp_path):
+        """Test that a 304 answer reuses the proxies cached for the URL."""
+        parser.source_cache = SourceCache(tmp_path)
 
-            result = await parser.get_proxies(urls)
+        with patch("proxy_parser.parsers.http_client") as mock_client:
+            mock_client.fetch_chunks = streamed(b"1.2.3.4:80", etag='"abc"')
+            assert await parser.fetch_source("http://example.com") == {"1.2.3.4:80"}
 
-            assert len(result) == 1
-            assert result[0] == {"192.168.1.1:8080"}
+            mock_client.fetch_chunks = AsyncMock(return_value=TextResponse(304, None, None))
+            result = await parser.fetch_source("http://example.com")
 
-    def test_update_sources(self, parser):
+            assert result == {"1.2.3.4:80"}
+            mock_client.fetch_chunks.assert_called_once()
+            assert mock_client.fetch_chunks.call_args.kwargs == {
+                "validators": {"If-None-Match": '"abc"'}
+            }
+
+    async def test_not_modified_source_is_not_upserted_again(self, parser, tmp_path):
+        """Test that a 304 records the fetch but does not rewrite the source's proxies."""
+        parser.source_cache = SourceCache(tmp_path / "cache")
+        parser.store = ProxyStore(tmp_path / "state.sqlite3")
+
+        try:
+            with patch("proxy_parser.parsers.http_client") as mock_client:
+                mock_client.fetch_chunks = streamed(b"1.2.3.4:80", etag='"abc"')
+                await parser.fetch_source("http://example.com", "http")
+                first_seen = parser.store.get("http://1.2.3.4:80")
+
+                mock_client.fetch_chunks = AsyncMock(
+                    return_value=TextResponse(304, None, None)
+                )
+                with patch.object(parser.store, "upsert_seen") as upsert_seen:
+                    assert await parser.fetch_source("http://example.com", "http") == {"1.2.3.4:80"}
+
+            upsert_seen.assert_not_called()
+            assert parser.store.get("http://1.2.3.4:80") == first_seen
+            stats = parser.store.get_source_stats(["http://example.com"])["http://example.com"]
+            assert stats["fetch_count"] == 2
+        finally:
+            parser.store.close()
+
+    async def test_parse_unchecked_proxies_packs_and_dedupes(self, parser, mock_file_manager):
+        """Test that proxies from every source are merged per protocol without duplicates."""
+        mock_file_manager.get_sources_dict.return_value = {
+            "http": ["http://a", "http://b"],
+            "socks5": ["http://c"],
+        }
+        results = {
+            "http://a": {"1.1.1.1:80", "2.2.2.2:80"},
+            "http://b": {"2.2.2.2:80"},
+            "http://c": {"1.1.1.1:80"},
+        }
+
+        async def fetch_source(url, protocol=None):
+            return results[url]
+
+        with patch.object(parser, "fetch_source", side_effect=fetch_source):
+            proxies = await parser.parse_unchecked_proxies()
+
+        assert sorted(proxies) == ["http://1.1.1.1:80", "http://2.2.2.2:80", "socks5://1.1.1.1:80"]
+
+    async def test_update_sources(self, parser):
         """Test updating sources from GitHub."""
         with (
             patch("proxy_parser.parsers.github_client") as mock_github,
             patch.object(parser.file_manager, "append_iterable_to_file") as mock_append,
             patch.object(parser.file_manager, "clean_duplicates") as mock_clean,
         ):
-            mock_github.search_files.return_value = [
-                "http://github.com/file1",
-                "http://github.com/file2",
-            ]
+            mock_github.search_query = AsyncMock(
+                return_value={"http://github.com/file1", "http://github.com/file2"}
+            )
 
-            parser.update_sources()
+            await parser.update_sources()
 
             # Verify that search was called for each query
-            assert mock_github.search_files.call_count > 0
+            assert mock_github.search_query.call_count > 0
             assert mock_append.call_count > 0
             assert mock_clean.call_count > 0
@@ -0,0 +1,124 @@
+"""
+Tests for the pool module.
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+from proxy_parser.pool import ProxyPool
+
+
+@pytest.fixture
+def pool():
+    """Create a pool with three proxies of different latency."""
+    pool = ProxyPool(max_failures=2)
+    pool.add("http://1.1.1.1:80", 0.3)
+    pool.add("http://2.2.2.2:80", 0.1, {"countryCode": "US"})
+    pool.add("http://3.3.3.3:80", 0.2)
+    return pool
+
+
+class TestProxyPool:
+    """Test cases for ProxyPool class."""
+
+    def test_round_robin_visits_every_proxy(self, pool):
+        """Test that a full round serves each proxy once."""
+        picks = [pool.round_robin() for _ in range(6)]
+
+        assert Counter(picks) == {proxy: 2 for proxy in picks}
+        assert len(set(picks)) == 3
+
+    def test_fastest(self, pool):
+        """Test latency-ordered picks, including after a latency update."""
+        assert pool.fastest(2) == ["http://2.2.2.2:80", "http://3.3.3.3:80"]
+
+        pool.mark_success("http://1.1.1.1:80", latency=0.05)
+
+        assert pool.fastest(1) == ["http://1.1.1.1:80"]
+        assert pool.random_fastest(1) == "http://1.1.1.1:80"
+
+    def test_evict_swaps_last_entry(self, pool):
+        """Test that evicting keeps lookups and rotation consistent."""
+        assert pool.evict("http://1.1.1.1:80")
+        assert not pool.evict("http://1.1.1.1:80")
+
+        assert len(pool) == 2
+        assert "http://1.1.1.1:80" not in pool
+        assert pool.get("http://3.3.3.3:80").index == 0
+        assert {pool.round_robin() for _ in range(2)} == {"http://2.2.2.2:80", "http://3.3.3.3:80"}
+        assert pool.fastest(3) == ["http://2.2.2.2:80", "http://3.3.3.3:80"]
+
+    def test_mark_failed_evicts_after_max_failures(self, pool):
+        """Test that a proxy is evicted after max_failures and success resets the count."""
+        assert not pool.mark_failed("http://2.2.2.2:80")
+        pool.mark_success("http://2.2.2.2:80")
+        assert not pool.mark_failed("http://2.2.2.2:80")
+        assert pool.mark_failed("http://2.2.2.2:80")
+
+        assert "http://2.2.2.2:80" not in pool
+        assert pool.fastest(1) == ["http://3.3.3.3:80"]
+
+    def test_weighted_random_prefers_fast_proxies(self):
+        """Test that picks are proportional to 1 / latency."""
+        pool = ProxyPool()
+        pool.add("http://fast:80", 0.1)
+        pool.add("http://slow:80", 0.4)
+
+        picks = Counter(pool.weighted_random() for _ in range(20_000))
+
+        assert picks["http://fast:80"] / picks["http://slow:80"] == pytest.approx(4, rel=0.15)
+
+    def test_weighted_random_skewed_pool(self):
+        """Test exact proportions when one proxy is much faster than many slow ones."""
+        pool = ProxyPool()
+        pool.add("http://fast:80", 0.01)
+        for port in range(200):
+            pool.add(f"http://slow:{port}", 1.0)
+
+        picks = Counter(pool.weighted_random() for _ in range(30_000))
+
+        # weight 100 against 200 * 1
+        assert picks["http://fast:80"] / 30_000 == pytest.approx(1 / 3, abs=0.02)
+
+    def test_weighted_random_after_eviction_and_update(self):
+        """Test that evicted proxies are never picked and latency updates move the weights."""
+        pool = ProxyPool()
+        pool.add("http://fast:80", 0.01)
+        for port in range(100):
+            pool.add(f"http://slow:{port}", 1.0)
+        pool.evict("http://fast:80")
+        pool.add("http://slow:0", 0.01)
+
+        picks = Counter(pool.weighted_random() for _ in range(20_000))
+
+        assert "http://fast:80" not in picks
+        # weight 100 against 99 * 1
+        assert picks["http://slow:0"] / 20_000 == pytest.approx(100 / 199, abs=0.02)
+        assert len(picks) > 90
+
+    def test_empty_pool(self):
+        """Test that picks from an empty pool return nothing."""
+        pool = ProxyPool()
+
+        assert pool.round_robin() is None
+        assert pool.weighted_random() is None
+        assert pool.random_fastest(5) is None
+        assert pool.fastest(5) == []
+
+    async def test_fill_from_checker_results(self):
+        """Test that fill pools results while waiters wake on the first one."""
+        pool = ProxyPool()
+
+        async def results():
+            for index in range(3):
+                await asyncio.sleep(0)
+                yield f"http://1.1.1.{index}:80", {"query": "1.1.1.1"}, 0.1 * (index + 1)
+
+        waiter = asyncio.create_task(pool.wait_not_empty())
+        assert await pool.fill(results()) == 3
+        await asyncio.wait_for(waiter, 1)
+
+        assert pool.get("http://1.1.1.0:80").info == {"query": "1.1.1.1"}
+        assert pool.fastest(3) == ["http://1.1.1.0:80", "http://1.1.1.1:80", "http://1.1.1.2:80"]
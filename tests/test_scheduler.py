@@ -0,0 +1,49 @@
+"""
+Tests for the scheduler module.
+"""
+
+import pytest
+
+from proxy_parser.scheduler import RecheckScheduler
+from proxy_parser.store import ProxyStore
+
+ALIVE = "http://1.1.1.1:80"
+DEAD = "http://2.2.2.2:80"
+NEW = "http://3.3.3.3:80"
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a ProxyStore with one alive and one repeatedly failing proxy."""
+    store = ProxyStore(tmp_path / "state.sqlite3")
+    store.record_results([(ALIVE, 0.2)] * 5, now=1000)
+    store.record_results([(DEAD, None)] * 5, now=1000)
+    yield store
+    store.close()
+
+
+class TestRecheckScheduler:
+    """Test cases for RecheckScheduler class."""
+
+    def test_backoff_is_exponential_and_capped(self, store):
+        """Test the backoff grows by doubling up to the cap."""
+        scheduler = RecheckScheduler(store, base_backoff=10, max_backoff=100)
+
+        assert scheduler.backoff(0) == 0
+        assert scheduler.backoff(1) == 10
+        assert scheduler.backoff(3) == 40
+        assert scheduler.backoff(10) == 100
+
+    def test_dead_proxy_backs_off(self, store):
+        """Test that a proxy with 5 failures is skipped until its backoff expires."""
+        scheduler = RecheckScheduler(store, budget=0, base_backoff=10, max_backoff=1000)
+
+        # 5 failures -> 160s backoff
+        assert scheduler.select([ALIVE, DEAD, NEW], now=1100) == [ALIVE, NEW]
+        assert set(scheduler.select([ALIVE, DEAD, NEW], now=1200)) == {ALIVE, DEAD, NEW}
+
+    def test_budget_keeps_highest_priority(self, store):
+        """Test that alive proxies beat new ones, which beat dead ones, under a budget."""
+        scheduler = RecheckScheduler(store, budget=2, base_backoff=1, max_backoff=10_000)
+
+        assert scheduler.select([DEAD, NEW, ALIVE], now=2000) == [ALIVE, NEW]
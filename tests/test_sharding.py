@@ -0,0 +1,80 @@
+"""
+Tests for the sharding module.
+"""
+
+import asyncio
+import socket
+
+from proxy_parser import metrics
+from proxy_parser.sharding import ShardedChecker
+from proxy_parser.store import ProxyStore
+
+BODY = b'{"status":"success","query":"127.0.0.1"}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\nConnection: close\r\n\r\n" + BODY
+)
+
+
+async def fake_proxy(reader, writer):
+    """Answer any proxied request with a judge-style JSON body."""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(RESPONSE)
+    await writer.drain()
+    writer.close()
+
+
+def closed_port() -> int:
+    """Return a port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestShardedChecker:
+    """Test cases for ShardedChecker class."""
+
+    async def test_results_stream_back_from_processes(self, tmp_path):
+        """Test that working proxies come back and every outcome is recorded."""
+        servers = [await asyncio.start_server(fake_proxy, "127.0.0.1", 0) for _ in range(3)]
+        working = {f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}" for server in servers}
+        dead = {f"http://127.0.0.1:{closed_port()}" for _ in range(3)}
+        store = ProxyStore(tmp_path / "state.sqlite3")
+        checker = ShardedChecker(
+            2, timeout=5, workers=4, check_url="http://judge.invalid/json/", store=store, batch_size=2
+        )
+
+        try:
+            results = [
+                result async for result in checker.check_proxies_generator(sorted(working | dead))
+            ]
+        finally:
+            for server in servers:
+                server.close()
+
+        assert {proxy for proxy, _, _ in results} == working
+        assert all(data["query"] == "127.0.0.1" for _, data, _ in results)
+        assert store.count() == 6
+        assert all(store.get(proxy)["failure_count"] == 1 for proxy in dead)
+        store.close()
+
+    async def test_check_metrics_recorded_in_parent(self):
+        """Test that checks run in the processes show up in the parent's metrics."""
+        server = await asyncio.start_server(fake_proxy, "127.0.0.1", 0)
+        working = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        dead = f"http://127.0.0.1:{closed_port()}"
+        checker = ShardedChecker(2, timeout=5, workers=4, check_url="http://judge.invalid/json/")
+        started = metrics.CHECKS_STARTED.value("http")
+        succeeded = metrics.CHECKS_SUCCEEDED.value("http")
+        refused = metrics.CHECKS_FAILED.value("http", "connect_error")
+        failed_seconds = metrics.CHECK_SECONDS.count("http", "failed")
+
+        try:
+            [result async for result in checker.check_proxies_generator([working, dead])]
+        finally:
+            server.close()
+
+        assert metrics.CHECKS_STARTED.value("http") == started + 2
+        assert metrics.CHECKS_SUCCEEDED.value("http") == succeeded + 1
+        assert metrics.CHECKS_FAILED.value("http", "connect_error") == refused + 1
+        assert metrics.CHECK_SECONDS.count("http", "failed") == failed_seconds + 1
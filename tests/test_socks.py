@@ -0,0 +1,156 @@
+"""
+Tests for the socks module.
+"""
+
+import asyncio
+import struct
+
+import pytest
+
+from proxy_parser.http_client import HTTPClient
+from proxy_parser.socks import SocksError, parse_http_response, socks_http_get
+
+BODY = b'{"status":"success","query":"203.0.113.7"}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+)
+
+
+async def answer_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Play the judge on the tunnelled connection."""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(RESPONSE)
+    await writer.drain()
+    writer.close()
+
+
+async def fake_socks5(reader, writer, requests):
+    """SOCKS5 server that accepts any CONNECT and answers the HTTP request itself."""
+    await reader.readexactly(3)
+    writer.write(b"\x05\x00")
+    version, command, _, address_type = await reader.readexactly(4)
+    if address_type == 3:
+        length = (await reader.readexactly(1))[0]
+        host = (await reader.readexactly(length)).decode()
+    else:
+        host = ".".join(str(b) for b in await reader.readexactly(4))
+    (port,) = struct.unpack(">H", await reader.readexactly(2))
+    requests.append((host, port))
+    writer.write(b"\x05\x00\x00\x01" + bytes(4) + b"\x00\x00")
+    await answer_http(reader, writer)
+
+
+async def fake_socks4(reader, writer, requests, grant=True):
+    """SOCKS4/4a server that accepts any CONNECT and answers the HTTP request itself."""
+    version, command, port = struct.unpack(">BBH", await reader.readexactly(4))
+    address = await reader.readexactly(4)
+    await reader.readuntil(b"\x00")  # user id
+    if address[:3] == b"\x00\x00\x00":
+        host = (await reader.readuntil(b"\x00"))[:-1].decode()
+    else:
+        host = ".".join(str(b) for b in address)
+    requests.append((host, port))
+    if not grant:
+        writer.write(b"\x00\x5b" + bytes(6))
+        writer.close()
+        return
+    writer.write(b"\x00\x5a" + bytes(6))
+    await answer_http(reader, writer)
+
+
+@pytest.fixture
+async def socks_server():
+    """Start a fake SOCKS server; yields a factory returning (port, seen requests)."""
+    servers = []
+
+    async def start(handler, **kwargs):
+        requests = []
+        server = await asyncio.start_server(
+            lambda r, w: handler(r, w, requests, **kwargs), "127.0.0.1", 0
+        )
+        servers.append(server)
+        return server.sockets[0].getsockname()[1], requests
+
+    yield start
+
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+
+
+class TestSocksHttpGet:
+    """Test cases for socks_http_get."""
+
+    async def test_socks5_remote_dns(self, socks_server):
+        """Test a SOCKS5 request passes the judge host name to the proxy."""
+        port, requests = await socks_server(fake_socks5)
+
+        status, body = await socks_http_get(
+            "socks5", "127.0.0.1", port, "http://judge.example/json/?fields=1", {}, 2
+        )
+
+        assert status == 200
+        assert body == BODY
+        assert requests == [("judge.example", 80)]
+
+    async def test_socks4a_remote_dns(self, socks_server):
+        """Test a SOCKS4a request passes the judge host name to the proxy."""
+        port, requests = await socks_server(fake_socks4)
+
+        status, body = await socks_http_get(
+            "socks4a", "127.0.0.1", port, "http://judge.example:8080/", {}, 2
+        )
+
+        assert status == 200
+        assert requests == [("judge.example", 8080)]
+
+    async def test_socks4_ip_destination(self, socks_server):
+        """Test a SOCKS4 request to an IP address destination."""
+        port, requests = await socks_server(fake_socks4)
+
+        status, _ = await socks_http_get("socks4", "127.0.0.1", port, "http://10.1.2.3/", {}, 2)
+
+        assert status == 200
+        assert requests == [("10.1.2.3", 80)]
+
+    async def test_socks4_rejected(self, socks_server):
+        """Test a rejected SOCKS4 request raises SocksError."""
+        port, _ = await socks_server(fake_socks4, grant=False)
+
+        with pytest.raises(SocksError):
+            await socks_http_get("socks4", "127.0.0.1", port, "http://10.1.2.3/", {}, 2)
+
+    async def test_get_json_via_socks5(self, socks_server):
+        """Test that HTTPClient.get_json routes socks5:// proxies through the SOCKS client."""
+        port, _ = await socks_server(fake_socks5)
+        client = HTTPClient()
+
+        result = await client.get_json(
+            "http://judge.example/json/", proxy=f"socks5://127.0.0.1:{port}", timeout=2
+        )
+
+        assert result == {"status": "success", "query": "203.0.113.7"}
+        await client.aclose()
+
+
+class TestParseHttpResponse:
+    """Test cases for parse_http_response."""
+
+    def test_chunked_body(self):
+        """Test decoding of a chunked response body."""
+        raw = (
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"4\r\n{\"a\"\r\n3\r\n:1}\r\n0\r\n\r\n"
+        )
+
+        status, headers, body = parse_http_response(raw)
+
+        assert status == 200
+        assert headers["transfer-encoding"] == "chunked"
+        assert body == b'{"a":1}'
+
+    def test_malformed_status_line(self):
+        """Test that garbage instead of HTTP raises SocksError."""
+        with pytest.raises(SocksError):
+            parse_http_response(b"SSH-2.0-OpenSSH\r\n\r\n")
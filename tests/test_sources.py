@@ -0,0 +1,171 @@
+"""
+Tests for the sources module.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from proxy_parser.file_operations import FileManager
+from proxy_parser.http_client import FETCH_STATUS, TextResponse
+from proxy_parser.parsers import ProxyParser
+from proxy_parser.sources import SourceRanker
+from proxy_parser.store import ProxyStore
+
+GOOD = "https://example.com/good.txt"
+POOR = "https://example.com/poor.txt"
+DEAD = "https://example.com/dead.txt"
+JUNK = "https://example.com/junk.txt"
+DOWN = "https://example.com/down.txt"
+NEW = "https://example.com/new.txt"
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a ProxyStore with sources of every kind, last fetched at t=1000."""
+    store = ProxyStore(tmp_path / "state.sqlite3")
+    store.upsert_seen(["http://1.1.1.1:80", "http://2.2.2.2:80"], now=1000, source=GOOD)
+    store.upsert_seen(["http://3.3.3.3:80"], now=1000, source=POOR)
+    store.upsert_seen(["http://4.4.4.4:80"], now=1000, source=JUNK)
+    store.record_results(
+        [("http://1.1.1.1:80", 0.2), ("http://2.2.2.2:80", 0.3), ("http://3.3.3.3:80", 0.5),
+         ("http://4.4.4.4:80", None)],
+        now=1000,
+    )
+    for _ in range(3):
+        store.record_source_fetch(GOOD, True, 2, now=1000)
+        store.record_source_fetch(POOR, True, 1, now=1000)
+        store.record_source_fetch(DEAD, False, 0, now=1000, gone=True)
+        store.record_source_fetch(DOWN, False, 0, now=1000)
+        store.record_source_fetch(JUNK, True, 1, now=1000)
+    yield store
+    store.close()
+
+
+class TestSourceRanker:
+    """Test cases for SourceRanker class."""
+
+    def test_rank_orders_by_yield(self, store):
+        """Test that unknown sources come first, then the best yield, and dead ones are left out."""
+        ranker = SourceRanker(store, max_failures=3, min_fetches=3, demoted_interval=100)
+
+        assert ranker.rank([JUNK, DEAD, POOR, GOOD, NEW], now=2000) == [NEW, GOOD, POOR, JUNK]
+        assert ranker.dead([JUNK, DEAD, DOWN, NEW]) == {DEAD}
+
+    def test_transient_failures_back_off(self, store):
+        """Test that a source failing without a 404 is rested, doubling per failure, never dropped."""
+        ranker = SourceRanker(
+            store, max_failures=3, min_fetches=0, demoted_interval=1000, base_backoff=100
+        )
+
+        assert ranker.rank([DOWN], now=1050) == []
+        assert ranker.rank([DOWN], now=1100) == [DOWN]
+
+        store.record_source_fetch(DOWN, False, 0, now=1100)
+        assert ranker.rank([DOWN], now=1250) == []
+        assert ranker.rank([DOWN], now=1300) == [DOWN]
+        assert not ranker.is_dead(store.get_source_stats([DOWN])[DOWN])
+
+    def test_gone_count_survives_transient_failures(self, store):
+        """Test that timeouts between 404s neither reset nor add to the dead count."""
+        store.record_source_fetch(NEW, False, 0, now=1, gone=True)
+        store.record_source_fetch(NEW, False, 0, now=2)
+        store.record_source_fetch(NEW, False, 0, now=3, gone=True)
+        assert store.get_source_stats([NEW])[NEW]["gone_count"] == 2
+
+        store.record_source_fetch(NEW, True, 1, now=4)
+        assert store.get_source_stats([NEW])[NEW]["gone_count"] == 0
+
+    def test_demoted_source_rests(self, store):
+        """Test that a source without working proxies is only fetched once per interval."""
+        ranker = SourceRanker(store, max_failures=3, min_fetches=3, demoted_interval=100)
+
+        assert ranker.is_demoted(store.get_source_stats([JUNK])[JUNK])
+        assert JUNK not in ranker.rank([GOOD, JUNK], now=1050)
+        assert ranker.rank([GOOD, JUNK], now=1100) == [GOOD, JUNK]
+
+    def test_thresholds_can_be_disabled(self, store):
+        """Test that zero thresholds neither prune nor demote."""
+        ranker = SourceRanker(store, max_failures=0, min_fetches=0)
+
+        assert ranker.dead([DEAD]) == set()
+        assert set(ranker.rank([DEAD, JUNK], now=1001)) == {DEAD, JUNK}
+
+
+class TestProxyParserSources:
+    """Test cases for source tracking in ProxyParser."""
+
+    @pytest.fixture
+    def parser(self, store, tmp_path):
+        """Create a ProxyParser with a source ranker over real source files."""
+        file_manager = FileManager(tmp_path / "sources", tmp_path / "proxies")
+        ranker = SourceRanker(store, max_failures=3, min_fetches=3, demoted_interval=100)
+        return ProxyParser(file_manager, store=store, source_ranker=ranker)
+
+    async def test_fetch_records_source(self, parser, store):
+        """Test that a fetch records its outcome and credits new proxies to the source."""
+
+        async def fetch_chunks(url, consume, validators=None):
+            consume(b"5.5.5.5:8080\n")
+            return TextResponse(200, None, None)
+
+        with patch("proxy_parser.parsers.http_client") as mock_client:
+            mock_client.fetch_chunks = AsyncMock(side_effect=fetch_chunks)
+            await parser.fetch_source(NEW, "socks5")
+            mock_client.fetch_chunks = AsyncMock(return_value=None)
+            await parser.fetch_source(NEW, "socks5")
+
+        stats = store.get_source_stats([NEW])[NEW]
+        assert stats["fetch_count"] == 2
+        assert stats["consecutive_failures"] == 1
+        assert stats["unique_count"] == 1
+        assert store.get("socks5://5.5.5.5:8080")["source"] == NEW
+
+    async def test_timeout_streak_does_not_prune(self, parser, store):
+        """Test that a source that keeps timing out stays in its source file."""
+        path = parser.file_manager.sources_path / "http.txt"
+        path.write_text(f"{NEW}\n")
+
+        with patch("proxy_parser.parsers.http_client") as mock_client:
+            mock_client.fetch_chunks = AsyncMock(return_value=None)
+            for _ in range(10):
+                await parser.fetch_source(NEW, "http")
+
+        assert store.get_source_stats([NEW])[NEW]["consecutive_failures"] == 10
+        parser.get_source_urls()
+        assert path.read_text().split() == [NEW]
+
+    async def test_not_found_streak_prunes(self, parser):
+        """Test that a source answering 404 on every fetch is removed from its file."""
+        path = parser.file_manager.sources_path / "http.txt"
+        path.write_text(f"{NEW}\n{GOOD}\n")
+
+        async def not_found(url, consume, validators=None):
+            FETCH_STATUS.set(404)
+            return None
+
+        with patch("proxy_parser.parsers.http_client") as mock_client:
+            mock_client.fetch_chunks = AsyncMock(side_effect=not_found)
+            for _ in range(3):
+                await parser.fetch_source(NEW, "http")
+
+        assert parser.get_source_urls() == {"http": [GOOD]}
+        assert path.read_text().split() == [GOOD]
+
+    def test_get_source_urls_prunes_dead_sources(self, parser):
+        """Test that dead sources are removed from the source file and the rest ranked."""
+        path = parser.file_manager.sources_path / "http.txt"
+        path.write_text("\n".join([DEAD, POOR, GOOD, NEW]) + "\n")
+
+        assert parser.get_source_urls() == {"http": [NEW, GOOD, POOR]}
+        assert path.read_text().split() == [POOR, GOOD, NEW]
+
+    async def test_update_sources_skips_dead_links(self, parser):
+        """Test that the GitHub search does not add back dead sources."""
+        path = parser.file_manager.sources_path / "http.txt"
+        with patch("proxy_parser.parsers.SEARCH_QUERIES", {"q": "http.txt"}), patch(
+            "proxy_parser.parsers.github_client"
+        ) as mock_github:
+            mock_github.search_query = AsyncMock(return_value=[DEAD, NEW])
+            await parser.update_sources()
+
+        assert path.read_text().split() == [NEW]
@@ -0,0 +1,125 @@
+"""
+Tests for the store module.
+"""
+
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from proxy_parser.checkers import ProxyChecker
+from proxy_parser.store import ProxyStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a ProxyStore in a temporary directory."""
+    store = ProxyStore(tmp_path / "state.sqlite3", batch_size=2, history_size=3)
+    yield store
+    store.close()
+
+
+class TestProxyStore:
+    """Test cases for ProxyStore class."""
+
+    def test_upsert_seen_keeps_first_seen(self, store):
+        """Test that re-seeing a proxy only moves last_seen."""
+        store.upsert_seen(["http://1.2.3.4:80", "http://5.6.7.8:81", "socks5://9.9.9.9:1080"], now=100)
+        store.upsert_seen(["http://1.2.3.4:80"], now=200)
+
+        state = store.get("http://1.2.3.4:80")
+        assert state["first_seen"] == 100
+        assert state["last_seen"] == 200
+        assert store.count() == 3
+
+    def test_upsert_seen_credits_first_source(self, store):
+        """Test that a proxy stays credited to the source it was first found in."""
+        store.upsert_seen(["http://1.2.3.4:80"], now=100)
+        store.upsert_seen(["http://1.2.3.4:80"], now=200, source="http://a")
+        store.upsert_seen(["http://1.2.3.4:80"], now=300, source="http://b")
+
+        assert store.get("http://1.2.3.4:80")["source"] == "http://a"
+
+    def test_source_stats(self, store):
+        """Test fetch counters, consecutive failures and yield per source."""
+        store.upsert_seen(["http://1.1.1.1:80", "http://2.2.2.2:80"], now=1, source="http://a")
+        store.record_results([("http://1.1.1.1:80", 0.3), ("http://2.2.2.2:80", None)], now=2)
+        store.record_source_fetch("http://a", True, 2, now=1)
+        store.record_source_fetch("http://b", False, 0, now=1)
+        store.record_source_fetch("http://b", False, 0, now=2)
+
+        stats = store.get_source_stats(["http://a", "http://b", "http://c"])
+
+        assert set(stats) == {"http://a", "http://b"}
+        assert stats["http://a"]["unique_count"] == 2
+        assert stats["http://a"]["working_count"] == 1
+        assert stats["http://b"]["fetch_count"] == 2
+        assert stats["http://b"]["consecutive_failures"] == 2
+        assert stats["http://b"]["last_fetched"] == 2
+
+        store.record_source_fetch("http://b", True, 5, now=3)
+        stats = store.get_source_stats(["http://b"])["http://b"]
+        assert stats["consecutive_failures"] == 0
+        assert stats["failure_count"] == 2
+        assert stats["last_candidates"] == 5
+
+    def test_record_results_tracks_history(self, store):
+        """Test success/failure counters, consecutive failures and latency history."""
+        proxy = "http://1.2.3.4:80"
+        store.upsert_seen([proxy], now=1)
+
+        store.record_results([(proxy, 0.5)], now=10)
+        store.record_results([(proxy, None)], now=20)
+        store.record_results([(proxy, None)], now=30)
+
+        state = store.get(proxy)
+        assert state["last_success"] == 10
+        assert state["last_failure"] == 30
+        assert state["last_checked"] == 30
+        assert state["consecutive_failures"] == 2
+        assert state["success_count"] == 1
+        assert state["failure_count"] == 2
+        assert state["latencies"] == [0.5]
+
+        store.record_results([(proxy, 0.1), (proxy, 0.2), (proxy, 0.3)], now=40)
+        state = store.get(proxy)
+        assert state["consecutive_failures"] == 0
+        assert state["latencies"] == [0.1, 0.2, 0.3]
+
+    def test_record_results_for_unknown_proxy(self, store):
+        """Test that results for a never-seen proxy create its row."""
+        store.record_results([("http://1.1.1.1:3128", None)], now=5)
+
+        state = store.get("http://1.1.1.1:3128")
+        assert state["first_seen"] == 5
+        assert state["consecutive_failures"] == 1
+
+    async def test_checker_records_outcomes(self, store):
+        """Test that ProxyChecker writes both successes and failures to the store."""
+        checker = ProxyChecker(store=store)
+
+        async def fake_check(proxy):
+            return (proxy, {"query": "x"}, 0.25) if proxy.endswith(":80") else None
+
+        with patch.object(checker, "check_proxy", side_effect=fake_check):
+            results = [r async for r in checker.check_proxies_generator(
+                ["http://1.2.3.4:80", "http://1.2.3.4:81", "http://1.2.3.5:80"], workers=2
+            )]
+
+        assert len(results) == 2
+        assert store.get("http://1.2.3.4:80")["latencies"] == [0.25]
+        assert store.get("http://1.2.3.4:81")["consecutive_failures"] == 1
+        assert store.count() == 3
+
+    async def test_run_uses_store_thread(self, store):
+        """Test that async callers write on the store's thread, not the event loop's."""
+
+        def record() -> str:
+            store.record_results([("http://1.2.3.4:80", 0.1)])
+            return threading.current_thread().name
+
+        thread_name = await store.run(record)
+
+        assert thread_name.startswith("proxy-store")
+        assert thread_name != threading.current_thread().name
+        assert store.count() == 1
@@ -0,0 +1,117 @@
+"""
+Tests for the writer module.
+"""
+
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from proxy_parser.writer import BufferedJsonlWriter, SnapshotJsonlWriter, generation_path
+
+
+def read_records(path):
+    return [orjson.loads(line) for line in path.read_bytes().splitlines()]
+
+
+class TestBufferedJsonlWriter:
+    """Test cases for BufferedJsonlWriter class."""
+
+    def test_close_writes_every_record_in_order(self, tmp_path):
+        """Test that records queued before close are all written, in order."""
+        path = tmp_path / "parsed.jsonl"
+        with BufferedJsonlWriter(path, batch_size=7, flush_seconds=60) as writer:
+            for index in range(100):
+                writer.write({"proxy": f"http://1.1.1.1:{index}"})
+
+        assert [record["proxy"] for record in read_records(path)] == [
+            f"http://1.1.1.1:{index}" for index in range(100)
+        ]
+        assert writer.written_count == 100
+
+    def test_flush_before_batch_is_full(self, tmp_path):
+        """Test that flush writes a partial batch without waiting for the timer."""
+        path = tmp_path / "parsed.jsonl"
+        writer = BufferedJsonlWriter(path, batch_size=1000, flush_seconds=60).open()
+        writer.write({"proxy": "http://1.1.1.1:80"})
+        writer.flush()
+
+        assert read_records(path) == [{"proxy": "http://1.1.1.1:80"}]
+        writer.close()
+
+    def test_truncate_and_append(self, tmp_path):
+        """Test that open truncates only when asked."""
+        path = tmp_path / "parsed.jsonl"
+        path.write_bytes(b'{"old": true}\n')
+
+        with BufferedJsonlWriter(path) as writer:
+            writer.write({"new": 1})
+        assert read_records(path) == [{"old": True}, {"new": 1}]
+
+        writer = BufferedJsonlWriter(path).open(truncate=True)
+        writer.write({"new": 2})
+        writer.close()
+        assert read_records(path) == [{"new": 2}]
+
+    @pytest.mark.parametrize("policy, syncs", [("none", 0), ("batch", 3), ("periodic", 1)])
+    def test_fsync_policy(self, tmp_path, policy, syncs):
+        """Test how often each durability policy syncs the file."""
+        with patch("proxy_parser.writer.os.fsync") as fsync:
+            writer = BufferedJsonlWriter(
+                tmp_path / "parsed.jsonl", batch_size=10, fsync=policy, fsync_seconds=3600
+            ).open()
+            for batch in range(3):
+                for index in range(10):
+                    writer.write({"index": index})
+                writer.flush()
+            writer.close()
+
+        assert fsync.call_count == syncs
+
+    def test_unknown_fsync_policy(self, tmp_path):
+        """Test that an unknown policy is rejected."""
+        with pytest.raises(ValueError):
+            BufferedJsonlWriter(tmp_path / "parsed.jsonl", fsync="always")
+
+
+class TestSnapshotJsonlWriter:
+    """Test cases for SnapshotJsonlWriter class."""
+
+    def test_target_unchanged_until_publish(self, tmp_path):
+        """Test that readers see the previous snapshot until the new one is published."""
+        path = tmp_path / "parsed.jsonl"
+        path.write_bytes(b'{"generation": 0}\n')
+
+        writer = SnapshotJsonlWriter(path).open()
+        writer.write({"generation": 1})
+        writer.flush()
+        assert read_records(path) == [{"generation": 0}]
+
+        writer.publish()
+        assert read_records(path) == [{"generation": 1}]
+        assert not writer.path.exists()
+
+    def test_discard_keeps_target(self, tmp_path):
+        """Test that a discarded snapshot leaves the target and no temporary file."""
+        path = tmp_path / "parsed.jsonl"
+        path.write_bytes(b'{"generation": 0}\n')
+
+        writer = SnapshotJsonlWriter(path).open()
+        writer.write({"generation": 1})
+        writer.discard()
+
+        assert read_records(path) == [{"generation": 0}]
+        assert [child.name for child in tmp_path.iterdir()] == ["parsed.jsonl"]
+
+    def test_keeps_generations(self, tmp_path):
+        """Test that the last K replaced snapshots are kept, newest first."""
+        path = tmp_path / "parsed.jsonl"
+        for generation in range(5):
+            writer = SnapshotJsonlWriter(path, keep_generations=2).open()
+            writer.write({"generation": generation})
+            writer.publish()
+
+        assert read_records(path) == [{"generation": 4}]
+        assert read_records(generation_path(path, 1)) == [{"generation": 3}]
+        assert read_records(generation_path(path, 2)) == [{"generation": 2}]
+        assert not generation_path(path, 3).exists()